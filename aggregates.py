@@ -0,0 +1,84 @@
+"""System-wide process aggregates computed once per tick on the collector thread.
+
+summarize() turns a columnar process snapshot into a small JSON-friendly
+dict (totals, per-user and per-status breakdowns, top consumers) that the
+collector publishes as Snapshot.aggregates. Viewers read it instead of
+walking every process themselves, so a status bar costs the same on 50
+processes as on 50,000.
+
+Grouping is one NumPy pass over the string id columns: np.unique gives the
+groups, np.bincount the counts and sums.
+"""
+import numpy as np
+
+TOP_CONSUMERS = 3
+
+
+def _column(processes, field):
+    """Float column with missing values as 0, for sums."""
+    return np.nan_to_num(np.frombuffer(processes.numbers[field], dtype=np.float64))
+
+
+def _groups(processes, field, *weights):
+    """Return [(string, count, *sums)] per distinct value of a text column."""
+    ids = np.frombuffer(processes.texts[field], dtype=processes.texts[field].typecode)
+    keys, inverse = np.unique(ids, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(keys))
+    sums = [np.bincount(inverse, weights=weight, minlength=len(keys)) for weight in weights]
+    strings = processes.strings.strings
+    return [
+        (strings[key], int(counts[i])) + tuple(float(total[i]) for total in sums)
+        for i, key in enumerate(keys.tolist())
+    ]
+
+
+def _top(processes, values, field, count, cast=float):
+    """The count largest values as [{'pid', 'name', field}], largest first."""
+    if count < len(values):
+        rows = np.argpartition(values, -count)[-count:]
+    else:
+        rows = np.arange(len(values))
+    rows = rows[np.argsort(values[rows])[::-1]]
+    return [
+        {'pid': int(processes.pids[row]), 'name': processes.value(row, 'name', ''), field: cast(values[row])}
+        for row in rows.tolist() if values[row] > 0
+    ]
+
+
+def summarize(processes, cpu_count=None, top=TOP_CONSUMERS):
+    """Aggregate one process snapshot.
+
+    cpu_percent is the sum over processes, capped at 100% per logical CPU
+    because rates of short-lived processes can overshoot.
+    """
+    count = len(processes)
+    if not count:
+        return {
+            'count': 0, 'cpu_percent': 0.0, 'memory_bytes': 0, 'max_memory_percent': 0.0,
+            'by_user': [], 'by_status': {}, 'top_cpu': [], 'top_memory': [],
+        }
+    cpu = _column(processes, 'cpu_percent')
+    memory = _column(processes, 'memory_bytes')
+    cpu_percent = float(cpu.sum())
+    if cpu_count:
+        cpu_percent = min(cpu_percent, 100.0 * cpu_count)
+
+    io_rate = _column(processes, 'disk_read_rate') + _column(processes, 'disk_write_rate')
+    by_user = [
+        {'user': user, 'count': users, 'cpu_percent': user_cpu, 'memory_bytes': int(user_memory),
+         'io_rate': user_io}
+        for user, users, user_cpu, user_memory, user_io in _groups(processes, 'username', cpu, memory, io_rate)
+    ]
+    by_user.sort(key=lambda entry: entry['cpu_percent'], reverse=True)
+    by_status = {status or 'unknown': statuses for status, statuses in _groups(processes, 'status')}
+
+    return {
+        'count': count,
+        'cpu_percent': cpu_percent,
+        'memory_bytes': int(memory.sum()),
+        'max_memory_percent': float(_column(processes, 'memory_percent').max()),
+        'by_user': by_user,
+        'by_status': by_status,
+        'top_cpu': _top(processes, cpu, 'cpu_percent', top),
+        'top_memory': _top(processes, memory, 'memory_bytes', top, int),
+    }
@@ -0,0 +1,132 @@
+"""Diff 5,000-row process snapshots the way the Processes tab does, without a display.
+
+    python benchmarks/bench_process_table.py [--rows 5000] [--ticks 20] [--churn 0.01]
+
+"rebuild" formats every cell of every row each tick, which is what the old
+QTableWidget path did before creating its items. "diff" applies the same
+snapshots to a RowStore and counts the model signals it would emit.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rowstore import NullListener, RowStore
+from snapshot import ProcessSnapshot, StringTable
+
+FIELDS = (
+    'name', 'status', 'username', 'cpu_percent', 'memory_percent',
+    'memory_bytes', 'disk_usage', 'network_usage'
+)
+
+
+class CountingListener(NullListener):
+    def __init__(self):
+        self.removed = self.inserted = self.changed = self.signals = 0
+
+    def begin_remove_rows(self, first, last):
+        self.removed += last - first + 1
+        self.signals += 1
+
+    def begin_insert_rows(self, first, last):
+        self.inserted += last - first + 1
+        self.signals += 1
+
+    def rows_changed(self, first, last):
+        self.changed += last - first + 1
+        self.signals += 1
+
+
+def format_bytes(size):
+    power = 2**10
+    n = 0
+    units = ('B', 'KB', 'MB', 'GB', 'TB')
+    while size > power and n < len(units) - 1:
+        size /= power
+        n += 1
+    return f"{size:.1f} {units[n]}"
+
+
+def make_process(rng, pid):
+    return {
+        'name': f"proc-{pid % 311}",
+        'status': 'sleeping',
+        'username': f"user{pid % 17}",
+        'cpu_percent': 0.0,
+        'memory_percent': rng.random(),
+        'memory_bytes': rng.randrange(1 << 20, 1 << 30),
+        'disk_usage': rng.randrange(0, 1 << 30),
+        'network_usage': 0,
+    }
+
+
+def make_snapshots(rows, ticks, churn, active, seed=1):
+    """Yield ticks+1 snapshots with churn and a fraction of active processes."""
+    rng = random.Random(seed)
+    processes = {pid: make_process(rng, pid) for pid in range(1, rows + 1)}
+    next_pid = rows + 1
+    strings = StringTable()
+    snapshots = [ProcessSnapshot.from_dicts(0.0, processes, strings)]
+    for tick in range(1, ticks + 1):
+        for pid in rng.sample(sorted(processes), int(rows * churn)):
+            del processes[pid]
+            processes[next_pid] = make_process(rng, next_pid)
+            next_pid += 1
+        for pid in rng.sample(sorted(processes), int(rows * active)):
+            process = dict(processes[pid])
+            process['cpu_percent'] = round(rng.random() * 100, 1)
+            process['disk_usage'] += rng.randrange(0, 1 << 16)
+            processes[pid] = process
+        snapshots.append(ProcessSnapshot.from_dicts(float(tick), processes, strings))
+    return snapshots
+
+
+def rebuild(snapshot):
+    cells = []
+    for pid in snapshot:
+        process = snapshot[pid]
+        cells.extend((
+            process['name'], str(pid), process['status'], process['username'],
+            f"{process['cpu_percent']:.1f}%",
+            f"{process['memory_percent']:.1f}% ({format_bytes(process['memory_bytes'])})",
+            format_bytes(process['disk_usage']), format_bytes(process['network_usage']),
+            "N/A", ""
+        ))
+    return len(cells)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--ticks', type=int, default=20)
+    parser.add_argument('--churn', type=float, default=0.01, help="fraction of processes replaced per tick")
+    parser.add_argument('--active', type=float, default=0.05, help="fraction of processes whose values change per tick")
+    args = parser.parse_args()
+
+    snapshots = make_snapshots(args.rows, args.ticks, args.churn, args.active)
+
+    start = time.perf_counter()
+    for snapshot in snapshots[1:]:
+        rebuild(snapshot)
+    rebuild_ms = (time.perf_counter() - start) / args.ticks * 1000
+
+    store = RowStore(FIELDS)
+    store.apply(snapshots[0])
+    listener = CountingListener()
+    start = time.perf_counter()
+    for snapshot in snapshots[1:]:
+        store.apply(snapshot, listener)
+    diff_ms = (time.perf_counter() - start) / args.ticks * 1000
+
+    print(f"rows {args.rows}  ticks {args.ticks}  churn {args.churn:.1%}  active {args.active:.1%}")
+    print(f"rebuild: {rebuild_ms:8.2f} ms/tick  {args.rows * 10} cells formatted per tick")
+    print(f"   diff: {diff_ms:8.2f} ms/tick  {listener.signals / args.ticks:.1f} signals, "
+          f"{listener.changed / args.ticks:.0f} changed / {listener.inserted / args.ticks:.0f} inserted / "
+          f"{listener.removed / args.ticks:.0f} removed rows per tick")
+
+
+if __name__ == "__main__":
+    main()
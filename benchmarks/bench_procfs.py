@@ -0,0 +1,103 @@
+"""Compare the psutil and direct /proc process backends on a synthetic /proc tree.
+
+    python benchmarks/bench_procfs.py [--processes 3000] [--ticks 5]
+
+Both backends read the same generated tree: psutil is pointed at it through
+psutil.PROCFS_PATH, the procfs backend through its root argument.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psutil
+
+from collector import ProcessSampler
+from procfs import ProcfsProcessSampler
+
+NET_HEADER = "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n"
+
+
+def write(path, data):
+    with open(path, 'w') as f:
+        f.write(data)
+
+
+def build_tree(root, count):
+    """Populate root with a /proc lookalike holding count processes."""
+    uid = os.getuid()
+    write(os.path.join(root, 'stat'),
+          "cpu  100 0 100 1000 0 0 0 0 0 0\ncpu0 100 0 100 1000 0 0 0 0 0 0\n"
+          f"btime {int(time.time()) - 3600}\nprocesses {count}\n")
+    write(os.path.join(root, 'meminfo'),
+          "MemTotal:       16384000 kB\nMemFree:         8192000 kB\nMemAvailable:    12000000 kB\n"
+          "Buffers:          100000 kB\nCached:          2000000 kB\nShmem:             10000 kB\n"
+          "Active:          4000000 kB\nInactive:        2000000 kB\nSReclaimable:     100000 kB\n"
+          "SwapTotal:       2000000 kB\nSwapFree:        2000000 kB\n")
+    write(os.path.join(root, 'uptime'), "3600.00 3000.00\n")
+    os.makedirs(os.path.join(root, 'net'))
+    for table in ('tcp', 'tcp6', 'udp', 'udp6'):
+        write(os.path.join(root, 'net', table), NET_HEADER)
+    write(os.path.join(root, 'net', 'unix'), "Num       RefCount Protocol Flags    Type St Inode Path\n")
+    os.symlink(str(os.getpid()), os.path.join(root, 'self'))
+
+    for pid in range(1, count + 1):
+        pdir = os.path.join(root, str(pid))
+        os.makedirs(os.path.join(pdir, 'fd'))
+        name = f"worker-{pid % 97}"
+        write(os.path.join(pdir, 'stat'),
+              f"{pid} ({name}) S 1 {pid} {pid} 0 -1 4194304 100 0 0 0 "
+              f"{pid % 500} {pid % 300} 0 0 20 0 1 0 {1000 + pid} 104857600 {256 + pid % 4096} "
+              "18446744073709551615 0 0 0 0 0 0 0 0 0 0 0 0 17 0 0 0 0 0 0\n")
+        write(os.path.join(pdir, 'statm'), f"25600 {256 + pid % 4096} 128 10 0 2048 0\n")
+        write(os.path.join(pdir, 'status'),
+              f"Name:\t{name}\nState:\tS (sleeping)\nPid:\t{pid}\nPPid:\t1\n"
+              f"Uid:\t{uid}\t{uid}\t{uid}\t{uid}\nGid:\t0\t0\t0\t0\n"
+              "voluntary_ctxt_switches:\t10\nnonvoluntary_ctxt_switches:\t1\n")
+        write(os.path.join(pdir, 'io'),
+              f"rchar: {pid * 10}\nwchar: {pid * 5}\nsyscr: 10\nsyscw: 5\n"
+              f"read_bytes: {pid * 4096}\nwrite_bytes: {pid * 2048}\ncancelled_write_bytes: 0\n")
+        write(os.path.join(pdir, 'cmdline'), f"/usr/bin/{name}\0--serve\0--id={pid}\0")
+        os.symlink('/', os.path.join(pdir, 'cwd'))
+
+
+def bench(label, sampler, ticks):
+    sampler.sample(time.time())  # warm up baselines and caches
+    timings = []
+    for _ in range(ticks):
+        start = time.perf_counter()
+        snapshot = sampler.sample(time.time())
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f"{label:>8}: {len(snapshot):6d} processes  best {best * 1000:8.1f} ms  "
+          f"mean {sum(timings) / len(timings) * 1000:8.1f} ms")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--processes', type=int, default=3000)
+    parser.add_argument('--ticks', type=int, default=5)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='cpumon-proc-')
+    try:
+        build_tree(root, args.processes)
+        original_procfs = psutil.PROCFS_PATH
+        psutil.PROCFS_PATH = root
+        try:
+            psutil_best = bench('psutil', ProcessSampler(), args.ticks)
+        finally:
+            psutil.PROCFS_PATH = original_procfs
+        procfs_best = bench('procfs', ProcfsProcessSampler(root), args.ticks)
+        print(f"speedup: {psutil_best / procfs_best:.1f}x")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
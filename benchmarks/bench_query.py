@@ -0,0 +1,110 @@
+"""Search and filter 10,000-process snapshots, scanning versus the indexed query engine.
+
+    python benchmarks/bench_query.py [--rows 10000] [--ticks 20] [--churn 0.01]
+
+"scan" lowercases and compares the name, command line and user of every
+process, which is what the Processes tab did per search and per tick.
+"keystroke" runs a fresh ProcessQuery for each prefix of a typed word, as
+search-as-you-type does; "tick" keeps one query up to date as snapshots
+arrive.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from query import ProcessIndex, ProcessQuery
+from snapshot import ProcessSnapshot, StringTable
+
+PROGRAMS = ('python3', 'bash', 'postgres', 'nginx', 'java', 'node', 'sshd', 'systemd', 'chrome', 'kworker/0:1')
+USERS = ('root', 'postgres', 'www-data', 'alice', 'bob')
+TYPED = 'postgres'
+
+
+def make_process(rng, pid):
+    program = rng.choice(PROGRAMS)
+    return {
+        'name': program,
+        'cmdline': f"/usr/bin/{program} --worker={pid % 97} --config=/etc/{program}/{rng.randrange(1000)}.conf",
+        'username': rng.choice(USERS),
+        'status': rng.choice(('running', 'sleeping', 'sleeping', 'sleeping')),
+        'cpu_percent': rng.random() * 5,
+        'memory_bytes': rng.randrange(1 << 20, 1 << 32),
+    }
+
+
+def make_snapshots(rows, ticks, churn, seed=1):
+    rng = random.Random(seed)
+    strings = StringTable()
+    processes = {pid: make_process(rng, pid) for pid in range(1, rows + 1)}
+    next_pid = rows + 1
+    snapshots = [ProcessSnapshot.from_dicts(0.0, processes, strings)]
+    for tick in range(1, ticks + 1):
+        for pid in rng.sample(sorted(processes), int(rows * churn)):
+            del processes[pid]
+            processes[next_pid] = make_process(rng, next_pid)
+            next_pid += 1
+        for pid in rng.sample(sorted(processes), rows // 10):
+            processes[pid] = dict(processes[pid], cpu_percent=rng.random() * 100)
+        snapshots.append(ProcessSnapshot.from_dicts(float(tick), processes, strings))
+    return snapshots
+
+
+def scan(snapshot, needle):
+    needle = needle.lower()
+    matches = set()
+    for pid in snapshot:
+        process = snapshot[pid]
+        for field in ('name', 'cmdline', 'username'):
+            if needle in (process.get(field) or '').lower():
+                matches.add(pid)
+                break
+    return matches
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--ticks', type=int, default=20)
+    parser.add_argument('--churn', type=float, default=0.01, help="fraction of processes replaced per tick")
+    args = parser.parse_args()
+
+    snapshots = make_snapshots(args.rows, args.ticks, args.churn)
+    index = ProcessIndex()
+    _, build_ms = timed(index.apply, snapshots[0])
+
+    scan_ms = keystroke_ms = 0.0
+    for length in range(1, len(TYPED) + 1):
+        expected, elapsed = timed(scan, snapshots[0], TYPED[:length])
+        scan_ms = max(scan_ms, elapsed)
+        query = ProcessQuery(TYPED[:length])
+        _, elapsed = timed(query.update, index, snapshots[0])
+        keystroke_ms = max(keystroke_ms, elapsed)
+        assert query.matches == expected
+
+    query = ProcessQuery(f"{TYPED} cpu>50 mem>1G")
+    query.update(index, snapshots[0])
+    apply_ms = update_ms = 0.0
+    for snapshot in snapshots[1:]:
+        apply_ms += timed(index.apply, snapshot)[1]
+        update_ms += timed(query.update, index, snapshot)[1]
+
+    print(f"rows {args.rows}  ticks {args.ticks}  churn {args.churn:.1%}")
+    print(f"     index: {build_ms:8.2f} ms to build")
+    print(f"      scan: {scan_ms:8.2f} ms per keystroke (slowest prefix of '{TYPED}')")
+    print(f" keystroke: {keystroke_ms:8.2f} ms per keystroke (slowest prefix of '{TYPED}')")
+    print(f"      tick: {(apply_ms + update_ms) / args.ticks:8.2f} ms/tick  "
+          f"(index {apply_ms / args.ticks:.2f} + '{query.text}' {update_ms / args.ticks:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Measure cpu.py frame cost: full rebuild-and-redraw versus in-place sections and line diffs.
+
+    python benchmarks/bench_tui.py [--frames 200] [--cores 8] [--width 160] [--height 60] [--bandwidth 128]
+
+"rebuild" builds every table and writes the whole screen each frame, as the
+old rich Live loop did. "diff" updates a persistent Dashboard and lets
+DiffScreen write only the changed lines, skipping frames that repeat the
+previous tick.
+Output goes to an in-memory terminal; --bandwidth (KB/s) turns the bytes
+written per frame into the time an SSH link would need to carry them.
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rich.console import Console
+
+from cpu import Dashboard, DiffScreen
+
+
+def make_infos(frames, cores, idle, seed=1):
+    """Yield frames info dicts; with idle, most frames repeat the previous values."""
+    rng = random.Random(seed)
+    sent = recv = 1000.0
+    info = None
+    for frame in range(frames):
+        if info is not None and idle and rng.random() < idle:
+            yield info
+            continue
+        sent += rng.random() * 10
+        recv += rng.random() * 20
+        per_core = [round(rng.random() * 100, 1) for _ in range(cores)]
+        info = {
+            "timestamp": float(frame),
+            "cpu_percentages": per_core,
+            "cpu_total": round(sum(per_core) / cores, 1),
+            "memory": {"total": 31.2, "used": round(12 + rng.random(), 2), "free": 18.4, "cached": 6.1},
+            "network": {
+                "sent": round(sent, 2), "recv": round(recv, 2),
+                "sent_rate": rng.random() * 100, "recv_rate": rng.random() * 200,
+                "interfaces": {"eth0": rng.random() * 300, "wlan0": rng.random() * 10},
+            },
+            "battery": {"percent": 87, "status": "Charging"},
+            "temperature": {"cpu": 54.0},
+            "processes": [(f"proc-{i}", round(rng.random() * 50, 1), round(rng.random() * 5, 1)) for i in range(5)],
+            "sampling": {"interval": 1.0, "overhead_percent": 0.4},
+            "age": 0.1,
+            "stale": {},
+            "cgroup": None,
+            "containers": [],
+        }
+        yield info
+
+
+def make_console(width, height):
+    return Console(file=io.StringIO(), force_terminal=True, color_system="truecolor",
+                   width=width, height=height)
+
+
+def run_rebuild(infos, width, height):
+    console = make_console(width, height)
+    written = 0
+    dashboard = Dashboard()
+    for info in infos:
+        # Rebuild every table from scratch while keeping the sparkline history
+        for section in dashboard.sections:
+            section.invalidate()
+        dashboard.timestamp = None
+        dashboard.update(info)
+        console.file.seek(0)
+        console.file.truncate()
+        console.print("\x1b[H", end="")  # Live moves the cursor home, then rewrites everything
+        console.print(dashboard.layout, crop=True, height=height)
+        written += len(console.file.getvalue().encode())
+    return written
+
+
+def run_diff(infos, width, height):
+    console = make_console(width, height)
+    screen = DiffScreen(console)
+    dashboard = Dashboard()
+    written = 0
+    drawn = 0
+    for info in infos:
+        if dashboard.update(info):
+            written += screen.draw(dashboard.layout)
+            drawn += 1
+    return written, drawn
+
+
+def report(label, frames, elapsed, cpu, written, bandwidth, drawn=None):
+    wire_ms = written / frames / (bandwidth * 1024) * 1000
+    drawn_text = f"  {drawn}/{frames} drawn" if drawn is not None else ""
+    print(f"{label:>12}: {frames / elapsed:8.1f} frames/s  {cpu / frames * 1000:6.2f} ms CPU/frame  "
+          f"{written / frames:8.0f} B/frame  {wire_ms:7.1f} ms on the wire{drawn_text}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--cores', type=int, default=8)
+    parser.add_argument('--width', type=int, default=160)
+    parser.add_argument('--height', type=int, default=60)
+    parser.add_argument('--bandwidth', type=float, default=128, help="link speed in KB/s for the wire estimate")
+    parser.add_argument('--idle', type=float, default=0.5, help="fraction of frames whose data repeats")
+    args = parser.parse_args()
+
+    infos = list(make_infos(args.frames, args.cores, args.idle))
+    print(f"{args.frames} frames, {args.cores} cores, {args.width}x{args.height}, "
+          f"{args.idle:.0%} repeated frames, {args.bandwidth:g} KB/s link")
+
+    for label, runner in (
+        ('rebuild', lambda: (run_rebuild(infos, args.width, args.height), None)),
+        ('diff', lambda: run_diff(infos, args.width, args.height)),
+    ):
+        start, cpu_start = time.perf_counter(), time.process_time()
+        written, drawn = runner()
+        report(label, args.frames, time.perf_counter() - start, time.process_time() - cpu_start,
+               written, args.bandwidth, drawn)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,468 @@
+"""Cgroup v2 readers: resource usage of whole units straight from cgroupfs.
+
+The kernel already accounts CPU time, memory and block IO per cgroup, and
+systemd gives every service its own cgroup under system.slice, so
+ServiceSampler reports per-service usage from a handful of small files per
+unit (cgroup.procs, cpu.stat, memory.current, io.stat) instead of walking
+and summing every process. Files are read through one reused buffer.
+
+CgroupSampler covers the cgroup the monitor itself runs in: inside a
+container that is the container, whose CPU quota, throttling, memory limit
+and pressure (PSI) matter more than host-wide figures. ContainerSampler
+reports the same numbers for every container cgroup on a host. Both keep
+each cgroup's files open between ticks and re-read them with preadv, so a
+tick costs one read per file and no path lookups.
+
+Every reader takes the cgroupfs root as an argument, so a fake directory
+tree with the same file names stands in for /sys/fs/cgroup.
+"""
+import errno
+import os
+import re
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+SERVICES_SLICE = 'system.slice'
+PRESSURE_RESOURCES = ('cpu', 'memory', 'io')
+# Files behind CgroupSampler and ContainerSampler, read every tick
+LIMIT_FILES = ('cpu.stat', 'cpu.max', 'memory.current', 'memory.max') + tuple(
+    f'{resource}.pressure' for resource in PRESSURE_RESOURCES)
+# Container cgroups as named by systemd-managed runtimes (docker-<id>.scope,
+# libpod-, cri-containerd-, crio-), the cgroupfs drivers (/docker/<id>,
+# kubepods/.../<id>), systemd-nspawn and libvirt machines and LXC
+CONTAINER_PATTERN = re.compile(
+    r'^(?:(?P<runtime>docker|libpod|cri-containerd|crio)-(?P<id>[0-9a-f]{12,64})\.scope'
+    r'|(?P<bare>[0-9a-f]{64})'
+    r'|machine-(?P<machine>.+)\.scope'
+    r'|lxc\.payload\.(?P<lxc>.+))$'
+)
+CONTAINER_ID_CHARS = 12
+
+
+def unified_root(root=CGROUP_ROOT):
+    """Return the cgroup v2 hierarchy under root, or None without one.
+
+    That is root itself on unified hosts and root/unified on hybrid ones,
+    where systemd still keeps its unit cgroups in v2 but most controllers
+    live in v1 (so CPU, memory and IO files may be missing).
+    """
+    for path in (root, os.path.join(root, 'unified')):
+        if os.path.isfile(os.path.join(path, 'cgroup.procs')) and os.path.isfile(os.path.join(path, 'cgroup.controllers')):
+            return path
+    return None
+
+
+def parse_keyed(data):
+    """Parse "key value" lines (cpu.stat, memory.stat) into {key: int}."""
+    values = {}
+    for line in data.splitlines():
+        key, _, value = line.partition(b' ')
+        if value:
+            try:
+                values[key.decode()] = int(value)
+            except ValueError:
+                pass
+    return values
+
+
+def parse_io_stat(data):
+    """Return (read_bytes, write_bytes) summed over every device in io.stat."""
+    read_bytes = write_bytes = 0
+    for line in data.splitlines():
+        for field in line.split()[1:]:
+            key, _, value = field.partition(b'=')
+            if key == b'rbytes':
+                read_bytes += int(value)
+            elif key == b'wbytes':
+                write_bytes += int(value)
+    return read_bytes, write_bytes
+
+
+def parse_pressure(data):
+    """Parse a PSI file into {'some': {'avg10', 'avg60', 'avg300', 'total'}, 'full': {...}}.
+
+    Averages are percentages of wall time with tasks stalled on the resource;
+    total is cumulative stall time in microseconds. cpu.pressure has no
+    'full' line on older kernels.
+    """
+    pressure = {}
+    for line in data.splitlines():
+        kind, *fields = line.split()
+        values = {}
+        for field in fields:
+            key, _, value = field.partition(b'=')
+            values[key.decode()] = int(value) if key == b'total' else float(value)
+        pressure[kind.decode()] = values
+    return pressure
+
+
+def parse_cpu_max(data):
+    """Return the CPU limit in cores from cpu.max ("quota period"), or None for "max"."""
+    fields = data.split()
+    if len(fields) < 2 or fields[0] == b'max':
+        return None
+    return int(fields[0]) / int(fields[1])
+
+
+def parse_limit(data):
+    """Return a byte limit such as memory.max as an int, or None for "max"."""
+    data = data.strip()
+    return None if data == b'max' else int(data)
+
+
+def own_cgroup(proc_root='/proc'):
+    """Return this process's cgroup v2 path (the "0::" line of /proc/self/cgroup), or None."""
+    try:
+        with open(os.path.join(proc_root, 'self', 'cgroup'), 'rb') as f:
+            for line in f:
+                if line.startswith(b'0::'):
+                    return line[3:].strip().decode()
+    except OSError:
+        pass
+    return None
+
+
+def container_name(name):
+    """Return (runtime, id) if a cgroup directory name is a container's, else None."""
+    match = CONTAINER_PATTERN.match(name)
+    if match is None:
+        return None
+    if match.group('runtime'):
+        return match.group('runtime'), match.group('id')[:CONTAINER_ID_CHARS]
+    if match.group('bare'):
+        return 'container', match.group('bare')[:CONTAINER_ID_CHARS]
+    if match.group('machine'):
+        # systemd escapes '-' in machine names as \x2d
+        return 'machine', match.group('machine').replace('\\x2d', '-')
+    return 'lxc', match.group('lxc')
+
+
+class CgroupReader:
+    """Read cgroupfs files into one reusable buffer."""
+
+    def __init__(self, buffer_size=65536):
+        self._buf = bytearray(buffer_size)
+        self._bufs = [self._buf]
+
+    def read(self, path):
+        """Return the contents of path, or None if it does not exist (controller off, cgroup gone)."""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return None
+        try:
+            n = os.readv(fd, self._bufs)
+            if n < len(self._buf):
+                return bytes(memoryview(self._buf)[:n])
+            # Larger than the buffer (cgroup.procs of a busy unit); fall back to a full read
+            chunks = [bytes(self._buf)]
+            while True:
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            return b''.join(chunks)
+        except OSError:
+            return None
+        finally:
+            os.close(fd)
+
+    def read_at(self, fd):
+        """Re-read a small cgroupfs file kept open from its start; raises OSError once the cgroup is gone."""
+        n = os.preadv(fd, self._bufs, 0)
+        return bytes(memoryview(self._buf)[:n])
+
+    def pids(self, path):
+        """Pids in the cgroup at path and every cgroup below it."""
+        pids = []
+        for directory, _, _ in os.walk(path):
+            data = self.read(os.path.join(directory, 'cgroup.procs'))
+            if data:
+                pids.extend(int(pid) for pid in data.split())
+        return pids
+
+    def usage(self, path):
+        """Cumulative usage of the cgroup at path, including its descendants.
+
+        Returns {'cpu_usec', 'memory_bytes', 'io_read_bytes', 'io_write_bytes'};
+        a value is None when its controller is not enabled for the cgroup.
+        """
+        usage = {'cpu_usec': None, 'memory_bytes': None, 'io_read_bytes': None, 'io_write_bytes': None}
+        data = self.read(os.path.join(path, 'cpu.stat'))
+        if data:
+            usage['cpu_usec'] = parse_keyed(data).get('usage_usec')
+        data = self.read(os.path.join(path, 'memory.current'))
+        if data:
+            usage['memory_bytes'] = int(data)
+        data = self.read(os.path.join(path, 'io.stat'))
+        if data is not None:
+            usage['io_read_bytes'], usage['io_write_bytes'] = parse_io_stat(data)
+        return usage
+
+
+def list_units(slice_path, suffix='.service'):
+    """Return [(unit, path)] for units under slice_path, including those in nested slices."""
+    units = []
+    pending = [slice_path]
+    while pending:
+        try:
+            entries = list(os.scandir(pending.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            if entry.name.endswith(suffix):
+                units.append((entry.name, entry.path))
+            elif entry.name.endswith('.slice'):
+                pending.append(entry.path)
+    units.sort()
+    return units
+
+
+def _rate(current, previous, elapsed):
+    if current is None or previous is None or elapsed <= 0:
+        return None
+    return max(current - previous, 0) / elapsed
+
+
+class ServiceSampler:
+    """Per-service CPU, memory and IO usage from the cgroups of system.slice.
+
+    sample() returns one dict per running unit: 'name', 'pids',
+    'cpu_percent', 'memory_bytes', 'io_read_rate' and 'io_write_rate'.
+    Rates need two samples, so they are None on a unit's first one.
+    """
+
+    def __init__(self, root=CGROUP_ROOT, slice_name=SERVICES_SLICE):
+        unified = unified_root(root)
+        self.slice_path = os.path.join(unified, slice_name) if unified else None
+        self.reader = CgroupReader()
+        self._previous = {}  # unit -> (timestamp, usage)
+
+    def is_available(self):
+        return self.slice_path is not None and os.path.isdir(self.slice_path)
+
+    def sample(self, current_time):
+        if not self.is_available():
+            return []
+        services = []
+        previous = self._previous
+        self._previous = {}
+        for unit, path in list_units(self.slice_path):
+            pids = self.reader.pids(path)
+            if not pids:
+                continue  # Loaded but inactive units keep an empty cgroup
+            usage = self.reader.usage(path)
+            self._previous[unit] = (current_time, usage)
+            last_time, last_usage = previous.get(unit, (None, {}))
+            elapsed = current_time - last_time if last_time is not None else 0.0
+            cpu_rate = _rate(usage['cpu_usec'], last_usage.get('cpu_usec'), elapsed)
+            services.append({
+                'name': unit,
+                'pids': pids,
+                'cpu_percent': None if cpu_rate is None else cpu_rate / 1e6 * 100,  # usec per second
+                'memory_bytes': usage['memory_bytes'],
+                'io_read_rate': _rate(usage['io_read_bytes'], last_usage.get('io_read_bytes'), elapsed),
+                'io_write_rate': _rate(usage['io_write_bytes'], last_usage.get('io_write_bytes'), elapsed),
+            })
+        return services
+
+
+def _delta(current, previous, key):
+    if previous is None or key not in current or key not in previous:
+        return None
+    return max(current[key] - previous[key], 0)
+
+
+class CgroupFiles:
+    """The LIMIT_FILES of one cgroup, opened once and re-read in place every tick.
+
+    Files a kernel or controller does not provide are remembered as missing
+    and not retried. Any other error closes the file, which is opened again
+    on the next read. sample() returns None while cpu.stat cannot be read,
+    which is how a removed cgroup shows up.
+    """
+
+    def __init__(self, path, reader):
+        self.path = path
+        self.reader = reader
+        self.fds = {}
+        self.missing = set()
+        self._previous = None  # (timestamp, cpu.stat)
+
+    def read(self, name):
+        if name in self.missing:
+            return None
+        fd = self.fds.get(name)
+        if fd is None:
+            try:
+                fd = self.fds[name] = os.open(os.path.join(self.path, name), os.O_RDONLY)
+            except OSError as e:
+                if e.errno in (errno.ENOENT, errno.ENODEV):
+                    # Root cgroup, controller off, or the cgroup is gone
+                    self.missing.add(name)
+                return None
+        try:
+            return self.reader.read_at(fd)
+        except OSError as e:
+            os.close(self.fds.pop(name))
+            if e.errno == errno.EOPNOTSUPP:
+                self.missing.add(name)  # Pressure files with PSI disabled at boot
+            return None
+
+    def close(self):
+        for fd in self.fds.values():
+            os.close(fd)
+        self.fds = {}
+
+    def sample(self, current_time, cpu_count, memory_total):
+        """Return usage against the cgroup's limits, or None if it is gone.
+
+        The dict holds 'cpu_cores' (cores busy), 'cpu_limit' (cores, None
+        when unlimited), 'cpu_percent' (of the limit, else of cpu_count),
+        the cumulative 'nr_throttled' and 'throttled_usec', 'throttled_percent'
+        (enforcement periods throttled since the last tick), 'memory_current',
+        'memory_max' (None when unlimited), 'memory_percent' (of the limit,
+        else of memory_total) and 'pressure' ({resource: parse_pressure()}).
+        Rates need two samples, so they are None on the first one.
+        """
+        data = self.read('cpu.stat')
+        if data is None:
+            return None
+        cpu = parse_keyed(data)
+        previous_time, previous = self._previous or (current_time, None)
+        self._previous = (current_time, cpu)
+
+        data = self.read('cpu.max')
+        cpu_limit = parse_cpu_max(data) if data else None
+        cpu_rate = _rate(cpu.get('usage_usec'), previous and previous.get('usage_usec'),
+                         current_time - previous_time)
+        cpu_cores = None if cpu_rate is None else cpu_rate / 1e6
+        capacity = cpu_limit or cpu_count
+        periods = _delta(cpu, previous, 'nr_periods')
+        throttled = _delta(cpu, previous, 'nr_throttled')
+
+        data = self.read('memory.current')
+        memory_current = int(data) if data else None
+        data = self.read('memory.max')
+        memory_max = parse_limit(data) if data else None
+        memory_capacity = memory_max or memory_total
+
+        pressure = {}
+        for resource in PRESSURE_RESOURCES:
+            data = self.read(f'{resource}.pressure')
+            if data:
+                pressure[resource] = parse_pressure(data)
+
+        return {
+            'cpu_cores': cpu_cores,
+            'cpu_limit': cpu_limit,
+            'cpu_percent': None if cpu_cores is None or not capacity else cpu_cores / capacity * 100,
+            'nr_throttled': cpu.get('nr_throttled'),
+            'throttled_usec': cpu.get('throttled_usec'),
+            'throttled_percent': throttled / periods * 100 if periods else (None if periods is None else 0.0),
+            'memory_current': memory_current,
+            'memory_max': memory_max,
+            'memory_percent': (None if memory_current is None or not memory_capacity
+                               else memory_current / memory_capacity * 100),
+            'pressure': pressure,
+        }
+
+
+def find_containers(root):
+    """Return [(runtime, id, path)] for container cgroups anywhere under root, without descending into them."""
+    containers = []
+    pending = [root]
+    while pending:
+        try:
+            entries = list(os.scandir(pending.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            name = container_name(entry.name)
+            if name is not None:
+                containers.append(name + (entry.path,))
+            else:
+                pending.append(entry.path)
+    containers.sort()
+    return containers
+
+
+class CgroupSampler:
+    """Limits and usage of the container this process runs in.
+
+    A container is recognised by the cgroup namespace (the visible cgroupfs
+    root is itself a non-root cgroup, so it has cgroup.type) or by a
+    container cgroup in this process's own cgroup path. On a host neither
+    holds and is_containerized() is False.
+    """
+
+    def __init__(self, root=CGROUP_ROOT, proc_root='/proc'):
+        self.files = None
+        unified = unified_root(root)
+        if unified is None:
+            return
+        path = unified
+        if os.path.isfile(os.path.join(unified, 'cgroup.type')):
+            containerized = True
+        else:
+            containerized = False
+            for part in (own_cgroup(proc_root) or '').strip('/').split('/'):
+                if not part:
+                    continue
+                path = os.path.join(path, part)
+                if container_name(part) is not None:
+                    containerized = os.path.isdir(path)
+                    break
+        if containerized:
+            self.files = CgroupFiles(path, CgroupReader(4096))
+
+    def is_containerized(self):
+        return self.files is not None
+
+    def sample(self, current_time, cpu_count, memory_total):
+        """CgroupFiles.sample() of the enclosing container, plus its 'path'; None on a host."""
+        if self.files is None:
+            return None
+        stats = self.files.sample(current_time, cpu_count, memory_total)
+        if stats is not None:
+            stats['path'] = self.files.path
+        return stats
+
+
+class ContainerSampler:
+    """Per-container limits and usage for every container cgroup on a host.
+
+    sample() returns one CgroupFiles.sample() dict per container with its
+    'runtime', 'name' and 'path' added. Files of containers that went away
+    are closed on the next sample.
+    """
+
+    def __init__(self, root=CGROUP_ROOT):
+        self.root = unified_root(root)
+        self.reader = CgroupReader(4096)
+        self.files = {}  # path -> CgroupFiles
+
+    def is_available(self):
+        return self.root is not None
+
+    def sample(self, current_time, cpu_count, memory_total):
+        if self.root is None:
+            return []
+        containers = []
+        files = {}
+        for runtime, name, path in find_containers(self.root):
+            cgroup = self.files.pop(path, None) or CgroupFiles(path, self.reader)
+            stats = cgroup.sample(current_time, cpu_count, memory_total)
+            if stats is None:
+                cgroup.close()
+                continue
+            files[path] = cgroup
+            stats.update(runtime=runtime, name=name, path=os.path.relpath(path, self.root))
+            containers.append(stats)
+        for cgroup in self.files.values():
+            cgroup.close()
+        self.files = files
+        return containers
@@ -0,0 +1,730 @@
+"""GUI-free sampling core shared by cpu.py, cpuchart.py and headless consumers.
+
+A Collector samples the host once per tick and hands the resulting snapshots
+to every subscriber, so attaching more viewers never multiplies the psutil
+work. Nothing in here may import Qt, rich or wmi.
+"""
+import threading
+import time
+
+import psutil
+
+from aggregates import summarize
+from cgroups import CgroupSampler, ContainerSampler
+from rates import fill_rates
+from snapshot import ProcessSnapshotBuilder, recycle_strings
+
+
+# System-wide snapshot produced by SystemSampler
+class SystemSnapshot:
+    __slots__ = (
+        'timestamp', 'cpu_percent', 'cpu_per_core', 'cpu_times', 'cpu_count', 'cpu_freq',
+        'memory', 'swap', 'disk', 'disk_partitions', 'network', 'network_interfaces', 'net_totals',
+        'load_avg', 'battery', 'temperatures', 'cgroup', 'containers', 'stale'
+    )
+
+    def __init__(self, timestamp):
+        self.timestamp = timestamp
+        for name in self.__slots__[1:]:
+            setattr(self, name, None)
+
+    def as_dict(self):
+        """Return the perf_data dict shape the Qt dashboard consumes."""
+        perf_data = {}
+        for name in self.__slots__[1:]:
+            value = getattr(self, name)
+            if value is not None and name != 'net_totals':
+                perf_data[name] = value
+        return perf_data
+
+
+# Reads that can block for seconds (hung NFS mounts, slow sensor drivers) run on
+# their own BackgroundProbe thread; PROBE_TIMEOUT is how long one may run before
+# its value is reported stale
+PROBE_TIMEOUT = 2.0
+
+
+def read_disk_partitions():
+    disk_partitions = []
+    for part in psutil.disk_partitions():
+        try:
+            usage = psutil.disk_usage(part.mountpoint)
+            disk_partitions.append({
+                'device': part.device,
+                'mountpoint': part.mountpoint,
+                'fstype': part.fstype,
+                'total': usage.total,
+                'used': usage.used,
+                'free': usage.free,
+                'percent': usage.percent
+            })
+        except (PermissionError, FileNotFoundError, OSError):
+            continue
+    return disk_partitions
+
+
+def read_battery():
+    if not hasattr(psutil, 'sensors_battery'):
+        return None
+    try:
+        battery = psutil.sensors_battery()
+    except (AttributeError, OSError):
+        return None
+    if not battery:
+        return None
+    return {
+        'percent': battery.percent,
+        'power_plugged': battery.power_plugged,
+        'secsleft': battery.secsleft
+    }
+
+
+def read_temperatures():
+    if not hasattr(psutil, 'sensors_temperatures'):
+        return None
+    try:
+        return psutil.sensors_temperatures() or None
+    except (AttributeError, OSError):
+        return None
+
+
+class BackgroundProbe:
+    """Run one slow read off the sampling thread.
+
+    read() never blocks past the first result: it returns the last value that
+    finished and asks for a fresh one, which is computed during the pause
+    before the next tick. While a call has been running longer than timeout,
+    running_for() reports how long, and no second call is started behind it.
+    """
+
+    def __init__(self, name, function, timeout=PROBE_TIMEOUT):
+        self.name = name
+        self.function = function
+        self.timeout = timeout
+        self.value = None
+        self.started = None
+        self._requested = threading.Event()
+        self._first_result = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"probe-{name}", daemon=True)
+        self._thread.start()
+        self._requested.set()
+
+    def _run(self):
+        while True:
+            self._requested.wait()
+            self._requested.clear()
+            self.started = time.monotonic()
+            try:
+                self.value = self.function()
+            except Exception:
+                pass
+            self.started = None
+            self._first_result.set()
+
+    def read(self):
+        self._first_result.wait(self.timeout)
+        self._requested.set()
+        return self.value
+
+    def running_for(self):
+        """Seconds the current call has run if it is past timeout, else None."""
+        started = self.started
+        if started is None:
+            return None
+        elapsed = time.monotonic() - started
+        return elapsed if elapsed > self.timeout else None
+
+
+# One collector tick: both snapshots taken at the same moment, the process
+# aggregates (see aggregates.summarize) and the collector's own cost
+# ({'interval', 'sample_time', 'cpu_time', 'overhead_percent'})
+class Snapshot:
+    __slots__ = ('timestamp', 'system', 'processes', 'stats', 'aggregates')
+
+    def __init__(self, timestamp, system, processes, stats=None, aggregates=None):
+        self.timestamp = timestamp
+        self.system = system
+        self.processes = processes
+        self.stats = stats
+        self.aggregates = aggregates
+
+
+# With cgroup=True, a SystemSampler running inside a container reports the
+# container's CPU quota and memory limit in place of the host's, with the full
+# figures (throttling, pressure) in SystemSnapshot.cgroup; on a host it lists
+# every container in SystemSnapshot.containers. See cgroups.py for the fields.
+class SystemSampler:
+    def __init__(self, probe_timeout=PROBE_TIMEOUT, cgroup=False):
+        self.probes = {
+            'disk_partitions': BackgroundProbe('disk_partitions', read_disk_partitions, probe_timeout),
+            'battery': BackgroundProbe('battery', read_battery, probe_timeout),
+            'temperatures': BackgroundProbe('temperatures', read_temperatures, probe_timeout)
+        }
+        self.cgroup_sampler = None
+        self.container_sampler = None
+        if cgroup:
+            self.cgroup_sampler = CgroupSampler()
+            if not self.cgroup_sampler.is_containerized():
+                self.container_sampler = ContainerSampler()
+        self.prev_disk_io = None
+        self.prev_net_io = None
+        self.prev_nic_io = {}
+        self.prev_time = time.time()
+
+    def sample(self, current_time):
+        snap = SystemSnapshot(current_time)
+
+        # CPU
+        snap.cpu_percent = psutil.cpu_percent(interval=None)
+        snap.cpu_per_core = psutil.cpu_percent(interval=None, percpu=True)
+        # Breakdown of CPU time; iowait and steal only exist on Linux
+        cpu_times = psutil.cpu_times_percent(interval=None)
+        snap.cpu_times = {
+            'user': cpu_times.user,
+            'system': cpu_times.system,
+            'iowait': getattr(cpu_times, 'iowait', 0.0),
+            'steal': getattr(cpu_times, 'steal', 0.0)
+        }
+        snap.cpu_count = psutil.cpu_count()
+        snap.cpu_freq = psutil.cpu_freq()
+
+        # Memory
+        memory = psutil.virtual_memory()
+        snap.memory = {
+            'total': memory.total,
+            'available': memory.available,
+            'used': memory.used,
+            'percent': memory.percent,
+            'free': memory.free
+        }
+        # On Linux, we can access cached memory
+        if hasattr(memory, 'cached'):
+            snap.memory['cached'] = memory.cached
+
+        # Swap
+        swap = psutil.swap_memory()
+        snap.swap = {
+            'total': swap.total,
+            'used': swap.used,
+            'free': swap.free,
+            'percent': swap.percent
+        }
+
+        # Container limits
+        if self.cgroup_sampler is not None:
+            self.sample_cgroup(snap, current_time)
+
+        time_diff = current_time - self.prev_time
+
+        # Disk
+        disk_io = psutil.disk_io_counters()
+        if disk_io is not None and self.prev_disk_io is not None and time_diff > 0:
+            snap.disk = {
+                'read_bytes': disk_io.read_bytes,
+                'write_bytes': disk_io.write_bytes,
+                'read_count': disk_io.read_count,
+                'write_count': disk_io.write_count,
+                'read_rate': (disk_io.read_bytes - self.prev_disk_io.read_bytes) / time_diff,
+                'write_rate': (disk_io.write_bytes - self.prev_disk_io.write_bytes) / time_diff
+            }
+        self.prev_disk_io = disk_io
+
+
+        # Network
+        net_io = psutil.net_io_counters()
+        snap.net_totals = {
+            'bytes_sent': net_io.bytes_sent,
+            'bytes_recv': net_io.bytes_recv
+        }
+        if self.prev_net_io is not None and time_diff > 0:
+            snap.network = {
+                'bytes_sent': net_io.bytes_sent,
+                'bytes_recv': net_io.bytes_recv,
+                'packets_sent': net_io.packets_sent,
+                'packets_recv': net_io.packets_recv,
+                'bytes_sent_rate': (net_io.bytes_sent - self.prev_net_io.bytes_sent) / time_diff,
+                'bytes_recv_rate': (net_io.bytes_recv - self.prev_net_io.bytes_recv) / time_diff
+            }
+        self.prev_net_io = net_io
+
+        # Per-interface rates
+        nic_io = psutil.net_io_counters(pernic=True)
+        if self.prev_nic_io and time_diff > 0:
+            snap.network_interfaces = {}
+            for nic, counters in nic_io.items():
+                previous = self.prev_nic_io.get(nic)
+                if previous is None:
+                    continue
+                snap.network_interfaces[nic] = {
+                    'bytes_sent_rate': (counters.bytes_sent - previous.bytes_sent) / time_diff,
+                    'bytes_recv_rate': (counters.bytes_recv - previous.bytes_recv) / time_diff
+                }
+        self.prev_nic_io = nic_io
+
+        # System load over time (1, 5, 15 min averages)
+        try:
+            snap.load_avg = psutil.getloadavg()
+        except (AttributeError, OSError):
+            pass
+
+        # Disk usage for all partitions, battery and temperature sensors come
+        # from background probes; ones stuck past their timeout are listed in stale
+        stale = {}
+        for name, probe in self.probes.items():
+            setattr(snap, name, probe.read())
+            running_for = probe.running_for()
+            if running_for is not None:
+                stale[name] = running_for
+        snap.stale = stale or None
+
+        self.prev_time = current_time
+        return snap
+
+    def sample_cgroup(self, snap, current_time):
+        host_memory = snap.memory['total']
+        if self.container_sampler is not None:
+            snap.containers = self.container_sampler.sample(current_time, snap.cpu_count, host_memory)
+            return
+        cgroup = self.cgroup_sampler.sample(current_time, snap.cpu_count, host_memory)
+        snap.cgroup = cgroup
+        if cgroup is None:
+            return
+        if cgroup['cpu_percent'] is not None:
+            snap.cpu_percent = min(cgroup['cpu_percent'], 100.0)
+        if cgroup['memory_current'] is not None:
+            total = min(cgroup['memory_max'] or host_memory, host_memory)
+            available = max(total - cgroup['memory_current'], 0)
+            # The host's page cache figure says nothing about the container, so it is dropped
+            snap.memory = {
+                'total': total,
+                'available': available,
+                'used': cgroup['memory_current'],
+                'percent': round(min(cgroup['memory_current'] / total * 100, 100.0), 1),
+                'free': available
+            }
+
+
+# Refresh tiers for per-process fields. Immutable fields are read once per
+# (pid, create_time), slow fields every SLOW_REFRESH_TICKS ticks, and status,
+# CPU, memory and IO on every tick.
+IMMUTABLE_FIELDS = ('name', 'create_time', 'cmdline', 'username')
+SLOW_FIELDS = ('cwd', 'cgroup')
+SLOW_REFRESH_TICKS = 5
+
+
+def parse_cgroup(data):
+    """Return the cgroup path from the contents of /proc/<pid>/cgroup.
+
+    Prefers the unified (v2) hierarchy, then systemd's v1 hierarchy, and skips
+    the root path on hybrid systems where one of them is unused.
+    """
+    paths = {}
+    for line in data.decode('utf-8', 'replace').splitlines():
+        hierarchy, _, rest = line.partition(':')
+        controllers, _, path = rest.partition(':')
+        paths.setdefault('unified' if hierarchy == '0' else controllers, path)
+    candidates = [paths.pop('unified', None), paths.pop('name=systemd', None)] + list(paths.values())
+    candidates = [path for path in candidates if path]
+    for path in candidates:
+        if path != '/':
+            return path
+    return candidates[0] if candidates else None
+
+
+def read_cgroup(pid, root='/proc'):
+    """Return the cgroup path of pid, or None where there are no cgroups."""
+    try:
+        with open(f"{root}/{pid}/cgroup", 'rb') as f:
+            return parse_cgroup(f.read())
+    except OSError:
+        return None
+
+
+class FieldCache:
+    """Per-process cache of immutable and slow fields, keyed on (pid, create_time).
+
+    Keying on create_time as well as pid means a recycled pid starts with an
+    empty cache instead of inheriting the previous owner's cmdline.
+    """
+
+    def __init__(self, slow_every=SLOW_REFRESH_TICKS):
+        self.slow_every = max(1, slow_every)
+        self.tick = 0
+        self.started = 0
+        self.exited = 0
+        self._fields = {}
+        self._live = {}
+
+    def start_tick(self):
+        self.tick += 1
+        self._live = {}
+
+    def get(self, pid, create_time):
+        """Return (fields, is_new) for the process identified by (pid, create_time).
+
+        A new process's fields are only kept once add() is called, so one
+        whose immutable fields could not be read is retried next tick.
+        """
+        key = (pid, create_time)
+        fields = self._fields.get(key)
+        if fields is None:
+            return {}, True
+        self._live[key] = fields
+        return fields, False
+
+    def add(self, pid, create_time, fields):
+        self._live[(pid, create_time)] = fields
+
+    def slow_due(self, pid, is_new):
+        # Stagger slow refreshes by pid so they do not all land on one tick
+        return is_new or (pid + self.tick) % self.slow_every == 0
+
+    def finish_tick(self):
+        # Forget processes that exited or whose pid was reused
+        live = self._live
+        self.started = sum(1 for key in live if key not in self._fields)
+        self.exited = sum(1 for key in self._fields if key not in live)
+        self._fields = live
+
+
+class PsutilSocketIndex:
+    """Socket index built from one system-wide net_connections() call per tick."""
+
+    def __init__(self):
+        self.connections = {}
+        self.queued = {}
+
+    def refresh(self, pids):
+        counts = {}
+        try:
+            for conn in psutil.net_connections('inet'):
+                if conn.pid is not None:
+                    counts[conn.pid] = counts.get(conn.pid, 0) + 1
+        except psutil.AccessDenied:
+            # macOS needs root for system-wide connections
+            pass
+        self.connections = counts
+
+
+def make_socket_index():
+    """Return the cheapest socket index for this platform."""
+    import procfs
+    root = getattr(psutil, 'PROCFS_PATH', '/proc')
+    if procfs.is_available(root):
+        return procfs.SocketIndex(procfs.ProcfsReader(root))
+    return PsutilSocketIndex()
+
+
+class ProcessSampler:
+    def __init__(self, slow_every=SLOW_REFRESH_TICKS):
+        self.previous = None
+        self.strings = None
+        self.cache = FieldCache(slow_every)
+        self.sockets = make_socket_index()
+        self.processes = {}  # pid -> psutil.Process, reused across ticks
+
+    def live_processes(self):
+        """Return the Process objects for every running pid, reusing last tick's.
+
+        Keeping the objects here rather than in psutil's global process_iter()
+        cache means no other caller can reset them between ticks. A pid reused
+        by a new process gets a fresh object, and pids that disappeared are
+        dropped.
+        """
+        cached = self.processes
+        live = {}
+        for pid in psutil.pids():
+            proc = cached.get(pid)
+            try:
+                if proc is None or not proc.is_running():
+                    proc = psutil.Process(pid)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            live[pid] = proc
+        self.processes = live
+        return list(live.values())
+
+    def sample(self, current_time):
+        previous = self.previous
+        cache = self.cache
+        builder = ProcessSnapshotBuilder(self.strings)
+        numbers = builder.numbers
+        set_text = builder.set_text
+        total_memory = psutil.virtual_memory().total or 1
+        procs = self.live_processes()
+        self.sockets.refresh([proc.pid for proc in procs])
+        connections = self.sockets.connections
+        queued = self.sockets.queued
+        cache.start_tick()
+
+        for proc in procs:
+            row = None
+            try:
+                pid = proc.pid
+                with proc.oneshot():
+                    try:
+                        create_time = proc.create_time()
+                    except psutil.AccessDenied:
+                        create_time = 0.0
+                    fields, is_new = cache.get(pid, create_time)
+
+                    if is_new:
+                        fields['name'] = proc.name()
+                        if create_time:
+                            fields['create_time'] = create_time
+                        try:
+                            fields['username'] = proc.username() or 'N/A'
+                        except (psutil.AccessDenied, psutil.ZombieProcess, KeyError):
+                            fields['username'] = 'N/A'
+                        try:
+                            cmdline = proc.cmdline()
+                            fields['cmdline'] = ' '.join(cmdline) if cmdline else ''
+                        except (psutil.AccessDenied, psutil.ZombieProcess):
+                            pass
+                        cache.add(pid, create_time, fields)
+
+                    if cache.slow_due(pid, is_new):
+                        try:
+                            fields['cwd'] = proc.cwd()
+                        except (psutil.AccessDenied, psutil.ZombieProcess):
+                            pass
+                        fields['cgroup'] = read_cgroup(pid)
+
+                    status = proc.status()
+                    ppid = proc.ppid()
+                    cpu_times = proc.cpu_times()
+                    memory_bytes = proc.memory_info().rss
+
+                    row = builder.add(pid)
+                    builder.update(row, fields)
+                    set_text(row, 'status', status)
+                    numbers['ppid'][row] = ppid
+                    numbers['cpu_time'][row] = cpu_times.user + cpu_times.system
+                    numbers['memory_percent'][row] = memory_bytes / total_memory * 100
+                    numbers['memory_bytes'][row] = memory_bytes
+                    numbers['disk_usage'][row] = 0
+                    numbers['network_usage'][row] = queued.get(pid, 0)
+                    if pid in connections:
+                        numbers['network_connections'][row] = connections[pid]
+                    if create_time:
+                        numbers['running_time'][row] = current_time - create_time
+
+                    try:
+                        ctx_switches = proc.num_ctx_switches()
+                        numbers['ctx_switches'][row] = ctx_switches.voluntary + ctx_switches.involuntary
+                    except psutil.AccessDenied:
+                        pass
+
+                    # Get IO counters if available
+                    try:
+                        io = proc.io_counters()
+                        numbers['disk_read'][row] = io.read_bytes
+                        numbers['disk_write'][row] = io.write_bytes
+                        numbers['disk_usage'][row] = io.read_bytes + io.write_bytes
+                        numbers['read_ops'][row] = io.read_count
+                        numbers['write_ops'][row] = io.write_count
+                    except (psutil.AccessDenied, psutil.ZombieProcess, AttributeError):
+                        pass
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                if row is not None:
+                    builder.discard(row)
+                continue
+
+        cache.finish_tick()
+        # CPU, IO, context switch and page fault rates in one pass over the columns
+        fill_rates(builder, previous, current_time)
+        snapshot = builder.build(current_time)
+        # Store for next iteration for differential calculations
+        self.previous = snapshot
+        self.strings = recycle_strings(builder.strings, len(snapshot))
+        return snapshot
+
+
+PROCESS_BACKENDS = ('psutil', 'procfs')
+
+
+def make_process_sampler(backend='psutil'):
+    """Return a process sampler for backend ('psutil' or the Linux-only 'procfs')."""
+    if backend == 'procfs':
+        import procfs
+        if not procfs.is_available():
+            raise RuntimeError("The procfs backend needs a Linux /proc filesystem")
+        return procfs.ProcfsProcessSampler()
+    if backend != 'psutil':
+        raise ValueError(f"Unknown process backend: {backend}")
+    return ProcessSampler()
+
+
+# Adaptive sampling bounds and the activity that counts as busy or idle
+ADAPTIVE_MIN_INTERVAL = 0.25
+ADAPTIVE_MAX_INTERVAL = 5.0
+BUSY_CPU_PERCENT = 50.0
+IDLE_CPU_PERCENT = 10.0
+BUSY_IO_RATE = 10 * 1024**2   # Disk or network bytes/s
+IDLE_IO_RATE = 256 * 1024
+BUSY_CHURN = 5                # Processes started or exited in one tick
+
+
+class AdaptiveInterval:
+    """Pick the delay before the next tick from the activity seen in the last one.
+
+    A busy tick drops straight to min_interval, an idle tick backs off by
+    backoff towards max_interval, and anything in between returns to base.
+    All rates are computed from measured timestamps, so varying the interval
+    never skews them.
+    """
+
+    def __init__(self, base=1.0, min_interval=ADAPTIVE_MIN_INTERVAL,
+                 max_interval=ADAPTIVE_MAX_INTERVAL, backoff=1.5):
+        self.base = base
+        self.min_interval = min(min_interval, base)
+        self.max_interval = max(max_interval, base)
+        self.backoff = backoff
+        self.current = base
+
+    def next(self, system, churn):
+        cpu = system.cpu_percent or 0.0
+        io_rate = 0.0
+        if system.disk:
+            io_rate += system.disk['read_rate'] + system.disk['write_rate']
+        if system.network:
+            io_rate += system.network['bytes_sent_rate'] + system.network['bytes_recv_rate']
+
+        if cpu >= BUSY_CPU_PERCENT or io_rate >= BUSY_IO_RATE or churn >= BUSY_CHURN:
+            self.current = self.min_interval
+        elif cpu < IDLE_CPU_PERCENT and io_rate < IDLE_IO_RATE and churn == 0:
+            self.current = min(max(self.current, self.base) * self.backoff, self.max_interval)
+        else:
+            self.current = self.base
+        return self.current
+
+
+class Collector:
+    """Sample the host on one thread and fan snapshots out to subscribers.
+
+    Callbacks run on the collector thread; GUI front ends must marshal the
+    snapshot onto their own thread (cpuchart.py does this with a Qt signal).
+    With adaptive=True the tick interval follows host activity (see
+    AdaptiveInterval) instead of staying at interval. With cgroup=True the
+    system figures are container-aware (see SystemSampler).
+    """
+
+    def __init__(self, interval=1.0, process_backend='psutil', adaptive=False, cgroup=False):
+        self.interval = interval
+        self.next_interval = interval
+        self.scheduler = AdaptiveInterval(interval) if adaptive else None
+        self.system_sampler = SystemSampler(cgroup=cgroup)
+        self.process_sampler = make_process_sampler(process_backend)
+        self._last_tick = None
+        self._subscribers = []
+        self._error_handlers = []
+        self._lock = threading.Lock()
+        self._latest = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def subscribe(self, callback, on_error=None):
+        """Register callback(snapshot); returns a function that unsubscribes."""
+        with self._lock:
+            self._subscribers.append(callback)
+            if on_error is not None:
+                self._error_handlers.append(on_error)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+                if on_error in self._error_handlers:
+                    self._error_handlers.remove(on_error)
+        return unsubscribe
+
+    def latest(self):
+        return self._latest
+
+    def sample(self):
+        """Take one snapshot of the host and publish it to every subscriber."""
+        current_time = time.time()
+        started = time.perf_counter()
+        cpu_started = time.thread_time()
+        try:
+            system = self.system_sampler.sample(current_time)
+            processes = self.process_sampler.sample(current_time)
+            aggregates = summarize(processes, system.cpu_count)
+        except Exception as e:
+            self._report_error(f"Collection error: {str(e)}")
+            return None
+        sample_time = time.perf_counter() - started
+        cpu_time = time.thread_time() - cpu_started
+
+        if self.scheduler is not None:
+            # Every process looks new on the first tick, so churn only counts after it
+            cache = self.process_sampler.cache
+            churn = cache.started + cache.exited if self._last_tick is not None else 0
+            self.next_interval = self.scheduler.next(system, churn)
+
+        # Overhead is the sampling CPU time as a share of the time since the last tick
+        elapsed = current_time - self._last_tick if self._last_tick is not None else self.interval
+        self._last_tick = current_time
+        stats = {
+            'interval': self.next_interval,
+            'sample_time': sample_time,
+            'cpu_time': cpu_time,
+            'overhead_percent': cpu_time / max(elapsed, sample_time, 1e-6) * 100,
+        }
+
+        snapshot = Snapshot(current_time, system, processes, stats, aggregates)
+        self._latest = snapshot
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                self._report_error(f"Subscriber error: {str(e)}")
+        return snapshot
+
+    def _report_error(self, message):
+        with self._lock:
+            handlers = list(self._error_handlers)
+        for handler in handlers:
+            handler(message)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="collector", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self.sample()
+            self._stop_event.wait(self.next_interval)
+
+
+_shared_collector = None
+_shared_lock = threading.Lock()
+
+
+def get_collector(interval=1.0, process_backend='psutil', connect=None, adaptive=False, cgroup=False):
+    """Return the process-wide Collector so every viewer shares one sampling loop.
+
+    With connect set to a daemon socket path the shared collector is a
+    remote.RemoteCollector reading from daemon.py instead of sampling locally.
+    The arguments only take effect for the call that creates the collector.
+    """
+    global _shared_collector
+    with _shared_lock:
+        if _shared_collector is None:
+            if connect:
+                from remote import RemoteCollector
+                _shared_collector = RemoteCollector(connect)
+            else:
+                _shared_collector = Collector(interval, process_backend, adaptive, cgroup)
+        return _shared_collector
@@ -1,60 +1,101 @@
-import psutil
-from rich.live import Live
+import argparse
+import threading
+from rich.color import ColorSystem
 from rich.table import Table
 from rich.panel import Panel
 from rich.console import Console
-from math import sin, pi
-from time import sleep
-import platform
+from collections import deque
+from time import time
+
+from collector import PROCESS_BACKENDS, get_collector
 
 console = Console()
 
-# Parameters for heartbeat-like animation
-wave_length = 60  # Increased wave length for larger display
-wave_step = 0
+# Sparklines: samples kept per line, and the glyph for every whole percent
+SPARK_WIDTH = 60
+NIC_SPARK_WIDTH = 30
+MAX_NIC_ROWS = 6
+SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+SPARK_LEVELS = tuple(SPARK_BLOCKS[(level * (len(SPARK_BLOCKS) - 1) + 50) // 100] for level in range(101))
+
+# A snapshot older than this many sampling intervals is flagged as stale
+STALE_INTERVALS = 2
+# Busiest processes listed by default; --top raises it on large hosts
+DEFAULT_TOP = 5
+
+class Sparkline:
+    """Fixed-size ring of recent samples drawn as one row of block glyphs.
+
+    With a ceiling (100 for percentages) samples are scaled against it;
+    without one they are scaled against the largest sample still held.
+    Rendering is one table lookup per column.
+    """
+
+    def __init__(self, width=SPARK_WIDTH, ceiling=None):
+        self.samples = deque([0.0] * width, maxlen=width)
+        self.ceiling = ceiling
+
+    def append(self, value):
+        self.samples.append(value or 0.0)
 
-def heartbeat_wave(amplitude, step, length):
-    """Generate a heartbeat-like wave pattern."""
-    return [abs(sin((step + i) * (2 * pi / length))) * amplitude for i in range(length)]
+    def render(self):
+        ceiling = self.ceiling or max(self.samples)
+        if not ceiling:
+            return SPARK_LEVELS[0] * len(self.samples)
+        scale = 100 / ceiling
+        return "".join([SPARK_LEVELS[min(int(value * scale), 100)] for value in self.samples])
 
-def get_system_info():
-    """Retrieve system information using psutil."""
-    # CPU utilization
-    cpu_percentages = psutil.cpu_percent(percpu=True)
-    cpu_total = psutil.cpu_percent()
+def get_system_info(collector=None, top=DEFAULT_TOP):
+    """Retrieve system information from the collector's most recent tick.
+
+    Never samples: the collector thread does that, so a slow process walk or
+    sensor read cannot stall the display. Returns None before the first tick.
+    """
+    collector = collector or get_collector()
+    snapshot = collector.latest()
+    if snapshot is None:
+        return None
+    system = snapshot.system
 
     # Memory utilization
-    memory = psutil.virtual_memory()
-    total_memory = round(memory.total / (1024 ** 3), 2)  # GB
-    used_memory = round(memory.used / (1024 ** 3), 2)
-    free_memory = round(memory.available / (1024 ** 3), 2)
+    memory = system.memory
+    total_memory = round(memory['total'] / (1024 ** 3), 2)  # GB
+    used_memory = round(memory['used'] / (1024 ** 3), 2)
+    free_memory = round(memory['available'] / (1024 ** 3), 2)
 
     # On Linux, we can access cached memory
-    cached_memory = round(memory.cached / (1024 ** 3), 2) if hasattr(memory, 'cached') else 0
+    cached_memory = round(memory.get('cached', 0) / (1024 ** 3), 2)
 
     # Network
-    net_io = psutil.net_io_counters()
-    total_sent = round(net_io.bytes_sent / 1024, 2)  # KB
-    total_recv = round(net_io.bytes_recv / 1024, 2)
+    total_sent = round(system.net_totals['bytes_sent'] / 1024, 2)  # KB
+    total_recv = round(system.net_totals['bytes_recv'] / 1024, 2)
+    network = system.network or {}
+    interfaces = {
+        nic: (rates['bytes_sent_rate'] + rates['bytes_recv_rate']) / 1024  # KB/s
+        for nic, rates in (system.network_interfaces or {}).items() if nic != 'lo'
+    }
 
     # Battery
-    battery = psutil.sensors_battery()
-    battery_percent = battery.percent if battery else "N/A"
-    battery_status = "Charging" if battery and battery.power_plugged else "Discharging"
+    battery = system.battery
+    battery_percent = battery['percent'] if battery else "N/A"
+    battery_status = "Charging" if battery and battery['power_plugged'] else "Discharging"
 
     # Temperatures
-    cpu_temp = "N/A"
-    if hasattr(psutil, "sensors_temperatures"):
-        temps = psutil.sensors_temperatures()
-        cpu_temp = temps['coretemp'][0].current if 'coretemp' in temps else "N/A"
+    temps = system.temperatures or {}
+    cpu_temp = temps['coretemp'][0].current if temps.get('coretemp') else "N/A"
 
-    # Processes
-    processes = [(p.info['name'], p.info['cpu_percent'], p.info['memory_percent']) for p in
-                 psutil.process_iter(['name', 'cpu_percent', 'memory_percent']) if p.info['cpu_percent']]
+    # Processes: the top N by CPU, picked with a heap rather than a full sort
+    procs = snapshot.processes
+    processes = []
+    for row in procs.top('cpu_percent', top):
+        cpu_percent = procs.value(row, 'cpu_percent')
+        if cpu_percent:
+            processes.append((procs.value(row, 'name'), cpu_percent, procs.value(row, 'memory_percent', 0.0)))
 
     return {
-        "cpu_percentages": cpu_percentages,
-        "cpu_total": cpu_total,
+        "timestamp": snapshot.timestamp,
+        "cpu_percentages": system.cpu_per_core,
+        "cpu_total": system.cpu_percent,
         "memory": {
             "total": total_memory,
             "used": used_memory,
@@ -64,6 +105,9 @@ def get_system_info():
         "network": {
             "sent": total_sent,
             "recv": total_recv,
+            "sent_rate": network.get('bytes_sent_rate', 0) / 1024,  # KB/s
+            "recv_rate": network.get('bytes_recv_rate', 0) / 1024,
+            "interfaces": interfaces,
         },
         "battery": {
             "percent": battery_percent,
@@ -72,99 +116,330 @@ def get_system_info():
         "temperature": {
             "cpu": cpu_temp,
         },
-        "processes": sorted(processes, key=lambda x: x[1], reverse=True)[:5]  # Top 5 CPU-consuming processes
+        "processes": processes,  # Busiest first
+        "sampling": snapshot.stats or {"interval": 1.0, "overhead_percent": 0.0},
+        "age": time() - snapshot.timestamp,
+        "stale": system.stale or {},  # Probe name -> seconds its read has been hanging
+        "cgroup": system.cgroup,  # With --cgroup inside a container, see cgroups.CgroupFiles.sample
+        "containers": system.containers or [],  # With --cgroup on a host
     }
 
-def generate_display(info):
-    global wave_step
-    wave_step += 1
-
-    # CPU Utilization Table with Heartbeat Wave
-    cpu_table = Table(title="[bold blue]CPU Usage", show_header=True, header_style="bold yellow")
-    cpu_table.add_column("Core", justify="left")
-    cpu_table.add_column("Usage (%)", justify="right")
-    cpu_table.add_column("Visual", justify="center")
-    
-    for i, cpu in enumerate(info["cpu_percentages"]):
-        wave = heartbeat_wave(20, wave_step + i, wave_length)  # Increased amplitude for better visibility
-        wave_visual = "".join(["█" if val > 10 else "░" for val in wave])  # More pronounced visual
-        cpu_table.add_row(f"Core {i}", f"[cyan]{cpu}%", f"[green]{wave_visual}")
-    
-    total_wave = heartbeat_wave(20, wave_step, wave_length)
-    total_wave_visual = "".join(["█" if val > 10 else "░" for val in total_wave])
-    cpu_table.add_row("Total", f"[magenta]{info['cpu_total']}%", f"[red]{total_wave_visual}")
-
-    # Memory Utilization Table
-    memory_table = Table(title="[bold green]Memory (RAM)", show_header=True, header_style="bold white")
-    memory_table.add_column("Type", justify="left")
-    memory_table.add_column("Amount (GB)", justify="right")
-    memory_table.add_row("Total", f"[cyan]{info['memory']['total']}")
-    memory_table.add_row("Used", f"[magenta]{info['memory']['used']} GB")
-    memory_table.add_row("Free", f"[green]{info['memory']['free']} GB")
-    memory_table.add_row("Cached", f"[yellow]{info['memory']['cached']} GB")
-
-    # Network Usage Table with Heartbeat Wave
-    network_table = Table(title="[bold cyan]Network Data", show_header=True, header_style="bold magenta")
-    network_table.add_column("Type", justify="left")
-    network_table.add_column("Amount (KB)", justify="right")
-    network_wave = heartbeat_wave(10, wave_step, wave_length)
-    network_visual = "".join(["█" if val > 5 else "░" for val in network_wave])
-    network_table.add_row("Sent", f"[yellow]{info['network']['sent']} KB")
-    network_table.add_row("Received", f"[green]{info['network']['recv']} KB")
-    network_table.add_row("Visual", f"[blue]{network_visual}")
-
-    # Battery Panel
-    battery_table = Table(title="[bold green]Battery Status", show_header=True, header_style="bold cyan")
-    battery_table.add_column("Status", justify="left")
-    battery_table.add_column("Value", justify="right")
-    battery_table.add_row("Percent", f"[yellow]{info['battery']['percent']}%")
-    battery_table.add_row("Status", f"[magenta]{info['battery']['status']}")
-
-    # Temperature Panel
-    temp_table = Table(title="[bold red]System Temperatures", show_header=True, header_style="bold yellow")
-    temp_table.add_column("Component", justify="left")
-    temp_table.add_column("Temperature (°C)", justify="right")
-    temp_table.add_row("CPU", f"[red]{info['temperature']['cpu']}")
-
-    # Top Processes Panel
-    process_table = Table(title="[bold magenta]Top 5 Processes (CPU %)", show_header=True, header_style="bold cyan")
-    process_table.add_column("Name", justify="left")
-    process_table.add_column("CPU %", justify="right")
-    process_table.add_column("Memory %", justify="right")
-    for proc in info["processes"]:
-        process_table.add_row(proc[0], f"[red]{proc[1]}%", f"[yellow]{proc[2]}%")
-
-    # Combine Panels
-    overview_panel = Panel(
-        f"[yellow]CPU Total:[/yellow] {info['cpu_total']}%\n"
-        f"[green]Memory Used:[/green] {info['memory']['used']} GB / {info['memory']['total']} GB\n"
-        f"[cyan]Network Sent:[/cyan] {info['network']['sent']} KB | [cyan]Received:[/cyan] {info['network']['recv']} KB\n"
-        f"[green]Battery:[/green] {info['battery']['percent']}% ({info['battery']['status']})\n"
-        f"[red]CPU Temperature:[/red] {info['temperature']['cpu']}°C",
-        title="[bold blue]System Overview",
-        border_style="bold green",
+class Section:
+    """One dashboard table that is rebuilt only when its rows change."""
+
+    def __init__(self, title, header_style, columns):
+        self.title = title
+        self.header_style = header_style
+        self.columns = columns  # (header, justify) pairs
+        self.rows = None
+        self.table = None
+
+    def invalidate(self):
+        """Force the next update() to rebuild the table."""
+        self.rows = None
+
+    def update(self, rows):
+        """Store rows; returns False, keeping the built table, when nothing changed."""
+        if rows == self.rows:
+            return False
+        self.rows = rows
+        table = Table(title=self.title, show_header=True, header_style=self.header_style)
+        for header, justify in self.columns:
+            table.add_column(header, justify=justify)
+        for row in rows:
+            table.add_row(*row)
+        self.table = table
+        return True
+
+    def __rich__(self):
+        return self.table
+
+
+class OverviewSection:
+    """The System Overview panel, rebuilt only when its text changes."""
+
+    def __init__(self):
+        self.text = None
+        self.panel = None
+
+    def invalidate(self):
+        self.text = None
+
+    def update(self, text):
+        if text == self.text:
+            return False
+        self.text = text
+        self.panel = Panel(text, title="[bold blue]System Overview", border_style="bold green")
+        return True
+
+    def __rich__(self):
+        return self.panel
+
+
+def container_row(entry):
+    """Containers table row for one cgroups.ContainerSampler entry."""
+    def percent(value):
+        return "N/A" if value is None else f"{value:.1f}%"
+
+    memory = "N/A" if entry['memory_current'] is None else f"{entry['memory_current'] / 1024 ** 2:.0f}"
+    if entry['memory_max']:
+        memory += f" / {entry['memory_max'] / 1024 ** 2:.0f}"
+    pressure = entry['pressure'].get('cpu')
+    return (
+        f"{entry['runtime']}:{entry['name']}",
+        f"[cyan]{percent(entry['cpu_percent'])}",
+        f"{entry['cpu_limit']:.2g}" if entry['cpu_limit'] else "-",
+        f"[red]{percent(entry['throttled_percent'])}",
+        f"[magenta]{memory}",
+        percent(pressure['some']['avg10'] if pressure else None),
     )
 
-    return cpu_table, memory_table, network_table, process_table, overview_panel, battery_table, temp_table
+class Dashboard:
+    """Persistent layout whose sections are refreshed in place each tick."""
+
+    def __init__(self, top=DEFAULT_TOP):
+        self.timestamp = None
+        self.core_sparks = []
+        self.total_spark = Sparkline(ceiling=100)
+        self.sent_spark = Sparkline(NIC_SPARK_WIDTH)
+        self.recv_spark = Sparkline(NIC_SPARK_WIDTH)
+        self.nic_sparks = {}
+        self.cpu = Section("[bold blue]CPU Usage", "bold yellow",
+                           (("Core", "left"), ("Usage (%)", "right"), ("Visual", "center")))
+        self.memory = Section("[bold green]Memory (RAM)", "bold white",
+                              (("Type", "left"), ("Amount (GB)", "right")))
+        self.network = Section("[bold cyan]Network Data", "bold magenta",
+                               (("Type", "left"), ("Amount (KB)", "right"), ("Activity", "left")))
+        self.battery = Section("[bold green]Battery Status", "bold cyan",
+                               (("Status", "left"), ("Value", "right")))
+        self.temperature = Section("[bold red]System Temperatures", "bold yellow",
+                                   (("Component", "left"), ("Temperature (°C)", "right")))
+        self.processes = Section(f"[bold magenta]Top {top} Processes (CPU %)", "bold cyan",
+                                 (("Name", "left"), ("CPU %", "right"), ("Memory %", "right")))
+        self.containers = Section("[bold blue]Containers", "bold cyan",
+                                  (("Container", "left"), ("CPU %", "right"), ("Limit", "right"),
+                                   ("Throttled", "right"), ("Memory (MB)", "right"), ("CPU Pressure", "right")))
+        self.overview = OverviewSection()
+        self.sections = (self.cpu, self.memory, self.network, self.battery,
+                         self.temperature, self.processes, self.containers, self.overview)
+        self.containers_shown = False
+
+        # Layout
+        self.layout = Table.grid(expand=True)
+        self.layout.add_column(justify="center", ratio=1)
+        self.layout.add_column(justify="center", ratio=1)
+        self.layout.add_row(self.overview, self.cpu)
+        self.layout.add_row(self.memory, self.network)
+        self.layout.add_row(self.battery, self.temperature)
+        self.layout.add_row(self.processes)
+
+    def update(self, info):
+        """Refresh every section from info; returns True if anything visible changed."""
+        # The overview carries the staleness markers, so it is refreshed even
+        # when the collector has not produced a new tick
+        overview_changed = self.overview.update(self.overview_text(info))
+        if info["timestamp"] == self.timestamp:
+            return overview_changed
+        self.timestamp = info["timestamp"]
+        network = info["network"]
+
+        # Sparklines advance by one sample per tick
+        cores = info["cpu_percentages"]
+        if len(self.core_sparks) != len(cores):
+            self.core_sparks = [Sparkline(ceiling=100) for _ in cores]
+        for spark, cpu in zip(self.core_sparks, cores):
+            spark.append(cpu)
+        self.total_spark.append(info["cpu_total"])
+        self.sent_spark.append(network["sent_rate"])
+        self.recv_spark.append(network["recv_rate"])
+        for nic, rate in network["interfaces"].items():
+            if nic not in self.nic_sparks:
+                self.nic_sparks[nic] = Sparkline(NIC_SPARK_WIDTH)
+            self.nic_sparks[nic].append(rate)
+
+        # CPU Utilization Table with per-core activity
+        cpu_rows = [
+            (f"Core {i}", f"[cyan]{cpu}%", f"[green]{spark.render()}")
+            for i, (cpu, spark) in enumerate(zip(cores, self.core_sparks))
+        ]
+        cpu_rows.append(("Total", f"[magenta]{info['cpu_total']}%", f"[red]{self.total_spark.render()}"))
+
+        # Network rows: totals, then the interfaces that have seen traffic
+        network_rows = [
+            ("Sent", f"[yellow]{network['sent']} KB", f"[blue]{self.sent_spark.render()}"),
+            ("Received", f"[green]{network['recv']} KB", f"[blue]{self.recv_spark.render()}"),
+        ]
+        active = [nic for nic in sorted(network["interfaces"]) if max(self.nic_sparks[nic].samples)]
+        for nic in active[:MAX_NIC_ROWS]:
+            network_rows.append((nic, f"[cyan]{network['interfaces'][nic]:.1f} KB/s",
+                                 f"[blue]{self.nic_sparks[nic].render()}"))
+
+        # Every section is updated; any() would stop at the first change
+        changed = [
+            self.cpu.update(cpu_rows),
+            self.memory.update([
+                ("Total", f"[cyan]{info['memory']['total']}"),
+                ("Used", f"[magenta]{info['memory']['used']} GB"),
+                ("Free", f"[green]{info['memory']['free']} GB"),
+                ("Cached", f"[yellow]{info['memory']['cached']} GB"),
+            ]),
+            self.network.update(network_rows),
+            self.battery.update([
+                ("Percent", f"[yellow]{info['battery']['percent']}%"),
+                ("Status", f"[magenta]{info['battery']['status']}"),
+            ]),
+            self.temperature.update([("CPU", f"[red]{info['temperature']['cpu']}")]),
+            self.processes.update([
+                (proc[0], f"[red]{proc[1]:.1f}%", f"[yellow]{proc[2]:.1f}%") for proc in info["processes"]
+            ]),
+            overview_changed,
+        ]
+        if info["containers"]:
+            changed.append(self.containers.update([container_row(entry) for entry in info["containers"]]))
+            if not self.containers_shown:
+                # Only hosts running containers with --cgroup get the extra row
+                self.layout.add_row(self.containers)
+                self.containers_shown = True
+        return any(changed)
+
+    def overview_text(self, info):
+        text = (
+            f"[yellow]CPU Total:[/yellow] {info['cpu_total']}%\n"
+            f"[green]Memory Used:[/green] {info['memory']['used']} GB / {info['memory']['total']} GB\n"
+            f"[cyan]Network Sent:[/cyan] {info['network']['sent']} KB | [cyan]Received:[/cyan] {info['network']['recv']} KB\n"
+            f"[green]Battery:[/green] {info['battery']['percent']}% ({info['battery']['status']})\n"
+            f"[red]CPU Temperature:[/red] {info['temperature']['cpu']}°C\n"
+            f"[dim]Sampling every {info['sampling']['interval']:.2g}s, "
+            f"{info['sampling']['overhead_percent']:.1f}% CPU overhead[/dim]"
+        )
+        cgroup = info["cgroup"]
+        if cgroup:
+            limit = f"limit {cgroup['cpu_limit']:.2g} cores" if cgroup['cpu_limit'] else "no CPU limit"
+            text += f"\n[blue]Container:[/blue] {limit}"
+            if cgroup['throttled_usec'] is not None:
+                text += f", throttled {cgroup['throttled_usec'] / 1e6:.1f}s"
+                if cgroup['throttled_percent'] is not None:
+                    text += f" ({cgroup['throttled_percent']:.0f}% of periods now)"
+            if cgroup['pressure']:
+                text += "\n[blue]Pressure:[/blue] " + " | ".join(
+                    f"{resource} {values['some']['avg10']:.1f}%" for resource, values in cgroup['pressure'].items()
+                )
+        if info["age"] > STALE_INTERVALS * info["sampling"]["interval"]:
+            text += f"\n[bold red]Stale:[/bold red] last sample {info['age']:.0f}s ago"
+        for name, seconds in sorted(info["stale"].items()):
+            text += f"\n[bold red]Stale:[/bold red] {name} read hanging for {seconds:.0f}s"
+        return text
+
+
+COLOR_SYSTEMS = {
+    "standard": ColorSystem.STANDARD,
+    "256": ColorSystem.EIGHT_BIT,
+    "truecolor": ColorSystem.TRUECOLOR,
+    "windows": ColorSystem.WINDOWS,
+}
+
+
+class DiffScreen:
+    """Full-screen renderer that only rewrites the terminal lines that changed.
+
+    Each frame is rendered to styled lines and compared with the previous
+    frame; unchanged lines cost nothing on the wire, which is what matters
+    over SSH.
+    """
+
+    def __init__(self, console):
+        self.console = console
+        self.previous = []
+        self.size = None
+
+    def __enter__(self):
+        self.console.set_alt_screen(True)
+        self.console.show_cursor(False)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.console.show_cursor(True)
+        self.console.set_alt_screen(False)
+
+    def render(self, renderable):
+        """Return the frame as one ANSI string per screen line."""
+        console = self.console
+        width, height = console.size
+        color_system = COLOR_SYSTEMS.get(console.color_system)
+        lines = console.render_lines(renderable, console.options.update(width=width), pad=True)
+        frame = []
+        for line in lines[:height]:
+            frame.append("".join(
+                segment.style.render(segment.text, color_system=color_system) if segment.style else segment.text
+                for segment in line if not segment.control
+            ))
+        return frame
+
+    def draw(self, renderable):
+        """Render a frame and write only the changed lines; returns the bytes written."""
+        frame = self.render(renderable)
+        previous = self.previous
+        out = []
+        if self.console.size != self.size:
+            # Resized: nothing on screen can be trusted
+            self.size = self.console.size
+            previous = []
+            out.append("\x1b[2J")
+        for row, line in enumerate(frame):
+            if row >= len(previous) or previous[row] != line:
+                out.append(f"\x1b[{row + 1};1H{line}\x1b[0m")
+        if len(frame) < len(previous):
+            out.append(f"\x1b[{len(frame) + 1};1H\x1b[J")
+        self.previous = frame
+        data = "".join(out)
+        if data:
+            self.console.file.write(data)
+            self.console.file.flush()
+        return len(data.encode())
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Terminal system monitoring dashboard")
+    parser.add_argument("--backend", choices=PROCESS_BACKENDS, default="psutil",
+                        help="process sampling backend (procfs is Linux only)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="sample faster while the host is busy and back off while idle")
+    parser.add_argument("--cgroup", action="store_true",
+                        help="report container CPU quota, throttling, memory limit and pressure (cgroup v2)")
+    parser.add_argument("--connect", metavar="SOCKET",
+                        help="read snapshots from a running daemon.py instead of sampling")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="number of busiest processes to list")
+    return parser.parse_args(argv)
 
 def main():
     """Main function to run the system monitoring dashboard."""
-    with Live(auto_refresh=True, refresh_per_second=2) as live:
-        while True:
-            system_info = get_system_info()
-            cpu_table, memory_table, network_table, process_table, overview_panel, battery_table, temp_table = generate_display(system_info)
-
-            # Layout
-            layout = Table.grid(expand=True)
-            layout.add_column(justify="center", ratio=1)
-            layout.add_column(justify="center", ratio=1)
-            layout.add_row(overview_panel, cpu_table)
-            layout.add_row(memory_table, network_table)
-            layout.add_row(battery_table, temp_table)
-            layout.add_row(process_table)
-
-            live.update(layout)
-            sleep(1)
+    args = parse_args()
+    collector = get_collector(process_backend=args.backend, connect=args.connect, adaptive=args.adaptive,
+                              cgroup=args.cgroup)
+    dashboard = Dashboard(args.top)
+    # The collector samples on its own thread and wakes the renderer on every
+    # tick; if a tick is late the wait times out and the overview shows how stale
+    # the data is. Frames whose content is unchanged are skipped.
+    ticked = threading.Event()
+    unsubscribe = collector.subscribe(lambda snapshot: ticked.set())
+    collector.start()
+    interval = 1.0
+    with DiffScreen(console) as screen:
+        try:
+            while True:
+                ticked.wait(interval)
+                ticked.clear()
+                system_info = get_system_info(collector, args.top)
+                if system_info is None:
+                    continue
+                interval = system_info["sampling"]["interval"]
+                if dashboard.update(system_info):
+                    screen.draw(dashboard.layout)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            unsubscribe()
+            collector.stop()
 
 if __name__ == "__main__":
     main()
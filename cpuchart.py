@@ -1,287 +1,718 @@
 import sys
 import os
 import json
+import argparse
 import time
 import psutil
-import wmi
 from datetime import datetime
-from collections import deque
-from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal, QPoint, QSettings
+from PyQt5.QtCore import (
+    Qt, QTimer, QObject, pyqtSignal, QPoint, QSettings,
+    QAbstractTableModel, QAbstractItemModel, QModelIndex, QSortFilterProxyModel
+)
 from PyQt5.QtGui import QColor, QIcon, QFont, QPalette, QBrush, QPixmap
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QTabWidget, QVBoxLayout,
-    QTableWidget, QTableWidgetItem, QHeaderView, QMenu, QLabel,
+    QTableWidget, QTableView, QTreeView, QHeaderView, QMenu, QLabel,
     QTreeWidget, QTreeWidgetItem, QSplitter, QStyleFactory, 
     QGridLayout, QProgressBar, QAction, QInputDialog, QMessageBox,
     QDialog, QLineEdit, QPushButton, QHBoxLayout, QCheckBox,
-    QComboBox, QFileDialog, QToolBar, QStatusBar, QFrame
+    QComboBox, QFileDialog, QToolBar, QStatusBar, QFrame, QStackedWidget
 )
 import pyqtgraph as pg
 
+from cgroups import ServiceSampler
+from collector import PROCESS_BACKENDS, get_collector
+from history import HistoryRecorder, HistoryStore
+from lod import envelope, m4
+from proctree import ProcessTree
+from query import ProcessIndex, ProcessQuery, QueryError
+from ringbuffer import RingBuffer
+from rowstore import RowStore, contiguous_ranges
+from snapshot import ProcessSnapshot
+
 # Constants
-MAX_CHART_HISTORY = 120  # 2 minutes at 1s updates
+MAX_CHART_HISTORY = 120  # Samples kept per chart (2 minutes at 1s updates)
+# Performance views in stack order, with the chart_data series each one plots
+PERFORMANCE_VIEWS = {
+    "CPU": 'cpu',
+    "Memory": 'memory',
+    "Disk": 'disk',
+    "Network": 'network',
+    "GPU": None
+}
+# Stacked CPU time breakdown drawn under the CPU utilization curve
+CPU_TIME_SERIES = (
+    ('user', '#1f77b4'),
+    ('system', '#d62728'),
+    ('iowait', '#ff7f0e'),
+    ('steal', '#7f7f7f')
+)
 CONFIG_FILE = 'taskmgr_settings.json'
-PRIORITY_LEVELS = {
-    "Realtime": psutil.REALTIME_PRIORITY_CLASS,
-    "High": psutil.HIGH_PRIORITY_CLASS,
-    "Above Normal": psutil.ABOVE_NORMAL_PRIORITY_CLASS,
-    "Normal": psutil.NORMAL_PRIORITY_CLASS,
-    "Below Normal": psutil.BELOW_NORMAL_PRIORITY_CLASS,
-    "Low": psutil.IDLE_PRIORITY_CLASS
+MAX_HISTORY_POINTS = 1500  # Points drawn on the App History chart
+HISTORY_METRICS = {
+    "CPU": ('cpu', '%'),
+    "Memory": ('memory', '%'),
+    "Swap": ('swap', '%'),
+    "Disk": ('disk', 'MB/s'),
+    "Network": ('network', 'MB/s')
 }
+HISTORY_RANGES = {
+    "Last 10 minutes": 600,
+    "Last hour": 3600,
+    "Last 6 hours": 6 * 3600,
+    "Last day": 24 * 3600,
+    "Last week": 7 * 24 * 3600,
+    "Last 30 days": 30 * 24 * 3600
+}
+# Performance tab ranges: live ring buffers, or the on-disk history downsampled to fit
+PERFORMANCE_RANGES = {"Live": None, **HISTORY_RANGES}
+if hasattr(psutil, 'REALTIME_PRIORITY_CLASS'):
+    PRIORITY_LEVELS = {
+        "Realtime": psutil.REALTIME_PRIORITY_CLASS,
+        "High": psutil.HIGH_PRIORITY_CLASS,
+        "Above Normal": psutil.ABOVE_NORMAL_PRIORITY_CLASS,
+        "Normal": psutil.NORMAL_PRIORITY_CLASS,
+        "Below Normal": psutil.BELOW_NORMAL_PRIORITY_CLASS,
+        "Low": psutil.IDLE_PRIORITY_CLASS
+    }
+else:
+    # POSIX nice values (raising priority above Normal needs privileges)
+    PRIORITY_LEVELS = {
+        "Realtime": -20,
+        "High": -10,
+        "Above Normal": -5,
+        "Normal": 0,
+        "Below Normal": 5,
+        "Low": 19
+    }
 
-# Process data collection worker thread
-class ProcessWorker(QThread):
-    data_updated = pyqtSignal(dict)
+# Bridges the shared collector thread onto the Qt event loop
+class CollectorWorker(QObject):
+    # Snapshots are immutable, so the reference crosses threads without a copy
+    process_data_updated = pyqtSignal(object)
+    performance_data_updated = pyqtSignal(dict)
     error_occurred = pyqtSignal(str)
     
-    def __init__(self, parent=None):
+    def __init__(self, collector=None, parent=None):
         super().__init__(parent)
-        self._running = True
+        self.collector = collector or get_collector()
+        self._unsubscribe = None
         
-    def stop(self):
-        self._running = False
-        self.wait()
+    def start(self):
+        # Signals emitted from the collector thread are queued onto the GUI thread
+        self._unsubscribe = self.collector.subscribe(self.publish, self.error_occurred.emit)
+        self.collector.start()
         
-    def run(self):
-        previous_data = {}
+    def stop(self):
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        self.collector.stop()
+        
+    def publish(self, snapshot):
+        perf_data = snapshot.system.as_dict()
+        perf_data['timestamp'] = snapshot.timestamp
+        if snapshot.stats:
+            perf_data['sampling'] = snapshot.stats
+        if snapshot.aggregates:
+            perf_data['processes'] = snapshot.aggregates
+        self.performance_data_updated.emit(perf_data)
+        self.process_data_updated.emit(snapshot.processes)
+
+class PerformanceAxis(pg.DateAxisItem):
+    """Bottom axis counting seconds back from now on live charts, dates on history ones."""
+    
+    def __init__(self):
+        super().__init__(orientation='bottom')
+        self.relative = True
+        
+    def set_relative(self, relative):
+        self.relative = relative
+        self.picture = None
+        self.update()
+        
+    def tickValues(self, minVal, maxVal, size):
+        if self.relative:
+            return pg.AxisItem.tickValues(self, minVal, maxVal, size)
+        return super().tickValues(minVal, maxVal, size)
+        
+    def tickStrings(self, values, scale, spacing):
+        if self.relative:
+            return pg.AxisItem.tickStrings(self, values, scale, spacing)
+        return super().tickStrings(values, scale, spacing)
+
+def format_bytes(size):
+    if size == 0:
+        return "0 B"
+        
+    power = 2**10
+    n = 0
+    units = {0: 'B', 1: 'KB', 2: 'MB', 3: 'GB', 4: 'TB'}
+    while size > power and n < len(units)-1:
+        size /= power
+        n += 1
+    return f"{size:.1f} {units[n]}"
+
+# "View by" heuristics as query terms (see query.py), combined with the filter box
+PROCESS_VIEWS = {
+    "All processes": "",
+    # Simple heuristic to identify apps: they have a visible window
+    "Apps only": "status:/^running$/ -name:/^System/",
+    # Background processes usually don't have visible windows
+    "Background processes": "status:/^(sleeping|disk-sleep|stopped)$/",
+    # Windows processes typically run as SYSTEM, LOCAL SERVICE, or NETWORK SERVICE
+    "Windows processes": "user:/system|local service|network service/"
+}
+
+PROCESS_TABLE_HEADERS = [
+    "Name", "PID", "Status", "User name", "CPU %", "Memory",
+    "Disk I/O", "Socket Queue", "GPU %", "Description"
+]
+PROCESS_TABLE_FIELDS = (
+    'name', 'status', 'username', 'cpu_percent', 'memory_percent',
+    'memory_bytes', 'disk_usage', 'network_usage'
+)
+# "Group by" choices and the ProcessTree mode behind each; None keeps the flat table
+PROCESS_GROUPINGS = {
+    "None": None,
+    "Parent process": 'parent',
+    "User": 'user',
+    "Status": 'status',
+    "Cgroup": 'cgroup'
+}
+PROCESS_TREE_HEADERS = [
+    "Name", "PID", "Status", "User name", "CPU %", "Memory", "Total CPU %", "Total memory"
+]
+# ProcessTree sort field behind each tree column
+PROCESS_TREE_SORT_FIELDS = (
+    'name', 'pid', 'status', 'username', 'cpu_percent', 'memory_percent',
+    'total_cpu_percent', 'total_memory_percent'
+)
+
+PROCESS_DETAILS_HEADERS = [
+    "Name", "PID", "Status", "User name", "CPU", "Memory", "Description", "Command Line"
+]
+PROCESS_DETAILS_FIELDS = (
+    'name', 'status', 'username', 'cpu_percent', 'memory_percent', 'memory_bytes'
+)
+# Command lines longer than this are cut in the Details cell; the tooltip has all of it
+DETAILS_CMDLINE_CHARS = 200
+USER_TABLE_HEADERS = ["User", "Processes", "CPU %", "Memory", "Disk I/O"]
+# Keys of each aggregates['by_user'] entry shown in the Users tab, by column
+USER_TABLE_FIELDS = ('user', 'count', 'cpu_percent', 'memory_bytes', 'io_rate')
+SERVICE_TABLE_HEADERS = ["Name", "PIDs", "CPU %", "Memory", "Disk read", "Disk write"]
+SERVICE_TABLE_FIELDS = ('name', 'pids', 'cpu_percent', 'memory_bytes', 'io_read_rate', 'io_write_rate')
+SERVICE_PIDS_SHOWN = 4
+CONTAINER_TABLE_HEADERS = ["Container", "Runtime", "CPU %", "CPU limit", "Throttled", "Memory", "Memory limit",
+                           "CPU pressure"]
+# Keys of each SystemSnapshot.containers entry (see cgroups.py) by column;
+# cpu_pressure is the 10s 'some' average of its cpu.pressure
+CONTAINER_TABLE_FIELDS = ('name', 'runtime', 'cpu_percent', 'cpu_limit', 'throttled_percent', 'memory_current',
+                          'memory_max', 'cpu_pressure')
+
+# Process table model backed by a RowStore; cells are formatted only when the view asks
+class ProcessTableModel(QAbstractTableModel):
+    headers = PROCESS_TABLE_HEADERS
+    fields = PROCESS_TABLE_FIELDS
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.store = RowStore(self.fields)
+        self.high_usage_brush = QBrush(QColor("#CC0000"))
         
-        while self._running:
-            try:
-                current_time = time.time()
-                current_data = {}
-                
-                # Get all processes with batch collection for efficiency
-                for proc in psutil.process_iter(['pid', 'name', 'status', 'username', 
-                                              'cpu_percent', 'memory_percent']):
-                    try:
-                        pid = proc.info['pid']
-                        process_info = {
-                            'name': proc.info['name'],
-                            'status': proc.info['status'],
-                            'username': proc.info['username'] or 'N/A',
-                            'cpu_percent': proc.info['cpu_percent'],
-                            'memory_percent': proc.info['memory_percent'],
-                            'disk_usage': 0,
-                            'network_usage': 0,
-                            'timestamp': current_time
-                        }
-                        
-                        # Add additional info when possible
-                        try:
-                            # Get process details with minimal overhead
-                            with proc.oneshot():
-                                # Get memory info
-                                mem_info = proc.memory_info()
-                                process_info['memory_bytes'] = mem_info.rss
-                                
-                                # Get IO counters if available
-                                try:
-                                    io = proc.io_counters()
-                                    process_info['disk_read'] = io.read_bytes
-                                    process_info['disk_write'] = io.write_bytes
-                                    process_info['disk_usage'] = io.read_bytes + io.write_bytes
-                                    
-                                    # Calculate rate if we have previous data
-                                    if pid in previous_data and 'disk_read' in previous_data[pid]:
-                                        time_diff = current_time - previous_data[pid]['timestamp']
-                                        if time_diff > 0:
-                                            read_rate = (io.read_bytes - previous_data[pid]['disk_read']) / time_diff
-                                            write_rate = (io.write_bytes - previous_data[pid]['disk_write']) / time_diff
-                                            process_info['disk_read_rate'] = read_rate
-                                            process_info['disk_write_rate'] = write_rate
-                                except (psutil.AccessDenied, psutil.NoSuchProcess):
-                                    pass
-                                
-                                # Try to get network info
-                                try:
-                                    # Use net_connections() instead of the deprecated connections()
-                                    connections = proc.net_connections()
-                                    if connections:
-                                        process_info['network_connections'] = len(connections)
-                                except (psutil.AccessDenied, psutil.NoSuchProcess):
-                                    pass
-                                    
-                                # Try to get process creation time
-                                try:
-                                    create_time = proc.create_time()
-                                    process_info['create_time'] = create_time
-                                    process_info['running_time'] = time.time() - create_time
-                                except (psutil.AccessDenied, psutil.NoSuchProcess):
-                                    pass
-                                    
-                                # Get command line if possible
-                                try:
-                                    cmdline = proc.cmdline()
-                                    process_info['cmdline'] = ' '.join(cmdline) if cmdline else ''
-                                except (psutil.AccessDenied, psutil.NoSuchProcess):
-                                    pass
-                                    
-                                # Get current working directory
-                                try:
-                                    process_info['cwd'] = proc.cwd()
-                                except (psutil.AccessDenied, psutil.NoSuchProcess):
-                                    pass
-                                    
-                        except (psutil.AccessDenied, psutil.NoSuchProcess):
-                            # Partial info is still useful
-                            pass
-                            
-                        current_data[pid] = process_info
-                    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                        continue
-                
-                # Emit the updated process data
-                self.data_updated.emit(current_data)
-                
-                # Store for next iteration for differential calculations
-                previous_data = current_data
-                
-            except Exception as e:
-                self.error_occurred.emit(f"Process collection error: {str(e)}")
-            
-            # Sleep to prevent high CPU usage (adjust based on needs)
-            time.sleep(1)
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.store)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.headers[section]
+        return None
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        column = index.column()
+        value = self.store.value
+        
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return value(row, 'name') or 'Unknown'
+            if column == 1:
+                return str(self.store.pids[row])
+            if column == 2:
+                return value(row, 'status') or 'Unknown'
+            if column == 3:
+                return value(row, 'username') or 'N/A'
+            if column == 4:
+                return f"{value(row, 'cpu_percent'):.1f}%"
+            if column == 5:
+                return f"{value(row, 'memory_percent'):.1f}% ({format_bytes(value(row, 'memory_bytes'))})"
+            if column == 6:
+                return format_bytes(value(row, 'disk_usage'))
+            if column == 7:
+                return format_bytes(value(row, 'network_usage'))
+            if column == 8:
+                return "N/A"  # Placeholder
+            return ""  # Description placeholder
+        
+        if role == Qt.UserRole:
+            # Raw values for sorting
+            if column == 0:
+                return value(row, 'name') or ''
+            if column == 1:
+                return self.store.pids[row]
+            if column == 2:
+                return value(row, 'status') or ''
+            if column == 3:
+                return value(row, 'username') or ''
+            if column == 4:
+                return value(row, 'cpu_percent')
+            if column == 5:
+                return value(row, 'memory_percent')
+            if column == 6:
+                return value(row, 'disk_usage')
+            if column == 7:
+                return value(row, 'network_usage')
+            return ""
+        
+        if role == Qt.ForegroundRole:
+            # Color high resource usage cells
+            if column == 4 and value(row, 'cpu_percent') > 50:
+                return self.high_usage_brush
+            if column == 5 and value(row, 'memory_percent') > 50:
+                return self.high_usage_brush
+        return None
+    
+    def pid_of(self, index):
+        return self.store.pids[index.row()]
+    
+    def index_of_pid(self, pid):
+        row = self.store.row_of.get(pid)
+        return QModelIndex() if row is None else self.index(row, 0)
+    
+    def pid_at(self, row, parent):
+        return self.store.pids[row]
+    
+    def pids_changed(self, pids):
+        for pid in pids:
+            row = self.store.row_of.get(pid)
+            if row is not None:
+                self.rows_changed(row, row)
+    
+    def set_snapshot(self, snapshot):
+        self.store.apply(snapshot, self)
+    
+    # RowStore listener protocol, forwarded to the Qt model signals
+    def begin_remove_rows(self, first, last):
+        self.beginRemoveRows(QModelIndex(), first, last)
+    
+    def end_remove_rows(self):
+        self.endRemoveRows()
+    
+    def begin_insert_rows(self, first, last):
+        self.beginInsertRows(QModelIndex(), first, last)
+    
+    def end_insert_rows(self):
+        self.endInsertRows()
+    
+    def rows_changed(self, first, last):
+        self.dataChanged.emit(self.index(first, 0), self.index(last, self.columnCount() - 1))
 
-# Performance data collector thread
-class PerformanceWorker(QThread):
-    data_updated = pyqtSignal(dict)
-    error_occurred = pyqtSignal(str)
+# Details tab model: the same RowStore diff for the short columns, while
+# command lines stay in the shared snapshot and are read only for visible cells
+class ProcessDetailsModel(ProcessTableModel):
+    headers = PROCESS_DETAILS_HEADERS
+    fields = PROCESS_DETAILS_FIELDS
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.snapshot = ProcessSnapshot.from_dicts(0.0, {})
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        column = index.column()
+        value = self.store.value
+        
+        if column == 7 and role in (Qt.DisplayRole, Qt.ToolTipRole):
+            cmdline = self.cmdline(row)
+            if role == Qt.DisplayRole and len(cmdline) > DETAILS_CMDLINE_CHARS:
+                return cmdline[:DETAILS_CMDLINE_CHARS] + "..."
+            return cmdline or None
+        
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return value(row, 'name') or 'Unknown'
+            if column == 1:
+                return str(self.store.pids[row])
+            if column == 2:
+                return value(row, 'status') or 'Unknown'
+            if column == 3:
+                return value(row, 'username') or 'N/A'
+            if column == 4:
+                return f"{value(row, 'cpu_percent'):.1f}%"
+            if column == 5:
+                return f"{value(row, 'memory_percent'):.1f}% ({format_bytes(value(row, 'memory_bytes'))})"
+            return ""  # Description placeholder
+        return None
+    
+    def cmdline(self, row):
+        snapshot_row = self.snapshot.index.get(self.store.pids[row])
+        if snapshot_row is None:
+            return ''
+        return self.snapshot.value(snapshot_row, 'cmdline', '')
+    
+    def set_snapshot(self, snapshot):
+        self.snapshot = snapshot
+        self.store.apply(snapshot, self)
+
+# Sorting and query filtering on top of ProcessTableModel; the query keeps its
+# matching pids up to date, so accepting a row is one set lookup
+class ProcessFilterProxy(QSortFilterProxyModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.query = None
+        self.setSortRole(Qt.UserRole)
+        self.setDynamicSortFilter(True)
+    
+    def set_query(self, query):
+        self.query = query
+        self.invalidateFilter()
     
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self.query is None:
+            return True
+        pid = self.sourceModel().pid_at(source_row, source_parent)
+        if pid is None:
+            return False  # Group heading: shown when one of its processes is
+        return pid in self.query.matches
+    
+    def refilter(self, pids):
+        # Dynamic filtering re-checks the rows the source reports as changed
+        self.sourceModel().pids_changed(pids)
+
+# Filtering only: header clicks are passed on to the tree model, which sorts
+# itself (see proctree.py), so the proxy keeps the source order
+class ProcessTreeProxy(ProcessFilterProxy):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setDynamicSortFilter(False)
+        self.setRecursiveFilteringEnabled(True)
+    
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sourceModel().sort(column, order)
+    
+    def refilter(self, pids):
+        # Without dynamic filtering only layout changes re-filter, so do it
+        # when a match flipped on a tick the tree kept its order
+        if pids and not self.sourceModel().relaid_out:
+            self.invalidateFilter()
+
+# Process tree model backed by an incrementally updated ProcessTree
+class ProcessTreeModel(QAbstractItemModel):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self._running = True
-        self.prev_disk_io = None
-        self.prev_net_io = None
-        self.prev_time = time.time()
+        self.tree = ProcessTree()
+        self.sort_field = None
+        self.descending = False
+        self.relaid_out = False  # Whether the last set_snapshot() re-sorted any rows
+        self.high_usage_brush = QBrush(QColor("#CC0000"))
+        self.group_font = QFont()
+        self.group_font.setBold(True)
+    
+    def set_mode(self, mode, snapshot):
+        # A new grouping is built in one go behind a model reset
+        self.beginResetModel()
+        self.tree = ProcessTree(mode)
+        self.tree.set_sort(self.sort_field, self.descending)
+        self.tree.apply(snapshot)
+        self.endResetModel()
+    
+    def clear(self):
+        self.beginResetModel()
+        self.tree = ProcessTree()
+        self.endResetModel()
+    
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sort_field = PROCESS_TREE_SORT_FIELDS[column] if column >= 0 else None
+        self.descending = order == Qt.DescendingOrder
+        self.tree.set_sort(self.sort_field, self.descending, self)
+    
+    def set_snapshot(self, snapshot):
+        self.relaid_out = False
+        self.tree.apply(snapshot, self)
+    
+    def node_of(self, index):
+        return index.internalPointer() if index.isValid() else self.tree.root
+    
+    def index_of(self, node, column=0):
+        if node is self.tree.root:
+            return QModelIndex()
+        return self.createIndex(node.row, column, node)
+    
+    def index(self, row, column, parent=QModelIndex()):
+        children = self.node_of(parent).children
+        if 0 <= row < len(children) and 0 <= column < len(PROCESS_TREE_HEADERS):
+            return self.createIndex(row, column, children[row])
+        return QModelIndex()
+    
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        return self.index_of(index.internalPointer().parent)
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self.node_of(parent).children)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return len(PROCESS_TREE_HEADERS)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return PROCESS_TREE_HEADERS[section]
+        return None
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        column = index.column()
+        total_cpu, total_percent, total_bytes, count = node.totals
+        
+        if node.pid is None:
+            # Group heading: its name and the totals of its processes
+            if role == Qt.DisplayRole:
+                if column == 0:
+                    return f"{node.label} ({count})"
+                if column == 6:
+                    return f"{total_cpu:.1f}%"
+                if column == 7:
+                    return f"{total_percent:.1f}% ({format_bytes(total_bytes)})"
+                return ""
+            if role == Qt.FontRole:
+                return self.group_font
+            return None
+        
+        name, status, username, cpu_percent, memory_percent, memory_bytes = node.values
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return name or 'Unknown'
+            if column == 1:
+                return str(node.pid)
+            if column == 2:
+                return status or 'Unknown'
+            if column == 3:
+                return username or 'N/A'
+            if column == 4:
+                return f"{cpu_percent:.1f}%"
+            if column == 5:
+                return f"{memory_percent:.1f}% ({format_bytes(memory_bytes)})"
+            if not node.children:
+                return ""  # Totals only for processes with children
+            if column == 6:
+                return f"{total_cpu:.1f}%"
+            return f"{total_percent:.1f}% ({format_bytes(total_bytes)})"
+        
+        if role == Qt.ForegroundRole:
+            if column == 4 and cpu_percent > 50:
+                return self.high_usage_brush
+            if column == 5 and memory_percent > 50:
+                return self.high_usage_brush
+        return None
+    
+    def pid_of(self, index):
+        return index.internalPointer().pid
+    
+    def index_of_pid(self, pid):
+        node = self.tree.nodes.get(pid)
+        return QModelIndex() if node is None else self.index_of(node)
+    
+    def pid_at(self, row, parent):
+        return self.node_of(parent).children[row].pid
+    
+    # ProcessTree listener protocol, forwarded to the Qt model signals
+    def begin_insert_rows(self, parent, first, last):
+        self.beginInsertRows(self.index_of(parent), first, last)
+    
+    def end_insert_rows(self):
+        self.endInsertRows()
+    
+    def begin_remove_rows(self, parent, first, last):
+        self.beginRemoveRows(self.index_of(parent), first, last)
+    
+    def end_remove_rows(self):
+        self.endRemoveRows()
+    
+    def rows_changed(self, parent, first, last):
+        parent_index = self.index_of(parent)
+        self.dataChanged.emit(self.index(first, 0, parent_index),
+                              self.index(last, len(PROCESS_TREE_HEADERS) - 1, parent_index))
+    
+    def begin_layout_change(self):
+        self.layoutAboutToBeChanged.emit()
+    
+    def end_layout_change(self):
+        # Indexes hold their node, so the node's new row is where each one moved
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(
+            persistent, [self.index_of(index.internalPointer(), index.column()) for index in persistent]
+        )
+        self.relaid_out = True
+        self.layoutChanged.emit()
+
+# Table of dict rows keyed by their first field, such as the collector's
+# per-user aggregates; like RowStore it signals only rows that appeared,
+# left or changed. Subclasses set headers/fields and format cells in display()
+class KeyedTableModel(QAbstractTableModel):
+    headers = ()
+    fields = ()
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.keys = []
+        self.row_of = {}
+        self.values = []  # fields tuple per row
         
-    def stop(self):
-        self._running = False
-        self.wait()
-        
-    def run(self):
-        while self._running:
-            try:
-                current_time = time.time()
-                perf_data = {}
-                
-                # CPU
-                perf_data['cpu_percent'] = psutil.cpu_percent(interval=None)
-                perf_data['cpu_per_core'] = psutil.cpu_percent(interval=None, percpu=True)
-                perf_data['cpu_count'] = psutil.cpu_count()
-                perf_data['cpu_freq'] = psutil.cpu_freq()
-                
-                # Memory
-                memory = psutil.virtual_memory()
-                perf_data['memory'] = {
-                    'total': memory.total,
-                    'available': memory.available,
-                    'used': memory.used,
-                    'percent': memory.percent,
-                    'free': memory.free
-                }
-                
-                # Swap
-                swap = psutil.swap_memory()
-                perf_data['swap'] = {
-                    'total': swap.total,
-                    'used': swap.used,
-                    'free': swap.free,
-                    'percent': swap.percent
-                }
-                
-                # Disk
-                disk_io = psutil.disk_io_counters()
-                if self.prev_disk_io is not None:
-                    # Calculate rates
-                    time_diff = current_time - self.prev_time
-                    if time_diff > 0:
-                        read_rate = (disk_io.read_bytes - self.prev_disk_io.read_bytes) / time_diff
-                        write_rate = (disk_io.write_bytes - self.prev_disk_io.write_bytes) / time_diff
-                        
-                        perf_data['disk'] = {
-                            'read_bytes': disk_io.read_bytes,
-                            'write_bytes': disk_io.write_bytes,
-                            'read_count': disk_io.read_count,
-                            'write_count': disk_io.write_count,
-                            'read_rate': read_rate,
-                            'write_rate': write_rate
-                        }
-                self.prev_disk_io = disk_io
-                
-                # Disk usage for all partitions
-                disk_partitions = []
-                for part in psutil.disk_partitions():
-                    try:
-                        usage = psutil.disk_usage(part.mountpoint)
-                        disk_partitions.append({
-                            'device': part.device,
-                            'mountpoint': part.mountpoint,
-                            'fstype': part.fstype,
-                            'total': usage.total,
-                            'used': usage.used,
-                            'free': usage.free,
-                            'percent': usage.percent
-                        })
-                    except (PermissionError, FileNotFoundError):
-                        continue
-                perf_data['disk_partitions'] = disk_partitions
-                
-                # Network
-                net_io = psutil.net_io_counters()
-                if self.prev_net_io is not None:
-                    # Calculate rates
-                    time_diff = current_time - self.prev_time
-                    if time_diff > 0:
-                        bytes_sent_rate = (net_io.bytes_sent - self.prev_net_io.bytes_sent) / time_diff
-                        bytes_recv_rate = (net_io.bytes_recv - self.prev_net_io.bytes_recv) / time_diff
-                        
-                        perf_data['network'] = {
-                            'bytes_sent': net_io.bytes_sent,
-                            'bytes_recv': net_io.bytes_recv,
-                            'packets_sent': net_io.packets_sent,
-                            'packets_recv': net_io.packets_recv,
-                            'bytes_sent_rate': bytes_sent_rate,
-                            'bytes_recv_rate': bytes_recv_rate
-                        }
-                self.prev_net_io = net_io
-                
-                # System load over time (1, 5, 15 min averages)
-                try:
-                    load_avg = psutil.getloadavg()
-                    perf_data['load_avg'] = load_avg
-                except (AttributeError, OSError):
-                    # Not available on Windows
-                    pass
-                
-                # Battery info if available
-                if hasattr(psutil, 'sensors_battery'):
-                    battery = psutil.sensors_battery()
-                    if battery:
-                        perf_data['battery'] = {
-                            'percent': battery.percent,
-                            'power_plugged': battery.power_plugged,
-                            'secsleft': battery.secsleft
-                        }
-                
-                # Temperature sensors if available
-                if hasattr(psutil, 'sensors_temperatures'):
-                    try:
-                        temps = psutil.sensors_temperatures()
-                        if temps:
-                            perf_data['temperatures'] = temps
-                    except (AttributeError, OSError):
-                        pass
-                
-                # Emit the collected data
-                self.data_updated.emit(perf_data)
-                self.prev_time = current_time
-                
-            except Exception as e:
-                self.error_occurred.emit(f"Performance collection error: {str(e)}")
-            
-            # Sleep for a short while to save resources
-            time.sleep(1)
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.keys)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.headers[section]
+        return None
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self.values[index.row()][index.column()]
+        if role == Qt.DisplayRole:
+            return self.display(index.column(), value)
+        if role == Qt.UserRole:
+            # Raw values for sorting; missing ones sort first
+            return self.sort_value(index.column(), value)
+        return None
+    
+    def display(self, column, value):
+        return str(value)
+    
+    def sort_value(self, column, value):
+        if value is None:
+            return '' if column == 0 else -1
+        return value
+    
+    def set_rows(self, entries):
+        key_field = self.fields[0]
+        current = {entry[key_field]: tuple(entry[field] for field in self.fields) for entry in entries}
+        
+        # Removals first, highest rows first so earlier row numbers stay valid
+        gone = sorted(row for key, row in self.row_of.items() if key not in current)
+        if gone:
+            for first, last in reversed(contiguous_ranges(gone)):
+                self.beginRemoveRows(QModelIndex(), first, last)
+                del self.keys[first:last + 1]
+                del self.values[first:last + 1]
+                self.endRemoveRows()
+            self.row_of = {key: row for row, key in enumerate(self.keys)}
+        
+        changed = []
+        for row, key in enumerate(self.keys):
+            values = current[key]
+            if values != self.values[row]:
+                self.values[row] = values
+                changed.append(row)
+        for first, last in contiguous_ranges(changed):
+            self.dataChanged.emit(self.index(first, 0), self.index(last, len(self.headers) - 1))
+        
+        new_keys = [key for key in current if key not in self.row_of]
+        if new_keys:
+            first = len(self.keys)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_keys) - 1)
+            for key in new_keys:
+                self.row_of[key] = len(self.keys)
+                self.keys.append(key)
+                self.values.append(current[key])
+            self.endInsertRows()
+
+# Users tab: one row per user from the collector's aggregates['by_user']
+class UserTableModel(KeyedTableModel):
+    headers = USER_TABLE_HEADERS
+    fields = USER_TABLE_FIELDS
+    
+    def display(self, column, value):
+        if column == 0:
+            return value or 'N/A'
+        if column == 1:
+            return str(value)
+        if column == 2:
+            return f"{value:.1f}%"
+        if column == 3:
+            return format_bytes(value)
+        return f"{format_bytes(value)}/s"
+
+# Services tab: one row per systemd unit from cgroups.ServiceSampler
+class ServiceTableModel(KeyedTableModel):
+    headers = SERVICE_TABLE_HEADERS
+    fields = SERVICE_TABLE_FIELDS
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and index.column() == 1 and role == Qt.ToolTipRole:
+            return " ".join(str(pid) for pid in self.values[index.row()][1])
+        return super().data(index, role)
+    
+    def display(self, column, value):
+        if column == 0:
+            return value
+        if column == 1:
+            # The first few PIDs; the tooltip lists them all
+            shown = ", ".join(str(pid) for pid in value[:SERVICE_PIDS_SHOWN])
+            if len(value) > SERVICE_PIDS_SHOWN:
+                shown += f" (+{len(value) - SERVICE_PIDS_SHOWN})"
+            return shown
+        if value is None:
+            return "N/A"  # Controller not enabled, or first sample
+        if column == 2:
+            return f"{value:.1f}%"
+        if column == 3:
+            return format_bytes(value)
+        return f"{format_bytes(value)}/s"
+    
+    def sort_value(self, column, value):
+        if column == 1:
+            return len(value)
+        return super().sort_value(column, value)
+
+# Containers tab: one row per container cgroup, sampled by the collector with --cgroup
+class ContainerTableModel(KeyedTableModel):
+    headers = CONTAINER_TABLE_HEADERS
+    fields = CONTAINER_TABLE_FIELDS
+    
+    def set_rows(self, entries):
+        rows = []
+        for entry in entries:
+            pressure = entry['pressure'].get('cpu')
+            rows.append(dict(entry, cpu_pressure=pressure['some']['avg10'] if pressure else None))
+        super().set_rows(rows)
+    
+    def display(self, column, value):
+        if column <= 1:
+            return value
+        if value is None:
+            return "-" if column in (3, 6) else "N/A"  # Unlimited, or not known yet
+        if column == 3:
+            return f"{value:.2g} cores"
+        if column in (5, 6):
+            return format_bytes(value)
+        return f"{value:.1f}%"
 
 # Search dialog for finding processes
 class SearchDialog(QDialog):
@@ -293,7 +724,7 @@ class SearchDialog(QDialog):
         layout = QVBoxLayout()
         
         self.search_field = QLineEdit()
-        self.search_field.setPlaceholderText("Enter process name or PID...")
+        self.search_field.setPlaceholderText("Enter a PID, name or query (user:root cpu>50)...")
         layout.addWidget(self.search_field)
         
         button_layout = QHBoxLayout()
@@ -400,7 +831,21 @@ class ProcessDetailsDialog(QDialog):
         if 'network_connections' in self.process_data:
             perf_layout.addWidget(QLabel("Network Connections:"), 4, 0)
             perf_layout.addWidget(QLabel(str(self.process_data['network_connections'])), 4, 1)
-        
+
+        # Add operation rates if available
+        if 'read_ops_rate' in self.process_data:
+            perf_layout.addWidget(QLabel("IO Operations:"), 5, 0)
+            perf_layout.addWidget(QLabel(f"{self.process_data['read_ops_rate']:.0f} reads/s, "
+                                         f"{self.process_data['write_ops_rate']:.0f} writes/s"), 5, 1)
+
+        if 'ctx_switch_rate' in self.process_data:
+            perf_layout.addWidget(QLabel("Context Switches:"), 6, 0)
+            perf_layout.addWidget(QLabel(f"{self.process_data['ctx_switch_rate']:.0f}/s"), 6, 1)
+
+        if 'page_fault_rate' in self.process_data:
+            perf_layout.addWidget(QLabel("Page Faults:"), 7, 0)
+            perf_layout.addWidget(QLabel(f"{self.process_data['page_fault_rate']:.0f}/s"), 7, 1)
+
         perf_tab.setLayout(perf_layout)
         tabs.addTab(perf_tab, "Performance")
         
@@ -432,15 +877,21 @@ class SystemMonitor(QMainWindow):
         self.resize(1200, 800)
         
         # Instance variables
-        self.process_data = {}
-        self.sorted_process_list = []
+        self.process_data = ProcessSnapshot.from_dicts(0.0, {})
+        self.process_summary = None  # aggregates.summarize() of the latest tick
+        # Preallocated ring buffers; plots read zero-copy views of them. Sample
+        # times are kept too (relative to chart_epoch, to keep them small) since
+        # adaptive sampling makes the spacing vary
         self.chart_data = {
-            'cpu': deque([0] * MAX_CHART_HISTORY, maxlen=MAX_CHART_HISTORY),
-            'memory': deque([0] * MAX_CHART_HISTORY, maxlen=MAX_CHART_HISTORY),
-            'disk': deque([0] * MAX_CHART_HISTORY, maxlen=MAX_CHART_HISTORY),
-            'network': deque([0] * MAX_CHART_HISTORY, maxlen=MAX_CHART_HISTORY)
+            series: RingBuffer(MAX_CHART_HISTORY)
+            for series in PERFORMANCE_VIEWS.values() if series
         }
-        self.time_data = list(range(-MAX_CHART_HISTORY + 1, 1))
+        self.cpu_times_data = RingBuffer(MAX_CHART_HISTORY, width=len(CPU_TIME_SERIES))
+        self.core_data = None  # Sized on the first sample that reports per-core usage
+        self.chart_epoch = time.time()
+        self.time_data = RingBuffer(MAX_CHART_HISTORY)
+        for offset in range(MAX_CHART_HISTORY - 1, -1, -1):
+            self.time_data.append(-offset)
         
         # Create the UI
         self.init_ui()
@@ -526,6 +977,7 @@ class SystemMonitor(QMainWindow):
         self.create_users_tab()
         self.create_details_tab()
         self.create_services_tab()  # New tab for services
+        self.create_containers_tab()
         
         # Create status bar
         self.status_bar = QStatusBar()
@@ -542,19 +994,31 @@ class SystemMonitor(QMainWindow):
         # Process count indicator
         self.process_count = QLabel("Processes: 0")
         self.status_bar.addPermanentWidget(self.process_count)
+        
+        # Sampling interval and the collector's own CPU cost
+        self.sampling_indicator = QLabel("Sampling: -")
+        self.status_bar.addPermanentWidget(self.sampling_indicator)
     
     def init_workers(self):
-        # Create and start process data worker
-        self.process_worker = ProcessWorker()
-        self.process_worker.data_updated.connect(self.update_process_data)
-        self.process_worker.error_occurred.connect(self.show_error)
-        self.process_worker.start()
-        
-        # Create and start performance data worker
-        self.perf_worker = PerformanceWorker()
-        self.perf_worker.data_updated.connect(self.update_performance_data)
-        self.perf_worker.error_occurred.connect(self.show_error)
-        self.perf_worker.start()
+        # Subscribe to the shared collector; it samples the host once per tick
+        self.collector_worker = CollectorWorker()
+        self.collector_worker.process_data_updated.connect(self.update_process_data)
+        self.collector_worker.performance_data_updated.connect(self.update_performance_data)
+        self.collector_worker.error_occurred.connect(self.show_error)
+        
+        # Record every tick to the on-disk history; if another monitor already
+        # records this directory the store opens read-only and we only query it
+        self.history = None
+        self._unsubscribe_history = None
+        try:
+            self.history = HistoryStore()
+            if self.history.writable:
+                recorder = HistoryRecorder(self.history)
+                self._unsubscribe_history = self.collector_worker.collector.subscribe(recorder.record)
+        except (OSError, ValueError) as e:
+            self.show_error(f"History unavailable: {str(e)}")
+        
+        self.collector_worker.start()
     
     #region Process Tab
     def create_processes_tab(self):
@@ -566,178 +1030,171 @@ class SystemMonitor(QMainWindow):
         
         filter_layout.addWidget(QLabel("View by:"))
         self.group_combo = QComboBox()
-        self.group_combo.addItems(["All processes", "Apps only", "Background processes", "Windows processes"])
+        self.group_combo.addItems(list(PROCESS_VIEWS))
         self.group_combo.currentIndexChanged.connect(self.apply_process_filter)
         filter_layout.addWidget(self.group_combo)
         
+        # Filter as you type; the query is matched against an index kept per tick
+        self.process_index = ProcessIndex()
+        self.process_query = None
+        self.process_filter = QLineEdit()
+        self.process_filter.setPlaceholderText("Filter: name, user:root, cpu>50 mem>2G, /regex/")
+        self.process_filter.setClearButtonEnabled(True)
+        self.process_filter.setMinimumWidth(320)
+        self.process_filter.textChanged.connect(self.apply_process_filter)
+        filter_layout.addWidget(self.process_filter)
+        
         filter_layout.addStretch()
         
         # Add grouping options
         filter_layout.addWidget(QLabel("Group by:"))
         self.grouping_combo = QComboBox()
-        self.grouping_combo.addItems(["None", "Process type", "Status", "User"])
+        self.grouping_combo.addItems(list(PROCESS_GROUPINGS))
         self.grouping_combo.currentIndexChanged.connect(self.apply_process_grouping)
         filter_layout.addWidget(self.grouping_combo)
         
         layout.addLayout(filter_layout)
         
-        # Add process table
-        self.process_table = QTableWidget()
-        self.process_table.setColumnCount(10)
-        self.process_table.setHorizontalHeaderLabels([
-            "Name", "PID", "Status", "User name", "CPU %", "Memory",
-            "Disk I/O", "Network I/O", "GPU %", "Description"
-        ])
+        # Add process table: model/view so each tick only signals what changed
+        self.process_model = ProcessTableModel(self)
+        self.process_proxy = ProcessFilterProxy(self)
+        self.process_proxy.setSourceModel(self.process_model)
+        self.process_table = QTableView()
+        self.process_table.setModel(self.process_proxy)
+        self.process_table.verticalHeader().hide()
         
         # Set column stretch behavior
         header = self.process_table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.Stretch)  # Name column stretches
-        for i in range(1, 10):
+        for i in range(1, len(PROCESS_TABLE_HEADERS)):
             header.setSectionResizeMode(i, QHeaderView.Interactive)
         
-        # Enable sorting
+        # Enable sorting, by CPU usage (descending) by default
         self.process_table.setSortingEnabled(True)
+        self.process_table.sortByColumn(4, Qt.DescendingOrder)
         
         # Enable context menu
         self.process_table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.process_table.customContextMenuRequested.connect(self.show_process_menu)
         
         # Enable selection behavior
-        self.process_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.process_table.setSelectionMode(QTableWidget.SingleSelection)
+        self.process_table.setSelectionBehavior(QTableView.SelectRows)
+        self.process_table.setSelectionMode(QTableView.SingleSelection)
         
         # Connect double-click to show details
-        self.process_table.cellDoubleClicked.connect(self.show_process_details)
-        
-        layout.addWidget(self.process_table)
+        self.process_table.doubleClicked.connect(self.show_process_details)
+        
+        # Grouped view: a tree whose model is only updated while it is shown
+        self.process_tree_model = ProcessTreeModel(self)
+        self.process_tree_proxy = ProcessTreeProxy(self)
+        self.process_tree_proxy.setSourceModel(self.process_tree_model)
+        self.process_tree = QTreeView()
+        self.process_tree.setModel(self.process_tree_proxy)
+        self.process_tree.setUniformRowHeights(True)
+        self.process_tree.header().setSectionResizeMode(0, QHeaderView.Interactive)
+        self.process_tree.setColumnWidth(0, 260)
+        self.process_tree.setSortingEnabled(True)
+        self.process_tree.sortByColumn(6, Qt.DescendingOrder)
+        self.process_tree.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.process_tree.customContextMenuRequested.connect(self.show_process_menu)
+        self.process_tree.setSelectionBehavior(QTreeView.SelectRows)
+        self.process_tree.setSelectionMode(QTreeView.SingleSelection)
+        self.process_tree.doubleClicked.connect(self.show_process_details)
+        
+        self.process_stack = QStackedWidget()
+        self.process_stack.addWidget(self.process_table)
+        self.process_stack.addWidget(self.process_tree)
+        layout.addWidget(self.process_stack)
         
         widget.setLayout(layout)
         self.tabs.addTab(widget, "Processes")
     
+    def process_views(self):
+        """Return (view, proxy, model) for the process view being shown."""
+        if self.process_stack.currentWidget() is self.process_tree:
+            return self.process_tree, self.process_tree_proxy, self.process_tree_model
+        return self.process_table, self.process_proxy, self.process_model
+    
     def update_process_table(self):
-        if not self.process_data:
-            return
-            
-        # Remember the current selection
-        selected_items = self.process_table.selectedItems()
-        selected_pid = None
-        if selected_items:
-            row = selected_items[0].row()
-            pid_item = self.process_table.item(row, 1)
-            if pid_item:
-                selected_pid = int(pid_item.text())
-        
-        # Apply filters based on current filter settings
-        filtered_pids = self.apply_process_filter()
-        
-        # Sort processes by CPU usage (descending) by default
-        sorted_pids = sorted(
-            filtered_pids, 
-            key=lambda pid: self.process_data.get(pid, {}).get('cpu_percent', 0),
-            reverse=True
-        )
-        self.sorted_process_list = sorted_pids
-        
-        # Update the table
-        self.process_table.setSortingEnabled(False)  # Disable sorting while updating
-        self.process_table.setRowCount(len(sorted_pids))
-        
-        for row, pid in enumerate(sorted_pids):
-            process = self.process_data.get(pid, {})
-            
-            # Prepare cell items
-            name_item = QTableWidgetItem(process.get('name', 'Unknown'))
-            pid_item = QTableWidgetItem(str(pid))
-            status_item = QTableWidgetItem(process.get('status', 'Unknown'))
-            username_item = QTableWidgetItem(process.get('username', 'N/A'))
-            
-            cpu_value = process.get('cpu_percent', 0)
-            cpu_item = QTableWidgetItem()
-            cpu_item.setData(Qt.DisplayRole, f"{cpu_value:.1f}%")
-            cpu_item.setData(Qt.UserRole, cpu_value)  # For sorting
-            
-            memory_bytes = process.get('memory_bytes', 0)
-            memory_percent = process.get('memory_percent', 0)
-            memory_item = QTableWidgetItem()
-            memory_item.setData(Qt.DisplayRole, f"{memory_percent:.1f}% ({self.format_bytes(memory_bytes)})")
-            memory_item.setData(Qt.UserRole, memory_percent)  # For sorting
-            
-            disk_usage = process.get('disk_usage', 0)
-            disk_item = QTableWidgetItem(self.format_bytes(disk_usage))
-            disk_item.setData(Qt.UserRole, disk_usage)  # For sorting
-            
-            network_usage = process.get('network_usage', 0)
-            network_item = QTableWidgetItem(self.format_bytes(network_usage))
-            network_item.setData(Qt.UserRole, network_usage)  # For sorting
-            
-            gpu_item = QTableWidgetItem("N/A")  # Placeholder
-            desc_item = QTableWidgetItem("")  # Placeholder
-            
-            # Set items in the table
-            items = [name_item, pid_item, status_item, username_item, 
-                    cpu_item, memory_item, disk_item, network_item, gpu_item, desc_item]
-            
-            for col, item in enumerate(items):
-                self.process_table.setItem(row, col, item)
-                
-                # Color high resource usage cells
-                if col == 4 and cpu_value > 50:  # CPU
-                    item.setForeground(QBrush(QColor("#CC0000")))
-                elif col == 5 and memory_percent > 50:  # Memory
-                    item.setForeground(QBrush(QColor("#CC0000")))
-        
-        self.process_table.setSortingEnabled(True)  # Re-enable sorting
-        
-        # Restore selection if the process still exists
-        if selected_pid is not None:
-            for row in range(self.process_table.rowCount()):
-                pid_item = self.process_table.item(row, 1)
-                if pid_item and int(pid_item.text()) == selected_pid:
-                    self.process_table.selectRow(row)
-                    break
+        # The model diffs the snapshot against its rows and signals only the changes;
+        # the view keeps its selection and sort order by itself
+        _, proxy, model = self.process_views()
+        flipped = ()
+        if self.process_query is not None:
+            # Match first, so rows the model inserts or changes are filtered against this tick
+            flipped = self.update_process_query(self.process_query)
+        model.set_snapshot(self.process_data)
+        proxy.refilter(flipped)
+    
+    def update_process_query(self, query):
+        """Bring the index and query up to date with process_data; return the pids that flipped."""
+        self.process_index.apply(self.process_data)
+        return query.update(self.process_index, self.process_data)
     
     def apply_process_filter(self):
-        filter_text = self.group_combo.currentText() if hasattr(self, 'group_combo') else "All processes"
-        filtered_pids = []
-        
-        for pid, process in self.process_data.items():
-            # Apply filtering logic based on selected filter
-            if filter_text == "All processes":
-                filtered_pids.append(pid)
-            elif filter_text == "Apps only":
-                # Simple heuristic to identify apps: they have a visible window
-                if process.get('status') == 'running' and not process.get('name', '').startswith('System'):
-                    filtered_pids.append(pid)
-            elif filter_text == "Background processes":
-                # Background processes usually don't have visible windows
-                if process.get('status') in ['sleeping', 'disk-sleep', 'stopped']:
-                    filtered_pids.append(pid)
-            elif filter_text == "Windows processes":
-                # Windows processes typically run as SYSTEM, LOCAL SERVICE, or NETWORK SERVICE
-                username = process.get('username', '').lower()
-                if 'system' in username or 'local service' in username or 'network service' in username:
-                    filtered_pids.append(pid)
-        
-        return filtered_pids
+        view = self.group_combo.currentText() if hasattr(self, 'group_combo') else "All processes"
+        text = self.process_filter.text() if hasattr(self, 'process_filter') else ""
+        try:
+            query = ProcessQuery(f"{PROCESS_VIEWS[view]} {text}")
+        except QueryError as e:
+            # Usually a half-typed term: keep the last valid filter
+            self.status_bar.showMessage(str(e), 3000)
+            return
+        if query:
+            self.update_process_query(query)
+            self.process_query = query
+        else:
+            self.process_query = None
+        self.process_proxy.set_query(self.process_query)
+        self.process_tree_proxy.set_query(self.process_query)
+    
+    def selected_pid(self):
+        view, proxy, model = self.process_views()
+        rows = view.selectionModel().selectedRows()
+        if not rows:
+            return None
+        return model.pid_of(proxy.mapToSource(rows[0]))
+    
+    def select_pid(self, pid):
+        view, proxy, model = self.process_views()
+        index = proxy.mapFromSource(model.index_of_pid(pid))
+        if not index.isValid():
+            return False
+        self.select_process_index(index)
+        return True
+    
+    def select_process_index(self, index):
+        # scrollTo() also expands collapsed parents in the tree
+        view, _, _ = self.process_views()
+        view.setCurrentIndex(index)
+        view.scrollTo(index)
     
     def apply_process_grouping(self):
         grouping = self.grouping_combo.currentText() if hasattr(self, 'grouping_combo') else "None"
-        # In a real implementation, this would reorganize the table with group headers
-        # For simplicity, just update the table
+        mode = PROCESS_GROUPINGS[grouping]
+        if mode is None:
+            self.process_stack.setCurrentWidget(self.process_table)
+            self.process_tree_model.clear()
+        else:
+            self.process_tree_model.set_mode(mode, self.process_data)
+            self.process_stack.setCurrentWidget(self.process_tree)
+            # Open the groups, or the first level below init, so processes show straight away
+            if mode == 'parent':
+                self.process_tree.expandToDepth(0)
+            else:
+                self.process_tree.expandAll()
         self.update_process_table()
+        # The hidden view's proxy missed the matches that flipped meanwhile;
+        # filter the one now shown against the current query in full
+        _, proxy, _ = self.process_views()
+        proxy.set_query(self.process_query)
     
     def show_process_menu(self, pos):
-        selected_items = self.process_table.selectedItems()
-        if not selected_items:
-            return
-            
-        row = selected_items[0].row()
-        pid_item = self.process_table.item(row, 1)
-        if not pid_item:
+        pid = self.selected_pid()
+        if pid is None:
             return
             
         try:
-            pid = int(pid_item.text())
             if not psutil.pid_exists(pid):
                 return
                 
@@ -756,12 +1213,13 @@ class SystemMonitor(QMainWindow):
             menu.addSeparator()
             
             details_action = menu.addAction("Properties")
-            details_action.triggered.connect(lambda: self.show_process_details(row, 0))
+            details_action.triggered.connect(lambda: self.open_process_details(pid))
             
             create_dump_action = menu.addAction("Create dump file")
             create_dump_action.triggered.connect(lambda: self.create_dump_file(pid))
             
-            menu.exec_(self.process_table.viewport().mapToGlobal(pos))
+            view, _, _ = self.process_views()
+            menu.exec_(view.viewport().mapToGlobal(pos))
         except Exception as e:
             self.show_error(f"Menu creation error: {str(e)}")
     
@@ -824,13 +1282,16 @@ class SystemMonitor(QMainWindow):
         except Exception as e:
             self.show_error(f"Error creating dump file: {str(e)}")
     
-    def show_process_details(self, row, column):
-        pid_item = self.process_table.item(row, 1)
-        if not pid_item:
-            return
-            
+    def show_process_details(self, index):
+        _, proxy, model = self.process_views()
+        source_index = proxy.mapToSource(index)
+        if source_index.isValid():
+            pid = model.pid_of(source_index)
+            if pid is not None:
+                self.open_process_details(pid)
+    
+    def open_process_details(self, pid):
         try:
-            pid = int(pid_item.text())
             if pid in self.process_data:
                 dialog = ProcessDetailsDialog(pid, self.process_data[pid], self)
                 dialog.exec_()
@@ -839,6 +1300,10 @@ class SystemMonitor(QMainWindow):
     
     def show_search_dialog(self):
         dialog = SearchDialog(self)
+        # Search as you type: the selection follows the first match
+        dialog.search_field.textChanged.connect(
+            lambda text: self.search_process(text, dialog.is_case_sensitive())
+        )
         if dialog.exec_() == QDialog.Accepted:
             search_text = dialog.get_search_text()
             case_sensitive = dialog.is_case_sensitive()
@@ -849,28 +1314,34 @@ class SystemMonitor(QMainWindow):
             return
             
         # Check if search text is a valid PID
+        if search_text.isdigit() and self.select_pid(int(search_text)):
+            return
+        
         try:
-            pid = int(search_text)
-            # Search by PID
-            for row in range(self.process_table.rowCount()):
-                pid_item = self.process_table.item(row, 1)
-                if pid_item and int(pid_item.text()) == pid:
-                    self.process_table.selectRow(row)
-                    return
-        except ValueError:
-            # Search by name
-            for row in range(self.process_table.rowCount()):
-                name_item = self.process_table.item(row, 0)
-                if name_item:
-                    name = name_item.text()
-                    if case_sensitive:
-                        if search_text in name:
-                            self.process_table.selectRow(row)
-                            return
-                    else:
-                        if search_text.lower() in name.lower():
-                            self.process_table.selectRow(row)
-                            return
+            query = ProcessQuery(search_text, case_sensitive)
+        except QueryError as e:
+            self.status_bar.showMessage(str(e), 5000)
+            return
+        self.update_process_query(query)
+        
+        # Of the matches the view shows, select the first in its order (depth first in the tree)
+        _, proxy, model = self.process_views()
+        first = None
+        for pid in query.matches:
+            index = proxy.mapFromSource(model.index_of_pid(pid))
+            if not index.isValid():
+                continue
+            position = []
+            parent = index
+            while parent.isValid():
+                position.append(parent.row())
+                parent = parent.parent()
+            position.reverse()
+            if first is None or position < first[0]:
+                first = (position, index)
+        if first is not None:
+            self.select_process_index(first[1])
+            return
         
         # If not found
         self.status_bar.showMessage(f"No process matching '{search_text}' found.", 5000)
@@ -914,106 +1385,251 @@ class SystemMonitor(QMainWindow):
         # Connect item selection
         nav_panel.itemClicked.connect(self.change_performance_view)
         
-        # Right content area with stacked widgets
-        self.perf_content = QWidget()
-        self.perf_layout = QVBoxLayout(self.perf_content)
-        
-        # CPU Chart
-        self.cpu_chart_widget = pg.PlotWidget()
-        self.cpu_chart_widget.setBackground('w')
-        self.cpu_chart_widget.setTitle("CPU Utilization", color='k')
-        self.cpu_chart_widget.setLabel('left', 'Usage', units='%')
-        self.cpu_chart_widget.setLabel('bottom', 'Time (seconds)')
-        self.cpu_chart_widget.showGrid(x=True, y=True)
-        self.cpu_chart_widget.setYRange(0, 100)
-        self.cpu_plot = self.cpu_chart_widget.plot(self.time_data, 
-                                                 list(self.chart_data['cpu']), 
-                                                 pen='#1f77b4')
-        
-        # CPU information display
+        # Right content area: one persistent page per view, switched in place
+        self.perf_stack = QStackedWidget()
+        self.perf_charts = {}
+        self.perf_plots = {}
+        
+        # CPU
         self.cpu_info = QLabel("CPU Information")
+        cpu_page = self.create_performance_page(
+            'cpu', "CPU Utilization", '%', '#000000', self.cpu_info, y_range=(0, 100))
+        self.create_cpu_breakdown(cpu_page)
+        self.perf_stack.addWidget(cpu_page)
         
-        # Memory Chart
-        self.memory_chart_widget = pg.PlotWidget()
-        self.memory_chart_widget.setBackground('w')
-        self.memory_chart_widget.setTitle("Memory Usage", color='k')
-        self.memory_chart_widget.setLabel('left', 'Usage', units='%')
-        self.memory_chart_widget.setLabel('bottom', 'Time (seconds)')
-        self.memory_chart_widget.showGrid(x=True, y=True)
-        self.memory_chart_widget.setYRange(0, 100)
-        self.memory_plot = self.memory_chart_widget.plot(self.time_data, 
-                                                       list(self.chart_data['memory']), 
-                                                       pen='#2ca02c')
-        
-        # Memory information display
+        # Memory
         self.memory_info = QLabel("Memory Information")
+        self.perf_stack.addWidget(self.create_performance_page(
+            'memory', "Memory Usage", '%', '#2ca02c', self.memory_info, y_range=(0, 100)))
+        
+        # Disk
+        self.disk_info = QLabel("Disk Information")
+        self.perf_stack.addWidget(self.create_performance_page(
+            'disk', "Disk Activity", 'MB/s', '#9467bd', self.disk_info))
+        
+        # Network
+        self.network_info = QLabel("Network Information")
+        self.perf_stack.addWidget(self.create_performance_page(
+            'network', "Network Activity", 'MB/s', '#d62728', self.network_info))
+        
+        # Placeholder for GPU
+        gpu_label = QLabel("GPU information not available")
+        gpu_label.setAlignment(Qt.AlignCenter)
+        self.perf_stack.addWidget(gpu_label)
         
         # Initial view (CPU)
         self.current_perf_view = "CPU"
-        self.perf_layout.addWidget(self.cpu_chart_widget)
-        self.perf_layout.addWidget(self.cpu_info)
+        
+        self.perf_range = None
+        
+        # Time range selection above the charts
+        perf_right = QWidget()
+        perf_right_layout = QVBoxLayout(perf_right)
+        perf_right_layout.setContentsMargins(0, 0, 0, 0)
+        range_controls = QHBoxLayout()
+        range_controls.addWidget(QLabel("Range:"))
+        self.perf_range_combo = QComboBox()
+        self.perf_range_combo.addItems(list(PERFORMANCE_RANGES))
+        self.perf_range_combo.currentIndexChanged.connect(self.change_performance_range)
+        range_controls.addWidget(self.perf_range_combo)
+        range_controls.addStretch()
+        perf_right_layout.addLayout(range_controls)
+        perf_right_layout.addWidget(self.perf_stack)
+        
+        # Zooming a history chart re-queries the visible range once the mouse settles
+        self.perf_history_timer = QTimer(self)
+        self.perf_history_timer.setSingleShot(True)
+        self.perf_history_timer.setInterval(150)
+        self.perf_history_timer.timeout.connect(self.update_performance_history)
         
         # Add panels to splitter
         splitter.addWidget(nav_panel)
-        splitter.addWidget(self.perf_content)
+        splitter.addWidget(perf_right)
         splitter.setSizes([200, 800])  # Set initial sizes
         
         layout.addWidget(splitter, 0, 0)
         widget.setLayout(layout)
+        self.performance_tab = widget
         self.tabs.addTab(widget, "Performance")
+        self.tabs.currentChanged.connect(self.refresh_performance_chart)
+    
+    def create_performance_page(self, series, title, units, pen, info_label, y_range=None):
+        page = QWidget()
+        page_layout = QVBoxLayout(page)
+        page_layout.setContentsMargins(0, 0, 0, 0)
+        
+        chart_widget = pg.PlotWidget(axisItems={'bottom': PerformanceAxis()})
+        self.perf_charts[series] = chart_widget
+        chart_widget.setBackground('w')
+        chart_widget.setTitle(title, color='k')
+        chart_widget.setLabel('left', 'Usage', units=units)
+        chart_widget.setLabel('bottom', 'Time (seconds)')
+        chart_widget.showGrid(x=True, y=True)
+        if y_range is not None:
+            chart_widget.setYRange(*y_range)
+        
+        # Curves are plotted at their sample times and shifted so "now" sits at x=0.
+        # pyqtgraph's peak downsampling keeps long live buffers at pixel resolution
+        plot = chart_widget.plot(pen=pen)
+        plot.setDownsampling(auto=True, method='peak')
+        plot.setClipToView(True)
+        self.perf_plots[series] = plot
+        chart_widget.sigXRangeChanged.connect(self.schedule_performance_history)
+        
+        page_layout.addWidget(chart_widget)
+        page_layout.addWidget(info_label)
+        return page
+    
+    def create_cpu_breakdown(self, page):
+        # Stacked user/system/iowait/steal areas under the total utilization curve
+        chart_widget = self.perf_charts['cpu']
+        chart_widget.addLegend(offset=(10, 10))
+        chart_widget.plotItem.legend.addItem(self.perf_plots['cpu'], "total")
+        self.cpu_time_plots = []
+        self.cpu_time_fills = []
+        for name, color in CPU_TIME_SERIES:
+            fill = QColor(color)
+            fill.setAlpha(90)
+            if not self.cpu_time_plots:
+                # The first band fills down to zero, the rest to the band below
+                band = chart_widget.plot(pen=pg.mkPen(color), name=name, fillLevel=0, brush=pg.mkBrush(fill))
+            else:
+                band = chart_widget.plot(pen=pg.mkPen(color), name=name)
+                band_fill = pg.FillBetweenItem(self.cpu_time_plots[-1], band, brush=pg.mkBrush(fill))
+                chart_widget.addItem(band_fill)
+                self.cpu_time_fills.append(band_fill)
+            self.cpu_time_plots.append(band)
+        # Keep the total curve drawn above the bands
+        self.perf_plots['cpu'].setZValue(10)
+        
+        # Per-core heatmap: one image row per core, one column per sample, so a
+        # redraw is a single bulk upload however many cores there are
+        heatmap_widget = pg.PlotWidget()
+        heatmap_widget.setBackground('w')
+        heatmap_widget.setTitle("Per-core Utilization", color='k')
+        heatmap_widget.setLabel('left', 'Core')
+        heatmap_widget.setLabel('bottom', 'Time (seconds)')
+        heatmap_widget.setMouseEnabled(x=False, y=False)
+        self.core_heatmap = pg.ImageItem()
+        self.core_heatmap.setLookupTable(pg.colormap.get('viridis').getLookupTable(nPts=256))
+        heatmap_widget.addItem(self.core_heatmap)
+        self.core_heatmap_widget = heatmap_widget
+        page.layout().insertWidget(1, heatmap_widget)
     
     def change_performance_view(self, item, column):
-        # Clear current layout
-        for i in reversed(range(self.perf_layout.count())): 
-            widget = self.perf_layout.itemAt(i).widget()
-            if widget is not None:
-                widget.setParent(None)
+        # Drive and adapter entries show their parent's view
+        while item.parent() is not None:
+            item = item.parent()
         
         view_name = item.text(0)
         self.current_perf_view = view_name
-        
-        if view_name == "CPU":
-            self.perf_layout.addWidget(self.cpu_chart_widget)
-            self.perf_layout.addWidget(self.cpu_info)
-        elif view_name == "Memory":
-            self.perf_layout.addWidget(self.memory_chart_widget)
-            self.perf_layout.addWidget(self.memory_info)
-        elif view_name == "Disk":
-            # Basic disk view
-            disk_widget = pg.PlotWidget()
-            disk_widget.setBackground('w')
-            disk_widget.setTitle("Disk Activity", color='k')
-            disk_widget.setLabel('left', 'Usage', units='MB/s')
-            disk_widget.setLabel('bottom', 'Time (seconds)')
-            disk_widget.showGrid(x=True, y=True)
-            disk_plot = disk_widget.plot(self.time_data, list(self.chart_data['disk']), pen='#9467bd')
-            
-            self.perf_layout.addWidget(disk_widget)
-            self.perf_layout.addWidget(QLabel("Disk Information"))
-        elif view_name == "Network":
-            # Basic network view
-            net_widget = pg.PlotWidget()
-            net_widget.setBackground('w')
-            net_widget.setTitle("Network Activity", color='k')
-            net_widget.setLabel('left', 'Usage', units='MB/s')
-            net_widget.setLabel('bottom', 'Time (seconds)')
-            net_widget.showGrid(x=True, y=True)
-            net_plot = net_widget.plot(self.time_data, list(self.chart_data['network']), pen='#d62728')
-            
-            self.perf_layout.addWidget(net_widget)
-            self.perf_layout.addWidget(QLabel("Network Information"))
-        elif view_name == "GPU":
-            # Placeholder for GPU
-            gpu_label = QLabel("GPU information not available")
-            gpu_label.setAlignment(Qt.AlignCenter)
-            self.perf_layout.addWidget(gpu_label)
+        self.perf_stack.setCurrentIndex(list(PERFORMANCE_VIEWS).index(view_name))
+        if self.perf_range is None:
+            self.refresh_performance_chart()
+        else:
+            self.update_performance_history(full_range=True)
+    
+    def change_performance_range(self, index):
+        self.perf_range = PERFORMANCE_RANGES[self.perf_range_combo.currentText()]
+        history_mode = self.perf_range is not None
+        
+        # History charts use wall-clock axes; live ones count seconds back from now
+        for series, chart_widget in self.perf_charts.items():
+            chart_widget.getAxis('bottom').set_relative(not history_mode)
+            chart_widget.setLabel('bottom', 'Time' if history_mode else 'Time (seconds)')
+            self.perf_plots[series].setPos(0, 0)
+            chart_widget.enableAutoRange(axis='x')
+        
+        # The CPU breakdown and per-core heatmap are not kept in the history store
+        for band in self.cpu_time_plots:
+            band.setVisible(not history_mode)
+        for band_fill in self.cpu_time_fills:
+            band_fill.setVisible(not history_mode)
+        self.core_heatmap_widget.setVisible(not history_mode)
+        
+        if history_mode:
+            self.update_performance_history(full_range=True)
+        else:
+            self.refresh_performance_chart()
+    
+    def schedule_performance_history(self, *args):
+        if self.perf_range is not None:
+            self.perf_history_timer.start()
+    
+    def update_performance_history(self, full_range=False):
+        """Plot the visible chart from the history store, downsampled to its pixel width."""
+        series = PERFORMANCE_VIEWS[self.current_perf_view]
+        if series is None or self.perf_range is None or getattr(self, 'history', None) is None:
+            return
+        chart_widget = self.perf_charts[series]
+        if full_range:
+            end = time.time()
+            start = end - self.perf_range
+        else:
+            start, end = chart_widget.plotItem.vb.viewRange()[0]
+        width = max(int(chart_widget.plotItem.vb.width()), 100)
+        
+        # Rollup tiers keep each slot's min and max; interleaving both keeps spikes visible
+        result = self.history.query(series, start, end, max_points=16 * width)
+        times, values = envelope(result['time'], result['min'], result['max'])
+        times, values = m4(times, values, start, end, width)
+        
+        # Block the range signal so replotting does not schedule another query
+        chart_widget.blockSignals(True)
+        self.perf_plots[series].setData(times, values)
+        if full_range:
+            chart_widget.setXRange(start, end, padding=0)
+        chart_widget.blockSignals(False)
+    
+    def refresh_performance_chart(self, *args):
+        """Point the visible chart at the current ring buffer contents."""
+        if self.tabs.currentWidget() is not self.performance_tab or self.perf_range is not None:
+            return
+        series = PERFORMANCE_VIEWS[self.current_perf_view]
+        if series is None:
+            return
+        times = self.time_data.view()
+        latest = self.time_data.last()
+        plot = self.perf_plots[series]
+        plot.setData(times, self.chart_data[series].view())
+        plot.setPos(-latest, 0)
+        
+        if series == 'cpu':
+            # Columns of the stacked ring are already cumulative, so each band is a view
+            stacked = self.cpu_times_data.view()
+            for column, band in enumerate(self.cpu_time_plots):
+                band.setData(times, stacked[:, column])
+                band.setPos(-latest, 0)
+            for band_fill in self.cpu_time_fills:
+                band_fill.setPos(-latest, 0)
+            if self.core_data is not None:
+                self.core_heatmap.setImage(self.core_data.view(), autoLevels=False, levels=(0, 100))
+                self.core_heatmap.setRect(times[0] - latest, 0, latest - times[0], self.core_data.width)
     
     def update_performance_charts(self, perf_data):
-        # Update CPU chart
+        # Every series advances together so they share one time axis
+        self.time_data.append(perf_data.get('timestamp', time.time()) - self.chart_epoch)
+        
+        # Update CPU data
+        self.chart_data['cpu'].append(perf_data.get('cpu_percent', 0))
+        
+        # Store the breakdown pre-stacked so drawing it needs no per-tick arrays
+        cpu_times = perf_data.get('cpu_times') or {}
+        stacked = 0.0
+        row = []
+        for name, color in CPU_TIME_SERIES:
+            stacked += cpu_times.get(name, 0.0)
+            row.append(stacked)
+        self.cpu_times_data.append(row)
+        
+        cores = perf_data.get('cpu_per_core')
+        if cores:
+            if self.core_data is None or self.core_data.width != len(cores):
+                self.core_data = RingBuffer(MAX_CHART_HISTORY, width=len(cores))
+            self.core_data.append(cores)
+        elif self.core_data is not None:
+            self.core_data.append(0.0)
         if 'cpu_percent' in perf_data:
-            self.chart_data['cpu'].append(perf_data['cpu_percent'])
-            self.cpu_plot.setData(self.time_data, list(self.chart_data['cpu']))
-            
             # Update CPU info
             cpu_info_text = ""
             if 'cpu_count' in perf_data:
@@ -1023,13 +1639,25 @@ class SystemMonitor(QMainWindow):
                 if hasattr(perf_data['cpu_freq'], 'max') and perf_data['cpu_freq'].max:
                     cpu_info_text += f"Maximum Frequency: {perf_data['cpu_freq'].max:.2f} MHz\n"
             cpu_info_text += f"Current Utilization: {perf_data['cpu_percent']:.1f}%"
+            cgroup = perf_data.get('cgroup')
+            if cgroup:
+                # Inside a container with --cgroup utilization is of the quota
+                if cgroup['cpu_limit']:
+                    cpu_info_text += f" of a {cgroup['cpu_limit']:.2g}-core quota"
+                if cgroup['throttled_usec'] is not None:
+                    cpu_info_text += f"\nThrottled: {cgroup['throttled_usec'] / 1e6:.1f}s total"
+                    if cgroup['throttled_percent'] is not None:
+                        cpu_info_text += f", {cgroup['throttled_percent']:.0f}% of periods now"
+                if cgroup['pressure']:
+                    cpu_info_text += "\nPressure: " + ", ".join(
+                        f"{resource} {values['some']['avg10']:.1f}%" for resource, values in cgroup['pressure'].items()
+                    )
             self.cpu_info.setText(cpu_info_text)
         
-        # Update Memory chart
+        # Update Memory data
         if 'memory' in perf_data:
             memory = perf_data['memory']
             self.chart_data['memory'].append(memory['percent'])
-            self.memory_plot.setData(self.time_data, list(self.chart_data['memory']))
             
             # Update Memory info
             memory_info_text = (
@@ -1039,6 +1667,8 @@ class SystemMonitor(QMainWindow):
                 f"Free: {memory['free'] / (1024**3):.2f} GB"
             )
             self.memory_info.setText(memory_info_text)
+        else:
+            self.chart_data['memory'].append(0)
         
         # Update Disk data
         if 'disk' in perf_data:
@@ -1046,6 +1676,14 @@ class SystemMonitor(QMainWindow):
             # Use total rate for chart
             total_rate = (disk['read_rate'] + disk['write_rate']) / (1024**2)  # Convert to MB/s
             self.chart_data['disk'].append(total_rate)
+            self.disk_info.setText(
+                f"Read: {self.format_bytes(disk['read_rate'])}/s\n"
+                f"Write: {self.format_bytes(disk['write_rate'])}/s\n"
+                f"Total Read: {self.format_bytes(disk['read_bytes'])}\n"
+                f"Total Written: {self.format_bytes(disk['write_bytes'])}"
+            )
+        else:
+            self.chart_data['disk'].append(0)
         
         # Update Network data
         if 'network' in perf_data:
@@ -1053,25 +1691,85 @@ class SystemMonitor(QMainWindow):
             # Use total rate for chart
             total_rate = (network['bytes_sent_rate'] + network['bytes_recv_rate']) / (1024**2)  # Convert to MB/s
             self.chart_data['network'].append(total_rate)
+            self.network_info.setText(
+                f"Send: {self.format_bytes(network['bytes_sent_rate'])}/s\n"
+                f"Receive: {self.format_bytes(network['bytes_recv_rate'])}/s\n"
+                f"Total Sent: {self.format_bytes(network['bytes_sent'])}\n"
+                f"Total Received: {self.format_bytes(network['bytes_recv'])}"
+            )
+        else:
+            self.chart_data['network'].append(0)
+        
+        # Only the visible chart is redrawn; hidden ones catch up when shown
+        self.refresh_performance_chart()
     #endregion
 
     #region Other Tabs (Stub implementations)
     def create_app_history_tab(self):
-        widget = QWidget()
+        self.history_tab = QWidget()
         layout = QVBoxLayout()
         
-        label = QLabel("App history view is not fully implemented in this demo.")
-        label.setAlignment(Qt.AlignCenter)
-        layout.addWidget(label)
+        # Metric and time range selection
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Metric:"))
+        self.history_metric_combo = QComboBox()
+        self.history_metric_combo.addItems(list(HISTORY_METRICS))
+        self.history_metric_combo.currentIndexChanged.connect(self.update_history_chart)
+        controls.addWidget(self.history_metric_combo)
+        
+        controls.addWidget(QLabel("Range:"))
+        self.history_range_combo = QComboBox()
+        self.history_range_combo.addItems(list(HISTORY_RANGES))
+        self.history_range_combo.currentIndexChanged.connect(self.update_history_chart)
+        controls.addWidget(self.history_range_combo)
+        controls.addStretch()
+        layout.addLayout(controls)
+        
+        # Average line with a shaded min/max band
+        self.history_chart_widget = pg.PlotWidget(axisItems={'bottom': pg.DateAxisItem()})
+        self.history_chart_widget.setBackground('w')
+        self.history_chart_widget.showGrid(x=True, y=True)
+        self.history_min_plot = self.history_chart_widget.plot([], [], pen=pg.mkPen('#aec7e8'))
+        self.history_max_plot = self.history_chart_widget.plot([], [], pen=pg.mkPen('#aec7e8'))
+        self.history_chart_widget.addItem(pg.FillBetweenItem(
+            self.history_min_plot, self.history_max_plot, brush=pg.mkBrush(174, 199, 232, 90)))
+        self.history_avg_plot = self.history_chart_widget.plot([], [], pen=pg.mkPen('#1f77b4', width=2))
+        layout.addWidget(self.history_chart_widget)
+        
+        self.history_info = QLabel("")
+        layout.addWidget(self.history_info)
+        
+        self.history_tab.setLayout(layout)
+        self.tabs.addTab(self.history_tab, "App History")
+    
+    def update_history_chart(self):
+        if getattr(self, 'history', None) is None:
+            self.history_info.setText("No history recorded.")
+            return
         
-        table = QTableWidget()
-        table.setColumnCount(5)
-        table.setHorizontalHeaderLabels([
-            "Name", "CPU Time", "Network", "Metered Network", "Tile Updates"
-        ])
-        layout.addWidget(table)
-        widget.setLayout(layout)
-        self.tabs.addTab(widget, "App History")
+        metric_label = self.history_metric_combo.currentText()
+        metric, units = HISTORY_METRICS[metric_label]
+        span = HISTORY_RANGES[self.history_range_combo.currentText()]
+        end = time.time()
+        
+        # The store picks the finest retention tier that covers the range in MAX_HISTORY_POINTS
+        result = self.history.query(metric, end - span, end, max_points=MAX_HISTORY_POINTS)
+        self.history_avg_plot.setData(result['time'], result['avg'])
+        self.history_min_plot.setData(result['time'], result['min'])
+        self.history_max_plot.setData(result['time'], result['max'])
+        self.history_chart_widget.setTitle(f"{metric_label} history", color='k')
+        self.history_chart_widget.setLabel('left', metric_label, units=units)
+        self.history_chart_widget.setXRange(end - span, end, padding=0)
+        
+        if result['avg']:
+            peak = max(result['max'])
+            mean = sum(result['avg']) / len(result['avg'])
+            self.history_info.setText(
+                f"{len(result['time'])} points at {result['resolution']}s resolution | "
+                f"Average: {mean:.1f} {units} | Peak: {peak:.1f} {units}"
+            )
+        else:
+            self.history_info.setText("No samples recorded for this range yet.")
 
     def create_startup_tab(self):
         widget = QWidget()
@@ -1094,36 +1792,37 @@ class SystemMonitor(QMainWindow):
         widget = QWidget()
         layout = QVBoxLayout()
         
-        label = QLabel("Users view is not fully implemented in this demo.")
-        label.setAlignment(Qt.AlignCenter)
-        layout.addWidget(label)
-        
-        tree = QTreeWidget()
-        tree.setHeaderLabels(["User", "Status", "CPU", "Memory"])
-        
-        # Add current user
-        try:
-            import getpass
-            user_item = QTreeWidgetItem([getpass.getuser(), "Active", "0%", "0%"])
-            tree.addTopLevelItem(user_item)
-        except:
-            pass
-            
-        layout.addWidget(tree)
+        # Per-user totals come grouped from the collector (aggregates.py), so
+        # refreshing costs one row per user, not one per process
+        self.users_model = UserTableModel(self)
+        users_proxy = QSortFilterProxyModel(self)
+        users_proxy.setSourceModel(self.users_model)
+        users_proxy.setSortRole(Qt.UserRole)
+        users_proxy.setDynamicSortFilter(True)
+        self.users_table = QTableView()
+        self.users_table.setModel(users_proxy)
+        self.users_table.verticalHeader().hide()
+        self.users_table.setSelectionBehavior(QTableView.SelectRows)
+        self.users_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.users_table.setSortingEnabled(True)
+        self.users_table.sortByColumn(2, Qt.DescendingOrder)
+        
+        layout.addWidget(self.users_table)
         widget.setLayout(layout)
+        self.users_tab = widget
         self.tabs.addTab(widget, "Users")
 
     def create_details_tab(self):
         widget = QWidget()
         layout = QVBoxLayout()
         
-        # This is basically a more detailed version of the process tab
-        self.details_table = QTableWidget()
-        self.details_table.setColumnCount(8)
-        self.details_table.setHorizontalHeaderLabels([
-            "Name", "PID", "Status", "User name", "CPU", "Memory", 
-            "Description", "Command Line"
-        ])
+        # This is basically a more detailed version of the process tab, on the
+        # same kind of model so a refresh only touches the rows that changed
+        self.details_model = ProcessDetailsModel(self)
+        self.details_table = QTableView()
+        self.details_table.setModel(self.details_model)
+        self.details_table.verticalHeader().hide()
+        self.details_table.setWordWrap(False)
         
         header = self.details_table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.Stretch)  # Name column stretches
@@ -1137,18 +1836,59 @@ class SystemMonitor(QMainWindow):
         widget = QWidget()
         layout = QVBoxLayout()
         
-        label = QLabel("Services view is not fully implemented in this demo.")
-        label.setAlignment(Qt.AlignCenter)
-        layout.addWidget(label)
-        
-        table = QTableWidget()
-        table.setColumnCount(4)
-        table.setHorizontalHeaderLabels([
-            "Name", "Status", "PID", "Description"
-        ])
-        layout.addWidget(table)
+        # Usage per systemd unit comes from its cgroup (see cgroups.py), read
+        # only while the tab is shown
+        self.service_sampler = ServiceSampler()
+        self.services_model = ServiceTableModel(self)
+        services_proxy = QSortFilterProxyModel(self)
+        services_proxy.setSourceModel(self.services_model)
+        services_proxy.setSortRole(Qt.UserRole)
+        services_proxy.setDynamicSortFilter(True)
+        self.services_table = QTableView()
+        self.services_table.setModel(services_proxy)
+        self.services_table.verticalHeader().hide()
+        self.services_table.setSelectionBehavior(QTableView.SelectRows)
+        self.services_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.services_table.setSortingEnabled(True)
+        self.services_table.sortByColumn(2, Qt.DescendingOrder)
+        
+        if not self.service_sampler.is_available():
+            label = QLabel("Services are read from systemd's cgroups and need Linux with cgroup v2.")
+            label.setAlignment(Qt.AlignCenter)
+            layout.addWidget(label)
+            self.services_table.hide()
+        layout.addWidget(self.services_table)
         widget.setLayout(layout)
+        self.services_tab = widget
         self.tabs.addTab(widget, "Services")
+    
+    def create_containers_tab(self):
+        widget = QWidget()
+        layout = QVBoxLayout()
+        
+        # Filled from the collector's snapshots, which only carry containers
+        # when it was started with --cgroup on a host
+        self.container_data = None
+        self.containers_model = ContainerTableModel(self)
+        containers_proxy = QSortFilterProxyModel(self)
+        containers_proxy.setSourceModel(self.containers_model)
+        containers_proxy.setSortRole(Qt.UserRole)
+        containers_proxy.setDynamicSortFilter(True)
+        self.containers_table = QTableView()
+        self.containers_table.setModel(containers_proxy)
+        self.containers_table.verticalHeader().hide()
+        self.containers_table.setSelectionBehavior(QTableView.SelectRows)
+        self.containers_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.containers_table.setSortingEnabled(True)
+        self.containers_table.sortByColumn(2, Qt.DescendingOrder)
+        
+        self.containers_hint = QLabel("Containers are read from their cgroups when started with --cgroup on a host.")
+        self.containers_hint.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.containers_hint)
+        layout.addWidget(self.containers_table)
+        widget.setLayout(layout)
+        self.containers_tab = widget
+        self.tabs.addTab(widget, "Containers")
     #endregion
 
     #region Status Bar and UI Updates
@@ -1157,60 +1897,52 @@ class SystemMonitor(QMainWindow):
         if self.tabs.currentWidget() == self.tabs.widget(0):
             self.update_process_table()
         
+        # Update the users table if we're on the Users tab
+        if self.tabs.currentWidget() is self.users_tab and self.process_summary:
+            self.users_model.set_rows(self.process_summary['by_user'])
+        
+        # Update the services table if we're on the Services tab
+        if self.tabs.currentWidget() is self.services_tab and self.service_sampler.is_available():
+            self.services_model.set_rows(self.service_sampler.sample(time.time()))
+        
+        # Update the containers table if we're on the Containers tab
+        if self.tabs.currentWidget() is self.containers_tab and self.container_data is not None:
+            self.containers_hint.hide()
+            self.containers_model.set_rows(self.container_data)
+        
         # Update the details table if we're on the Details tab
         if hasattr(self, 'details_table') and self.tabs.currentWidget() == self.tabs.widget(5):
             self.update_details_table()
         
+        # Update the history chart if we're on the App History tab
+        if self.tabs.currentWidget() is self.history_tab:
+            self.update_history_chart()
+        
         # Update status bar
         self.update_status_bar()
     
     def update_details_table(self):
-        if not self.process_data:
-            return
-            
-        self.details_table.setRowCount(0)
-        for pid, process in self.process_data.items():
-            row = self.details_table.rowCount()
-            self.details_table.insertRow(row)
-            
-            # Prepare and set items
-            self.details_table.setItem(row, 0, QTableWidgetItem(process.get('name', 'Unknown')))
-            self.details_table.setItem(row, 1, QTableWidgetItem(str(pid)))
-            self.details_table.setItem(row, 2, QTableWidgetItem(process.get('status', 'Unknown')))
-            self.details_table.setItem(row, 3, QTableWidgetItem(process.get('username', 'N/A')))
-            
-            cpu_item = QTableWidgetItem(f"{process.get('cpu_percent', 0):.1f}%")
-            self.details_table.setItem(row, 4, cpu_item)
-            
-            memory_bytes = process.get('memory_bytes', 0)
-            memory_percent = process.get('memory_percent', 0)
-            self.details_table.setItem(row, 5, QTableWidgetItem(
-                f"{memory_percent:.1f}% ({self.format_bytes(memory_bytes)})"
-            ))
-            
-            self.details_table.setItem(row, 6, QTableWidgetItem(""))  # Description placeholder
-            self.details_table.setItem(row, 7, QTableWidgetItem(process.get('cmdline', '')))
+        self.details_model.set_snapshot(self.process_data)
     
     def update_status_bar(self):
         try:
-            # Update process count
-            self.process_count.setText(f"Processes: {len(self.process_data)}")
-            
-            # Get CPU and memory values from performance data
-            cpu_percent = 0
-            memory_percent = 0
-            
-            for proc in self.process_data.values():
-                cpu_percent += proc.get('cpu_percent', 0)
-                memory_percent = max(memory_percent, proc.get('memory_percent', 0))
-            
-            # Cap CPU percent at 100% per core
-            cpu_count = psutil.cpu_count() or 1
-            cpu_percent = min(cpu_percent, 100 * cpu_count)
-            
-            # Update indicators
-            self.cpu_indicator.setText(f"CPU: {cpu_percent:.1f}%")
-            self.memory_indicator.setText(f"Memory: {memory_percent:.1f}%")
+            # Process totals arrive precomputed with each tick (see aggregates.py),
+            # so this costs the same however many processes there are. The CPU
+            # and memory indicators are set from system data in update_performance_data
+            summary = self.process_summary
+            if summary:
+                running = summary['by_status'].get('running', 0)
+                self.process_count.setText(f"Processes: {summary['count']} ({running} running)")
+                busiest = ", ".join(f"{top['name']} ({top['cpu_percent']:.1f}%)" for top in summary['top_cpu'])
+                largest = ", ".join(
+                    f"{top['name']} ({format_bytes(top['memory_bytes'])})" for top in summary['top_memory']
+                )
+                users = ", ".join(
+                    f"{user['user'] or 'N/A'} ({user['count']})" for user in summary['by_user'][:3]
+                )
+                self.process_count.setToolTip(
+                    f"Busiest: {busiest or '-'}\nLargest: {largest or '-'}\nTop users: {users or '-'}"
+                )
             
             # Show general status message
             self.status_bar.showMessage("Ready")
@@ -1232,11 +1964,25 @@ class SystemMonitor(QMainWindow):
         
         if 'memory' in data:
             self.memory_indicator.setText(f"Memory: {data['memory']['percent']:.1f}%")
+        
+        if 'processes' in data:
+            self.process_summary = data['processes']
+        
+        if 'containers' in data:
+            self.container_data = data['containers']
+        
+        if 'sampling' in data:
+            sampling = data['sampling']
+            self.sampling_indicator.setText(
+                f"Sampling: {sampling['interval']:.2g}s ({sampling['overhead_percent']:.1f}% CPU)"
+            )
     
     def force_refresh(self):
         # Force a full UI update
-        if hasattr(self, 'process_worker'):
-            self.process_worker.data_updated.emit(self.process_data)
+        if hasattr(self, 'collector_worker'):
+            snapshot = self.collector_worker.collector.latest()
+            if snapshot is not None:
+                self.update_process_data(snapshot.processes)
         
         self.update_ui()
         self.status_bar.showMessage("Refreshed", 3000)
@@ -1304,7 +2050,7 @@ class SystemMonitor(QMainWindow):
             'update_interval': self.refresh_timer.interval(),
             'column_widths': [
                 self.process_table.columnWidth(i) 
-                for i in range(self.process_table.columnCount())
+                for i in range(self.process_model.columnCount())
             ]
         }
         
@@ -1338,7 +2084,7 @@ class SystemMonitor(QMainWindow):
                 # Restore column widths
                 if 'column_widths' in settings:
                     for i, width in enumerate(settings['column_widths']):
-                        if i < self.process_table.columnCount():
+                        if i < self.process_model.columnCount():
                             self.process_table.setColumnWidth(i, width)
         except Exception as e:
             self.show_error(f"Error loading settings: {str(e)}")
@@ -1346,16 +2092,7 @@ class SystemMonitor(QMainWindow):
 
     #region Helper Functions
     def format_bytes(self, size):
-        if size == 0:
-            return "0 B"
-            
-        power = 2**10
-        n = 0
-        units = {0: 'B', 1: 'KB', 2: 'MB', 3: 'GB', 4: 'TB'}
-        while size > power and n < len(units)-1:
-            size /= power
-            n += 1
-        return f"{size:.1f} {units[n]}"
+        return format_bytes(size)
     
     def show_error(self, message):
         self.status_bar.showMessage(message, 5000)
@@ -1371,18 +2108,34 @@ class SystemMonitor(QMainWindow):
         if hasattr(self, 'refresh_timer'):
             self.refresh_timer.stop()
         
-        if hasattr(self, 'process_worker'):
-            self.process_worker.stop()
+        if hasattr(self, 'collector_worker'):
+            self.collector_worker.stop()
         
-        if hasattr(self, 'perf_worker'):
-            self.perf_worker.stop()
+        if getattr(self, 'history', None) is not None:
+            if self._unsubscribe_history is not None:
+                self._unsubscribe_history()
+            self.history.close()
+            self.history = None
         
         # Accept the close event
         event.accept()
     #endregion
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="Qt system monitor")
+    parser.add_argument("--backend", choices=PROCESS_BACKENDS, default="psutil",
+                        help="process sampling backend (procfs is Linux only)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="sample faster while the host is busy and back off while idle")
+    parser.add_argument("--cgroup", action="store_true",
+                        help="report container CPU quota, throttling, memory limit and pressure (cgroup v2)")
+    parser.add_argument("--connect", metavar="SOCKET",
+                        help="read snapshots from a running daemon.py instead of sampling")
+    args, qt_args = parser.parse_known_args()
+    get_collector(process_backend=args.backend, connect=args.connect, adaptive=args.adaptive,
+                  cgroup=args.cgroup)
+    
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setStyle(QStyleFactory.create("Fusion"))
     window = SystemMonitor()
     window.show()
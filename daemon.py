@@ -0,0 +1,207 @@
+"""Headless collector that serves snapshots to local clients over a Unix socket.
+
+    python daemon.py [--socket PATH] [--interval 1.0] [--keep 300] [--backend psutil]
+
+The daemon owns the only sampling loop on the host. Each tick is encoded once
+(see remote.py for the protocol) and kept in a bounded ring, so any number of
+dashboards, scripts or exporters can attach without re-sampling psutil:
+
+    python cpu.py --connect PATH
+    python cpuchart.py --connect PATH
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import threading
+from collections import deque
+
+from collector import PROCESS_BACKENDS, Collector
+from exporter import serve_metrics
+from history import HistoryRecorder, HistoryStore
+from remote import default_socket_path, encode_line, encode_snapshot
+
+DEFAULT_KEEP = 300  # Snapshots held for "history" requests
+
+
+class SnapshotRing:
+    """Recent snapshots, each pre-encoded as one JSON line, with a tick counter."""
+
+    def __init__(self, keep=DEFAULT_KEEP):
+        self.entries = deque(maxlen=keep)  # (sequence, timestamp, encoded snapshot)
+        self.sequence = 0
+        self.condition = threading.Condition()
+
+    def publish(self, snapshot):
+        encoded = json.dumps(encode_snapshot(snapshot), separators=(',', ':')).encode()
+        with self.condition:
+            self.sequence += 1
+            self.entries.append((self.sequence, snapshot.timestamp, encoded))
+            self.condition.notify_all()
+
+    def latest(self):
+        with self.condition:
+            return self.entries[-1] if self.entries else None
+
+    def since(self, timestamp):
+        with self.condition:
+            return [entry for entry in self.entries if entry[1] > timestamp]
+
+    def wait_after(self, sequence, timeout=None):
+        """Block until a tick newer than sequence exists; return the newer entries."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.sequence > sequence, timeout)
+            return [entry for entry in self.entries if entry[0] > sequence]
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                op = request['op']
+            except (ValueError, KeyError, TypeError):
+                self.reply_error("malformed request")
+                continue
+
+            ring = self.server.ring
+            if op == 'ping':
+                self.wfile.write(encode_line({'ok': True, 'sequence': ring.sequence}))
+            elif op == 'latest':
+                entry = ring.latest()
+                self.write_snapshots('snapshot', [entry] if entry else [], single=True)
+            elif op == 'history':
+                self.write_snapshots('snapshots', ring.since(float(request.get('since', 0.0))))
+            elif op == 'subscribe':
+                self.stream(ring)
+                return
+            else:
+                self.reply_error(f"unknown op: {op}")
+
+    def reply_error(self, message):
+        self.wfile.write(encode_line({'ok': False, 'error': message}))
+
+    def write_snapshots(self, key, entries, single=False):
+        # Splice the pre-encoded snapshots into the reply instead of re-serializing
+        if single:
+            body = entries[0][2] if entries else b'null'
+        else:
+            body = b'[' + b','.join(entry[2] for entry in entries) + b']'
+        self.wfile.write(b'{"ok":true,"' + key.encode() + b'":' + body + b'}\n')
+
+    def stream(self, ring):
+        self.wfile.write(encode_line({'ok': True}))
+        sequence = ring.sequence
+        while not self.server.stopping.is_set():
+            entries = ring.wait_after(sequence, timeout=1.0)
+            if not entries:
+                continue
+            # A client that fell behind only gets the newest tick, never a backlog
+            sequence, _, encoded = entries[-1]
+            try:
+                self.wfile.write(b'{"snapshot":' + encoded + b'}\n')
+                self.wfile.flush()
+            except OSError:
+                return
+
+
+class SnapshotServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, ring):
+        self.ring = ring
+        self.stopping = threading.Event()
+        super().__init__(path, RequestHandler)
+
+    def server_bind(self):
+        # Bind under a private umask so the socket is never group- or
+        # world-accessible, not even before a chmod could run
+        umask = os.umask(0o077)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+
+    def shutdown(self):
+        self.stopping.set()
+        super().shutdown()
+
+
+def remove_stale_socket(path):
+    """Remove a socket file left behind by a daemon that is no longer running."""
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+    else:
+        raise RuntimeError(f"a daemon is already serving {path}")
+    finally:
+        probe.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Headless system monitoring daemon")
+    parser.add_argument("--socket", default=default_socket_path(), help="Unix socket to serve on")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between samples")
+    parser.add_argument("--keep", type=int, default=DEFAULT_KEEP, help="snapshots kept for history requests")
+    parser.add_argument("--backend", choices=PROCESS_BACKENDS, default="psutil",
+                        help="process sampling backend (procfs is Linux only)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="sample faster while the host is busy and back off while idle")
+    parser.add_argument("--cgroup", action="store_true",
+                        help="report container CPU quota, throttling, memory limit and pressure (cgroup v2)")
+    parser.add_argument("--no-history", action="store_true", help="do not record the on-disk metric history")
+    parser.add_argument("--metrics-port", type=int, help="also serve Prometheus metrics on this port")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    collector = Collector(args.interval, args.backend, args.adaptive, args.cgroup)
+    ring = SnapshotRing(args.keep)
+    collector.subscribe(ring.publish, lambda message: print(message, flush=True))
+
+    history = None
+    if not args.no_history:
+        try:
+            history = HistoryStore()
+            if history.writable:
+                collector.subscribe(HistoryRecorder(history).record)
+        except (OSError, ValueError) as e:
+            print(f"History unavailable: {str(e)}", flush=True)
+
+    metrics = None
+    if args.metrics_port is not None:
+        metrics = serve_metrics(collector, port=args.metrics_port)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.socket)), exist_ok=True)
+    remove_stale_socket(args.socket)
+    server = SnapshotServer(args.socket, ring)
+
+    # SIGTERM stops the daemon the same way Ctrl+C does
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+    collector.start()
+    print(f"Serving snapshots on {args.socket}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stopping.set()
+        server.server_close()
+        if metrics is not None:
+            metrics.shutdown()
+        collector.stop()
+        if history is not None:
+            history.close()
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
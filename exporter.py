@@ -0,0 +1,274 @@
+"""Prometheus exposition endpoint for collector snapshots.
+
+    python exporter.py [--port 9101] [--top 10] [--connect SOCKET]
+
+MetricsExporter renders every collector tick into one bytes buffer; the
+HTTP handler only writes that buffer out, so a scrape never samples the host
+and costs the same however often Prometheus polls.
+"""
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from collector import PROCESS_BACKENDS, get_collector
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_PORT = 9101
+DEFAULT_TOP = 10  # Processes exported per top-N series
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricWriter:
+    """Accumulate exposition-format lines, writing each family's HELP/TYPE once."""
+
+    def __init__(self):
+        self.lines = []
+        self._declared = set()
+
+    def sample(self, name, kind, help_text, value, labels=None):
+        if value is None:
+            return
+        if name not in self._declared:
+            self._declared.add(name)
+            self.lines.append(f"# HELP {name} {help_text}")
+            self.lines.append(f"# TYPE {name} {kind}")
+        if labels:
+            label_text = ','.join(f'{key}="{escape_label(label)}"' for key, label in labels.items())
+            self.lines.append(f"{name}{{{label_text}}} {float(value)!r}")
+        else:
+            self.lines.append(f"{name} {float(value)!r}")
+
+    def render(self):
+        return ('\n'.join(self.lines) + '\n').encode()
+
+
+CGROUP_GAUGES = (
+    ('cpu_percent', 'cpumon_cgroup_cpu_usage_percent', "CPU use as a share of the quota, or of all CPUs without one."),
+    ('cpu_limit', 'cpumon_cgroup_cpu_limit_cores', "CPU quota in cores."),
+    ('throttled_percent', 'cpumon_cgroup_cpu_throttled_percent', "Enforcement periods throttled over the last tick."),
+    ('memory_current', 'cpumon_cgroup_memory_bytes', "Memory charged to the cgroup."),
+    ('memory_max', 'cpumon_cgroup_memory_limit_bytes', "Memory limit of the cgroup."),
+)
+CGROUP_COUNTERS = (
+    ('nr_throttled', 'cpumon_cgroup_cpu_throttled_periods_total', "Enforcement periods the cgroup was throttled in."),
+    ('throttled_usec', 'cpumon_cgroup_cpu_throttled_microseconds_total', "Time the cgroup spent throttled."),
+)
+
+
+def write_cgroups(out, cgroups):
+    """Write [(cgroups.CgroupFiles.sample() dict, labels)] family by family; unknown values are skipped."""
+    for key, name, help_text in CGROUP_GAUGES:
+        for cgroup, labels in cgroups:
+            out.sample(name, 'gauge', help_text, cgroup[key], labels)
+    for key, name, help_text in CGROUP_COUNTERS:
+        for cgroup, labels in cgroups:
+            out.sample(name, 'counter', help_text, cgroup[key], labels)
+    for cgroup, labels in cgroups:
+        for resource, kinds in cgroup['pressure'].items():
+            for kind, values in kinds.items():
+                out.sample('cpumon_cgroup_pressure_percent', 'gauge', "Share of the last 10s with tasks stalled.",
+                           values['avg10'], dict(labels, resource=resource, kind=kind))
+
+
+def render_snapshot(snapshot, top=DEFAULT_TOP):
+    """Render one collector snapshot as a Prometheus text exposition."""
+    system = snapshot.system
+    out = MetricWriter()
+
+    out.sample('cpumon_last_sample_timestamp_seconds', 'gauge', "Time the snapshot was taken.", snapshot.timestamp)
+
+    # CPU
+    out.sample('cpumon_cpu_usage_percent', 'gauge', "Total CPU utilisation.", system.cpu_percent)
+    for core, percent in enumerate(system.cpu_per_core or ()):
+        out.sample('cpumon_cpu_core_usage_percent', 'gauge', "Per-core CPU utilisation.", percent, {'core': core})
+    out.sample('cpumon_cpu_count', 'gauge', "Logical CPUs.", system.cpu_count)
+    if system.cpu_freq:
+        out.sample('cpumon_cpu_frequency_mhz', 'gauge', "Current CPU frequency.", system.cpu_freq.current)
+
+    # Memory and swap
+    memory = system.memory or {}
+    out.sample('cpumon_memory_usage_percent', 'gauge', "Memory in use.", memory.get('percent'))
+    for state, value in memory.items():
+        if state != 'percent':
+            out.sample('cpumon_memory_bytes', 'gauge', "Memory by state.", value, {'state': state})
+    swap = system.swap or {}
+    out.sample('cpumon_swap_usage_percent', 'gauge', "Swap in use.", swap.get('percent'))
+    for state, value in swap.items():
+        if state != 'percent':
+            out.sample('cpumon_swap_bytes', 'gauge', "Swap by state.", value, {'state': state})
+
+    # Disk and network
+    if system.disk:
+        # One family at a time: the exposition format wants each family's samples together
+        for direction in ('read', 'write'):
+            out.sample('cpumon_disk_bytes_total', 'counter', "Bytes transferred by all disks.",
+                       system.disk[f'{direction}_bytes'], {'direction': direction})
+        for direction in ('read', 'write'):
+            out.sample('cpumon_disk_bytes_per_second', 'gauge', "Disk throughput over the last tick.",
+                       system.disk[f'{direction}_rate'], {'direction': direction})
+    for partition in system.disk_partitions or ():
+        out.sample('cpumon_filesystem_usage_percent', 'gauge', "Filesystem space in use.", partition['percent'],
+                   {'mountpoint': partition['mountpoint'], 'device': partition['device']})
+    if system.net_totals:
+        out.sample('cpumon_network_bytes_total', 'counter', "Bytes moved by all interfaces.",
+                   system.net_totals['bytes_sent'], {'direction': 'sent'})
+        out.sample('cpumon_network_bytes_total', 'counter', "Bytes moved by all interfaces.",
+                   system.net_totals['bytes_recv'], {'direction': 'received'})
+    if system.network:
+        out.sample('cpumon_network_bytes_per_second', 'gauge', "Network throughput over the last tick.",
+                   system.network['bytes_sent_rate'], {'direction': 'sent'})
+        out.sample('cpumon_network_bytes_per_second', 'gauge', "Network throughput over the last tick.",
+                   system.network['bytes_recv_rate'], {'direction': 'received'})
+
+    # Load, sensors and battery
+    for period, value in zip(('1m', '5m', '15m'), system.load_avg or ()):
+        out.sample('cpumon_load_average', 'gauge', "System load average.", value, {'period': period})
+    for sensor, entries in (system.temperatures or {}).items():
+        for index, entry in enumerate(entries):
+            # Labels repeat across sockets ("Core 0" on each), so the index keeps series apart
+            out.sample('cpumon_temperature_celsius', 'gauge', "Sensor temperature.", entry.current,
+                       {'sensor': sensor, 'index': index, 'label': entry.label or ''})
+    if system.battery:
+        out.sample('cpumon_battery_percent', 'gauge', "Battery charge.", system.battery['percent'])
+        out.sample('cpumon_battery_plugged', 'gauge', "1 when on mains power.", int(bool(system.battery['power_plugged'])))
+
+    # Container limits (--cgroup): the enclosing container's, or one series per container on a host
+    cgroups = [(system.cgroup, {})] if system.cgroup else []
+    for container in system.containers or ():
+        cgroups.append((container, {'runtime': container['runtime'], 'container': container['name']}))
+    write_cgroups(out, cgroups)
+
+    # Processes: totals plus the top-N by CPU and by memory
+    processes = snapshot.processes
+    out.sample('cpumon_processes', 'gauge', "Running processes.", len(processes))
+    for field, name, help_text in (
+        ('cpu_percent', 'cpumon_process_cpu_usage_percent', "CPU utilisation of the busiest processes."),
+        ('memory_bytes', 'cpumon_process_memory_bytes', "Resident memory of the largest processes."),
+    ):
+        for row in processes.top(field, top):
+            labels = {'pid': processes.pids[row], 'name': processes.value(row, 'name', '')}
+            out.sample(name, 'gauge', help_text, processes.numbers[field][row], labels)
+
+    # Per-status and per-user breakdowns, aggregated by the collector
+    aggregates = snapshot.aggregates
+    if aggregates:
+        for status, count in aggregates['by_status'].items():
+            out.sample('cpumon_processes_by_status', 'gauge', "Processes per scheduler state.", count,
+                       {'status': status})
+        for key, name, help_text in (
+            ('count', 'cpumon_user_processes', "Processes per user."),
+            ('cpu_percent', 'cpumon_user_cpu_usage_percent', "CPU utilisation per user."),
+            ('memory_bytes', 'cpumon_user_memory_bytes', "Resident memory per user."),
+        ):
+            for user in aggregates['by_user']:
+                out.sample(name, 'gauge', help_text, user[key], {'user': user['user'] or ''})
+
+    return out.render()
+
+
+class MetricsExporter:
+    """Collector subscriber that keeps the latest exposition pre-rendered."""
+
+    def __init__(self, top=DEFAULT_TOP):
+        self.top = top
+        self.body = b''
+        self._lock = threading.Lock()
+
+    def record(self, snapshot):
+        body = render_snapshot(snapshot, self.top)
+        with self._lock:
+            self.body = body
+
+    def current(self):
+        with self._lock:
+            return self.body
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.server.exporter.current()
+        if not body:
+            self.send_error(503, "No snapshot collected yet")
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, exporter):
+        self.exporter = exporter
+        self.unsubscribe = None
+        super().__init__(address, MetricsHandler)
+
+    def shutdown(self):
+        if self.unsubscribe is not None:
+            self.unsubscribe()
+            self.unsubscribe = None
+        super().shutdown()
+        self.server_close()
+
+
+def serve_metrics(collector, host='127.0.0.1', port=DEFAULT_PORT, top=DEFAULT_TOP):
+    """Subscribe an exporter to collector and serve /metrics on a background thread.
+
+    Returns the server; shutdown() stops serving and unsubscribes. Port 0 picks a
+    free port, available afterwards as server.server_address[1].
+    """
+    exporter = MetricsExporter(top)
+    latest = collector.latest()
+    if latest is not None:
+        exporter.record(latest)
+    server = MetricsServer((host, port), exporter)
+    server.unsubscribe = collector.subscribe(exporter.record)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Prometheus exporter for system metrics")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port to serve /metrics on")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="processes exported per top-N series")
+    parser.add_argument("--backend", choices=PROCESS_BACKENDS, default="psutil",
+                        help="process sampling backend (procfs is Linux only)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="sample faster while the host is busy and back off while idle")
+    parser.add_argument("--cgroup", action="store_true",
+                        help="report container CPU quota, throttling, memory limit and pressure (cgroup v2)")
+    parser.add_argument("--connect", metavar="SOCKET",
+                        help="read snapshots from a running daemon.py instead of sampling")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    collector = get_collector(process_backend=args.backend, connect=args.connect, adaptive=args.adaptive,
+                              cgroup=args.cgroup)
+    server = serve_metrics(collector, args.host, args.port, args.top)
+    print(f"Serving metrics on http://{args.host}:{server.server_address[1]}/metrics", flush=True)
+    try:
+        collector.start()
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        collector.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""On-disk metric history with downsampled retention tiers.
+
+Each tier is a fixed-size ring file that is memory-mapped and appended to in
+place: raw 1s samples plus 10s, 1m and 1h min/avg/max rollups. Files never
+grow, and queries touch only the slots inside the requested time range, so
+days of history can be charted without reading it all into RAM.
+"""
+import mmap
+import os
+import struct
+import threading
+from array import array
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Metrics recorded from every SystemSnapshot
+METRICS = ('cpu', 'memory', 'swap', 'disk', 'network')
+
+# (resolution in seconds, capacity in slots) per tier, finest first
+TIERS = (
+    (1, 6 * 3600),        # 6 hours of raw samples
+    (10, 3 * 24 * 360),   # 3 days at 10s
+    (60, 30 * 24 * 60),   # 30 days at 1m
+    (3600, 2 * 365 * 24), # 2 years at 1h
+)
+
+MAGIC = b'CPMHIST1'
+# magic, resolution, capacity, metric count, head, count
+HEADER = struct.Struct('<8sdqqqq')
+HEADER_SIZE = 64
+
+
+def default_history_dir():
+    return os.path.join(os.path.expanduser('~'), '.cpumon', 'history')
+
+
+def system_metrics(system):
+    """Extract the METRICS values from a SystemSnapshot (rates in MB/s)."""
+    disk = system.disk
+    network = system.network
+    return (
+        system.cpu_percent or 0.0,
+        system.memory['percent'] if system.memory else 0.0,
+        system.swap['percent'] if system.swap else 0.0,
+        (disk['read_rate'] + disk['write_rate']) / (1024**2) if disk else 0.0,
+        (network['bytes_sent_rate'] + network['bytes_recv_rate']) / (1024**2) if network else 0.0,
+    )
+
+
+class RingFile:
+    """One tier: a memory-mapped ring of (timestamp, min/avg/max per metric) slots."""
+
+    def __init__(self, path, resolution, capacity, metric_count, writable):
+        self.path = path
+        self.resolution = resolution
+        self.metric_count = metric_count
+        self.width = 1 + 3 * metric_count  # doubles per slot
+        size = HEADER_SIZE + capacity * self.width * 8
+
+        exists = os.path.exists(path)
+        if not exists and not writable:
+            raise FileNotFoundError(path)
+        mode = 'r+b' if writable else 'rb'
+        if not exists:
+            with open(path, 'wb') as f:
+                f.truncate(size)
+        self._file = open(path, mode)
+        self._map = mmap.mmap(self._file.fileno(), 0,
+                              access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+
+        magic, stored_resolution, stored_capacity, stored_metrics, head, count = \
+            HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            if not writable:
+                raise ValueError(f"{path} is not a history file")
+            head = count = 0
+            stored_capacity = capacity
+            HEADER.pack_into(self._map, 0, MAGIC, resolution, capacity, metric_count, 0, 0)
+        elif stored_metrics != metric_count:
+            raise ValueError(f"{path} records {stored_metrics} metrics, expected {metric_count}")
+        self.capacity = stored_capacity
+        self.head = head
+        self.count = count
+        self._slots = memoryview(self._map)[HEADER_SIZE:].cast('d')
+
+    def close(self):
+        self._slots.release()
+        self._map.close()
+        self._file.close()
+
+    def reload_header(self):
+        # Readers in another process pick up the writer's progress here
+        self.head, self.count = HEADER.unpack_from(self._map, 0)[4:6]
+
+    def _physical(self, logical):
+        return (self.head - self.count + logical) % self.capacity
+
+    def timestamp_at(self, logical):
+        return self._slots[self._physical(logical) * self.width]
+
+    def last_timestamp(self):
+        return self.timestamp_at(self.count - 1) if self.count else None
+
+    def first_timestamp(self):
+        return self.timestamp_at(0) if self.count else None
+
+    def append(self, timestamp, stats):
+        """Write one slot; stats is a flat (min, avg, max) * metric_count sequence."""
+        base = self.head * self.width
+        self._slots[base + 1:base + self.width] = array('d', stats)
+        # Timestamp last, so a concurrent reader never sees a stamped half-written slot
+        self._slots[base] = timestamp
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        struct.pack_into('<qq', self._map, 32, self.head, self.count)
+
+    def _bisect(self, timestamp):
+        """Return the first logical slot whose timestamp is >= timestamp."""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.timestamp_at(middle) < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def query(self, metric_index, start, end):
+        """Return (timestamps, mins, avgs, maxs) for slots with start <= t <= end."""
+        first = self._bisect(start)
+        stop = self._bisect(end + 1e-9)
+        offset = 1 + 3 * metric_index
+        times, mins, avgs, maxs = [], [], [], []
+        slots = self._slots
+        width = self.width
+        for logical in range(first, stop):
+            base = self._physical(logical) * width
+            times.append(slots[base])
+            mins.append(slots[base + offset])
+            avgs.append(slots[base + offset + 1])
+            maxs.append(slots[base + offset + 2])
+        return times, mins, avgs, maxs
+
+
+class Rollup:
+    """Accumulate raw samples into one min/avg/max bucket of a coarser tier."""
+
+    def __init__(self, resolution, metric_count):
+        self.resolution = resolution
+        self.metric_count = metric_count
+        self.bucket = None
+        self._reset()
+
+    def _reset(self):
+        n = self.metric_count
+        self.mins = [float('inf')] * n
+        self.maxs = [float('-inf')] * n
+        self.sums = [0.0] * n
+        self.samples = 0
+
+    def add(self, timestamp, values):
+        """Add a sample; returns (bucket_time, stats) when a bucket closes, else None."""
+        bucket = timestamp - timestamp % self.resolution
+        closed = None
+        if self.bucket is not None and bucket != self.bucket:
+            closed = self.flush()
+        self.bucket = bucket
+        for i, value in enumerate(values):
+            if value < self.mins[i]:
+                self.mins[i] = value
+            if value > self.maxs[i]:
+                self.maxs[i] = value
+            self.sums[i] += value
+        self.samples += 1
+        return closed
+
+    def flush(self):
+        if not self.samples:
+            return None
+        stats = []
+        for i in range(self.metric_count):
+            stats.extend((self.mins[i], self.sums[i] / self.samples, self.maxs[i]))
+        closed = (self.bucket, stats)
+        self._reset()
+        return closed
+
+
+class HistoryStore:
+    """All retention tiers for one history directory.
+
+    Only one process may write a directory at a time; others that open it get
+    a read-only store (writable is then False) and can still query it.
+    """
+
+    def __init__(self, path=None, metrics=METRICS, tiers=TIERS, writable=True):
+        self.path = path or default_history_dir()
+        self.metrics = tuple(metrics)
+        self._lock = threading.Lock()
+        self._lock_file = None
+        if writable:
+            os.makedirs(self.path, exist_ok=True)
+            writable = self._acquire_writer_lock()
+        self.writable = writable
+        self.tiers = [
+            RingFile(os.path.join(self.path, f'tier-{resolution}s.ring'),
+                     resolution, capacity, len(self.metrics), writable)
+            for resolution, capacity in tiers
+        ]
+        self.rollups = [Rollup(ring.resolution, len(self.metrics)) for ring in self.tiers[1:]]
+
+    def _acquire_writer_lock(self):
+        if fcntl is None:
+            return True
+        self._lock_file = open(os.path.join(self.path, 'writer.lock'), 'w')
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            self._lock_file.close()
+            self._lock_file = None
+            return False
+
+    def close(self):
+        with self._lock:
+            if self.writable:
+                for ring, rollup in zip(self.tiers[1:], self.rollups):
+                    closed = rollup.flush()
+                    if closed is not None:
+                        ring.append(*closed)
+            for ring in self.tiers:
+                ring.close()
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+
+    def append(self, timestamp, values):
+        """Record one raw sample of every metric and feed the rollup tiers."""
+        if not self.writable:
+            return
+        with self._lock:
+            raw = self.tiers[0]
+            last = raw.last_timestamp()
+            if last is not None and timestamp <= last:
+                # The wall clock went backwards; keep the rings ordered
+                return
+            # Sub-second ticks (adaptive sampling) only reach the rollups, so the
+            # raw tier still covers its full retention period
+            if last is None or timestamp - last >= raw.resolution:
+                stats = []
+                for value in values:
+                    stats.extend((value, value, value))
+                raw.append(timestamp, stats)
+            for ring, rollup in zip(self.tiers[1:], self.rollups):
+                closed = rollup.add(timestamp, values)
+                if closed is not None:
+                    ring.append(*closed)
+
+    def tier_for(self, start, end, max_points=None):
+        """Pick the finest tier that still covers start and, if given, fits max_points."""
+        for ring in self.tiers:
+            if not self.writable:
+                ring.reload_header()
+            first = ring.first_timestamp()
+            if first is None:
+                continue
+            covers = first <= start or ring.count < ring.capacity
+            fits = max_points is None or (end - start) / ring.resolution <= max_points
+            if covers and fits:
+                return ring
+        return self.tiers[-1]
+
+    def query(self, metric, start, end, max_points=None):
+        """Return {'resolution', 'time', 'min', 'avg', 'max'} lists for metric over [start, end]."""
+        metric_index = self.metrics.index(metric)
+        with self._lock:
+            ring = self.tier_for(start, end, max_points)
+            times, mins, avgs, maxs = ring.query(metric_index, start, end)
+        return {'resolution': ring.resolution, 'time': times, 'min': mins, 'avg': avgs, 'max': maxs}
+
+
+class HistoryRecorder:
+    """Collector subscriber that appends every system snapshot to a HistoryStore."""
+
+    def __init__(self, store):
+        self.store = store
+
+    def record(self, snapshot):
+        system = snapshot.system
+        self.store.append(system.timestamp, system_metrics(system))
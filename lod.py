@@ -0,0 +1,50 @@
+"""Min/max-preserving downsampling for long-range charts.
+
+m4() splits the plotted time range into one bucket per pixel column and keeps
+the first, last, lowest and highest sample of each. That is exactly what a
+line renderer would light up in that column, so the chart looks the same as
+with every sample drawn, spikes included, while never drawing more than four
+points per pixel.
+"""
+import numpy as np
+
+
+def envelope(times, mins, maxs):
+    """Interleave per-slot min and max into one series so rollup extremes survive."""
+    times = np.asarray(times, dtype=np.float64)
+    values = np.empty(2 * len(times))
+    values[0::2] = mins
+    values[1::2] = maxs
+    return np.repeat(times, 2), values
+
+
+def _first_where(mask, segment_of):
+    """Index of the first True in mask for every segment that has one."""
+    hits = np.flatnonzero(mask)
+    _, first = np.unique(segment_of[hits], return_index=True)
+    return hits[first]
+
+
+def m4(times, values, start, end, width):
+    """Downsample sorted (times, values) over [start, end] to at most 4 * width points."""
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    width = max(int(width), 1)
+    if len(times) <= 4 * width or end <= start:
+        return times, values
+
+    # Pixel column of every sample; times are sorted, so columns never decrease
+    columns = ((times - start) * (width / (end - start))).astype(np.int64)
+    np.clip(columns, 0, width - 1, out=columns)
+    firsts = np.flatnonzero(np.r_[True, columns[1:] != columns[:-1]])
+    lasts = np.r_[firsts[1:], len(times)] - 1
+    segment_of = np.repeat(np.arange(len(firsts)), lasts - firsts + 1)
+
+    lows = np.minimum.reduceat(values, firsts)
+    highs = np.maximum.reduceat(values, firsts)
+    keep = np.unique(np.concatenate((
+        firsts, lasts,
+        _first_where(values == lows[segment_of], segment_of),
+        _first_where(values == highs[segment_of], segment_of),
+    )))
+    return times[keep], values[keep]
@@ -0,0 +1,309 @@
+"""Direct /proc reader used as an optional Linux process backend.
+
+ProcfsProcessSampler produces the same columnar snapshots as
+collector.ProcessSampler, but reads /proc/<pid>/stat, statm, status, io and
+cmdline straight into a reused buffer instead of going through psutil.Process. It
+shares the collector's FieldCache, so cmdline and username are only read
+when a new process appears.
+
+Linux keeps no per-process traffic counters, so network_usage is the number
+of bytes queued in the send and receive buffers of the process's sockets.
+"""
+import os
+import pwd
+
+from collector import SLOW_REFRESH_TICKS, FieldCache, parse_cgroup
+from rates import fill_rates
+from snapshot import ProcessSnapshotBuilder, recycle_strings
+
+# Single-letter states from /proc/<pid>/stat, named the way psutil names them
+PROC_STATUSES = {
+    'R': 'running',
+    'S': 'sleeping',
+    'D': 'disk-sleep',
+    'T': 'stopped',
+    't': 'tracing-stop',
+    'Z': 'zombie',
+    'X': 'dead',
+    'x': 'dead',
+    'K': 'wake-kill',
+    'W': 'waking',
+    'I': 'idle',
+    'P': 'parked',
+}
+
+
+def is_available(root='/proc'):
+    return os.path.isfile(os.path.join(root, 'stat')) and os.path.isdir(os.path.join(root, 'self'))
+
+
+class ProcfsReader:
+    """Read /proc files into one reusable buffer."""
+
+    def __init__(self, root='/proc', buffer_size=8192):
+        self.root = root
+        self._buf = bytearray(buffer_size)
+        self._bufs = [self._buf]
+        self.clock_ticks = os.sysconf('SC_CLK_TCK')
+        self.page_size = os.sysconf('SC_PAGE_SIZE')
+        self.boot_time = self._read_boot_time()
+        self._usernames = {}
+
+    def read(self, path):
+        """Return the contents of path, reading into the shared buffer."""
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            n = os.readv(fd, self._bufs)
+            if n < len(self._buf):
+                return bytes(memoryview(self._buf)[:n])
+            # Larger than the buffer (long cmdlines); fall back to a full read
+            chunks = [bytes(self._buf)]
+            while True:
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            return b''.join(chunks)
+        finally:
+            os.close(fd)
+
+    def _read_boot_time(self):
+        for line in self.read(os.path.join(self.root, 'stat')).splitlines():
+            if line.startswith(b'btime'):
+                return float(line.split()[1])
+        return 0.0
+
+    def total_memory(self):
+        for line in self.read(os.path.join(self.root, 'meminfo')).splitlines():
+            if line.startswith(b'MemTotal:'):
+                return int(line.split()[1]) * 1024
+        return 0
+
+    def pids(self):
+        return [int(name) for name in os.listdir(self.root) if name.isdigit()]
+
+    def username(self, uid):
+        name = self._usernames.get(uid)
+        if name is None:
+            try:
+                name = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                name = str(uid)
+            self._usernames[uid] = name
+        return name
+
+    def stat(self, pid):
+        """Return (name, state, ppid, cpu_ticks, start_ticks, page_faults) from /proc/<pid>/stat."""
+        data = self.read(f"{self.root}/{pid}/stat")
+        # The command name is parenthesised and may itself contain spaces or ')'
+        lpar = data.index(b'(')
+        rpar = data.rindex(b')')
+        name = data[lpar + 1:rpar].decode('utf-8', 'replace')
+        fields = data[rpar + 2:].split()
+        # Offsets are relative to field 3 (state) of proc(5)
+        cpu_ticks = int(fields[11]) + int(fields[12])  # utime + stime
+        page_faults = int(fields[7]) + int(fields[9])  # minflt + majflt
+        return name, fields[0].decode(), int(fields[1]), cpu_ticks, int(fields[19]), page_faults
+
+    def rss(self, pid):
+        return int(self.read(f"{self.root}/{pid}/statm").split()[1]) * self.page_size
+
+    def ctx_switches(self, pid):
+        """Return voluntary plus involuntary context switches from /proc/<pid>/status."""
+        total = 0
+        for line in self.read(f"{self.root}/{pid}/status").splitlines():
+            if line.startswith((b'voluntary_ctxt_switches:', b'nonvoluntary_ctxt_switches:')):
+                total += int(line.split()[1])
+        return total
+
+    def io(self, pid):
+        """Return (read_bytes, write_bytes, read_ops, write_ops).
+
+        Raises PermissionError without ptrace access to the process.
+        """
+        read_bytes = write_bytes = read_ops = write_ops = 0
+        for line in self.read(f"{self.root}/{pid}/io").splitlines():
+            if line.startswith(b'read_bytes:'):
+                read_bytes = int(line[11:])
+            elif line.startswith(b'write_bytes:'):
+                write_bytes = int(line[12:])
+            elif line.startswith(b'syscr:'):
+                read_ops = int(line[6:])
+            elif line.startswith(b'syscw:'):
+                write_ops = int(line[6:])
+        return read_bytes, write_bytes, read_ops, write_ops
+
+    def cmdline(self, pid):
+        data = self.read(f"{self.root}/{pid}/cmdline")
+        return data.rstrip(b'\0').replace(b'\0', b' ').decode('utf-8', 'replace')
+
+    def uid(self, pid):
+        return os.stat(f"{self.root}/{pid}").st_uid
+
+    def cwd(self, pid):
+        return os.readlink(f"{self.root}/{pid}/cwd")
+
+    def cgroup(self, pid):
+        return parse_cgroup(self.read(f"{self.root}/{pid}/cgroup"))
+
+
+# /proc/net tables whose sockets count as network connections, matching
+# the kind='inet' default of psutil.Process.net_connections()
+INET_TABLES = ('tcp', 'tcp6', 'udp', 'udp6')
+
+
+class SocketIndex:
+    """Map socket inodes to pids once per tick instead of once per process.
+
+    The /proc/net tables are parsed once and the fd symlinks of every process
+    are walked once, so the cost is O(sockets + fds) rather than
+    O(processes x sockets) as with per-process net_connections().
+    """
+
+    def __init__(self, reader, tables=INET_TABLES):
+        self.reader = reader
+        self.tables = tables
+        self.connections = {}
+        self.queued = {}
+
+    def _read_tables(self):
+        """Return {inode: queued bytes} for every socket in the tables."""
+        inodes = {}
+        for table in self.tables:
+            try:
+                data = self.reader.read(f"{self.reader.root}/net/{table}")
+            except (FileNotFoundError, PermissionError):
+                continue
+            for line in data.splitlines()[1:]:
+                fields = line.split()
+                if len(fields) < 10:
+                    continue
+                inode = int(fields[9])
+                if inode:  # TIME_WAIT sockets have no owner
+                    tx_queue, _, rx_queue = fields[4].partition(b':')
+                    inodes[inode] = int(tx_queue, 16) + int(rx_queue, 16)
+        return inodes
+
+    def refresh(self, pids):
+        """Rebuild the per-pid connection counts and queued bytes for pids."""
+        inodes = self._read_tables()
+        connections = {}
+        queued = {}
+        root = self.reader.root
+        for pid in pids:
+            fd_dir = f"{root}/{pid}/fd"
+            try:
+                fds = os.listdir(fd_dir)
+            except (FileNotFoundError, ProcessLookupError, PermissionError):
+                continue
+            count = 0
+            total = 0
+            for fd in fds:
+                try:
+                    target = os.readlink(f"{fd_dir}/{fd}")
+                except OSError:
+                    continue
+                if target.startswith('socket:['):
+                    inode = int(target[8:-1])
+                    if inode in inodes:
+                        count += 1
+                        total += inodes[inode]
+            if count:
+                connections[pid] = count
+                queued[pid] = total
+        self.connections = connections
+        self.queued = queued
+
+
+class ProcfsProcessSampler:
+    """Drop-in replacement for collector.ProcessSampler on Linux."""
+
+    def __init__(self, root='/proc', slow_every=SLOW_REFRESH_TICKS):
+        self.reader = ProcfsReader(root)
+        self.cache = FieldCache(slow_every)
+        self.sockets = SocketIndex(self.reader)
+        self.previous = None
+        self.strings = None
+
+    def sample(self, current_time):
+        reader = self.reader
+        cache = self.cache
+        previous = self.previous
+        builder = ProcessSnapshotBuilder(self.strings)
+        numbers = builder.numbers
+        set_text = builder.set_text
+        total_memory = reader.total_memory() or 1
+        pids = reader.pids()
+        self.sockets.refresh(pids)
+        connections = self.sockets.connections
+        queued = self.sockets.queued
+        cache.start_tick()
+
+        for pid in pids:
+            try:
+                # stat, statm and status are read for every process on every tick
+                name, state, ppid, cpu_ticks, start_ticks, page_faults = reader.stat(pid)
+                memory_bytes = reader.rss(pid)
+                ctx_switches = reader.ctx_switches(pid)
+                create_time = reader.boot_time + start_ticks / reader.clock_ticks
+
+                fields, is_new = cache.get(pid, create_time)
+                if is_new:
+                    fields['create_time'] = create_time
+                    fields['username'] = reader.username(reader.uid(pid))
+                    try:
+                        fields['cmdline'] = reader.cmdline(pid)
+                    except PermissionError:
+                        pass
+                    cache.add(pid, create_time, fields)
+                if cache.slow_due(pid, is_new):
+                    try:
+                        fields['cwd'] = reader.cwd(pid)
+                    except PermissionError:
+                        pass
+                    try:
+                        fields['cgroup'] = reader.cgroup(pid)
+                    except OSError:
+                        # No cgroup file (kernels without cgroups) is not an exit
+                        fields['cgroup'] = None
+            except (FileNotFoundError, ProcessLookupError, PermissionError, ValueError, IndexError):
+                # Process exited between listdir() and the read
+                continue
+
+            cpu_time = cpu_ticks / reader.clock_ticks
+            row = builder.add(pid)
+            builder.update(row, fields)
+            # Re-read each tick anyway: a process may rename itself via prctl()
+            set_text(row, 'name', name)
+            set_text(row, 'status', PROC_STATUSES.get(state, state))
+            numbers['ppid'][row] = ppid
+            numbers['cpu_time'][row] = cpu_time
+            numbers['ctx_switches'][row] = ctx_switches
+            numbers['page_faults'][row] = page_faults
+            numbers['memory_percent'][row] = memory_bytes / total_memory * 100
+            numbers['memory_bytes'][row] = memory_bytes
+            numbers['disk_usage'][row] = 0
+            numbers['network_usage'][row] = queued.get(pid, 0)
+            numbers['running_time'][row] = current_time - create_time
+            if pid in connections:
+                numbers['network_connections'][row] = connections[pid]
+
+            # IO counters need ptrace access for other users' processes
+            try:
+                read_bytes, write_bytes, read_ops, write_ops = reader.io(pid)
+                numbers['disk_read'][row] = read_bytes
+                numbers['disk_write'][row] = write_bytes
+                numbers['disk_usage'][row] = read_bytes + write_bytes
+                numbers['read_ops'][row] = read_ops
+                numbers['write_ops'][row] = write_ops
+            except (FileNotFoundError, ProcessLookupError, PermissionError):
+                pass
+
+        cache.finish_tick()
+        # cpu_percent and every other rate come from the counter deltas
+        fill_rates(builder, previous, current_time)
+        snapshot = builder.build(current_time)
+        # Store for next iteration for differential calculations
+        self.previous = snapshot
+        self.strings = recycle_strings(builder.strings, len(snapshot))
+        return snapshot
@@ -0,0 +1,372 @@
+"""Qt-free process tree behind the grouped Processes view.
+
+ProcessTree keeps one node per process, plus one node per group when
+grouping by user, status or cgroup, and applies each columnar snapshot as a
+few insertions, moves and removals instead of rebuilding the tree. A tick
+costs one pass over the snapshot to find where every process belongs, one
+post-order pass to refresh subtree CPU and memory totals and, when sorted,
+one C-level sort per parent. Changes go to a listener whose methods mirror the
+QAbstractItemModel begin/end protocol, like rowstore.py, so cpuchart.py can
+forward them to Qt and the benchmark can count them without a display.
+
+Sorting lives here rather than in a QSortFilterProxyModel because the proxy
+compares rows through data(), one Python call per comparison, which does not
+keep up with thousands of rows whose CPU readings change every tick.
+"""
+from rowstore import contiguous_ranges
+
+# Grouping modes and, for the flat ones, the process field that names the group
+GROUP_MODES = ('parent', 'user', 'status', 'cgroup')
+GROUP_FIELDS = {'user': 'username', 'status': 'status', 'cgroup': 'cgroup'}
+# Fields a tree can be sorted by: TreeNode.values positions, then subtree totals
+VALUE_FIELDS = ('name', 'status', 'username', 'cpu_percent', 'memory_percent', 'memory_bytes')
+TOTAL_FIELDS = ('total_cpu_percent', 'total_memory_percent', 'total_memory_bytes')
+SORT_FIELDS = ('pid',) + VALUE_FIELDS + TOTAL_FIELDS
+
+
+class NullTreeListener:
+    """Listener that ignores every change notification."""
+
+    def begin_insert_rows(self, parent, first, last):
+        pass
+
+    def end_insert_rows(self):
+        pass
+
+    def begin_remove_rows(self, parent, first, last):
+        pass
+
+    def end_remove_rows(self):
+        pass
+
+    def rows_changed(self, parent, first, last):
+        pass
+
+    def begin_layout_change(self):
+        pass
+
+    def end_layout_change(self):
+        pass
+
+
+class TreeNode:
+    """A process (pid set) or a group heading (label set) in a ProcessTree.
+
+    Rows are renumbered lazily: removing children only records the first
+    position that may be stale, and the siblings are renumbered once, the next
+    time one of their rows is read. Qt may read rows between the removal
+    signals for one parent, so they have to be right at any point, but
+    renumbering after every range would cost O(ranges x siblings).
+    """
+    __slots__ = ('pid', 'label', 'parent', 'children', '_row', 'stale_from', 'values', 'totals')
+
+    def __init__(self, pid=None, label=None):
+        self.pid = pid
+        self.label = label
+        self.parent = None
+        self.children = []
+        self._row = 0
+        self.stale_from = None  # First child whose row may be out of date
+        self.values = None  # (name, status, username, cpu_percent, memory_percent, memory_bytes)
+        self.totals = (0.0, 0.0, 0.0, 0)  # Subtree (cpu_percent, memory_percent, memory_bytes, processes)
+
+    @property
+    def row(self):
+        """Position in parent.children."""
+        parent = self.parent
+        if parent is not None and parent.stale_from is not None and self._row >= parent.stale_from:
+            parent.renumber()
+        return self._row
+
+    @row.setter
+    def row(self, row):
+        self._row = row
+
+    def remove_children(self, first, last):
+        del self.children[first:last + 1]
+        if self.stale_from is None or first < self.stale_from:
+            self.stale_from = first
+
+    def renumber(self):
+        children = self.children
+        for row in range(self.stale_from, len(children)):
+            children[row]._row = row
+        self.stale_from = None
+
+
+def _number(value):
+    return 0.0 if value != value else value  # NaN: not collected
+
+
+def sort_key(field):
+    """Key function ordering sibling nodes by field; group headings use their label or totals."""
+    if field in TOTAL_FIELDS:
+        position = TOTAL_FIELDS.index(field)
+        return lambda node: node.totals[position]
+    if field == 'pid':
+        return lambda node: node.label if node.pid is None else node.pid
+    position = VALUE_FIELDS.index(field)
+    if position >= 3:
+        return lambda node: node.totals[position - 3] if node.pid is None else node.values[position]
+    return lambda node: node.label if node.pid is None else node.values[position] or ''
+
+
+def _values(snapshot, row):
+    value = snapshot.value
+    return (value(row, 'name'), value(row, 'status'), value(row, 'username'),
+            value(row, 'cpu_percent', 0.0), value(row, 'memory_percent', 0.0), value(row, 'memory_bytes', 0))
+
+
+class ProcessTree:
+    def __init__(self, mode='parent'):
+        if mode not in GROUP_MODES:
+            raise ValueError(f"Unknown process grouping: {mode}")
+        self.mode = mode
+        self.root = TreeNode()
+        self.nodes = {}   # pid -> TreeNode
+        self.groups = {}  # label -> TreeNode
+        self.sort_field = None
+        self.descending = False
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def set_sort(self, field, descending=False, listener=None):
+        """Order every node's children by field (one of SORT_FIELDS), or keep arrival order for None."""
+        if field is not None and field not in SORT_FIELDS:
+            raise ValueError(f"Unknown sort field: {field}")
+        self.sort_field = field
+        self.descending = descending
+        self._sort(listener or NullTreeListener())
+
+    def _targets(self, snapshot, new_nodes, new_groups):
+        """Return {pid: node the process belongs under}, creating missing group nodes."""
+        nodes = self.nodes
+        root = self.root
+        targets = {}
+        if self.mode == 'parent':
+            index = snapshot.index
+            ppids = snapshot.numbers['ppid']
+            for row, pid in enumerate(snapshot.pids):
+                ppid = ppids[row]
+                # Unknown parents, parents outside the snapshot and pid 0 on
+                # platforms where it is its own parent all become roots
+                if ppid != ppid or ppid == pid or ppid not in index:
+                    targets[pid] = root
+                else:
+                    ppid = int(ppid)
+                    targets[pid] = nodes.get(ppid) or new_nodes[ppid]
+        else:
+            groups = self.groups
+            labels = snapshot.texts[GROUP_FIELDS[self.mode]]
+            strings = snapshot.strings.strings
+            for row, pid in enumerate(snapshot.pids):
+                label = strings[labels[row]] or "Unknown"
+                group = groups.get(label) or new_groups.get(label)
+                if group is None:
+                    group = new_groups[label] = TreeNode(label=label)
+                    group.parent = root
+                targets[pid] = group
+        return targets
+
+    def apply(self, snapshot, listener=None):
+        """Bring the tree in line with snapshot, reporting each change to listener."""
+        listener = listener or NullTreeListener()
+        nodes = self.nodes
+        index = snapshot.index
+        new_nodes = {}
+        for pid in snapshot.pids:
+            if pid not in nodes:
+                # Filled in before insertion: views may read a row as soon as it appears
+                node = new_nodes[pid] = TreeNode(pid)
+                node.values = _values(snapshot, index[pid])
+                node.totals = node.values[3:] + (1,)
+        new_groups = {}
+        targets = self._targets(snapshot, new_nodes, new_groups)
+
+        # New processes and groups: those under another new node are attached
+        # silently and appear with it; the rest are appended as one block per parent
+        inserts = {}
+        for pid, node in new_nodes.items():
+            parent = targets[pid]
+            if parent.pid in new_nodes or parent.label in new_groups:
+                node.parent = parent
+                node.row = len(parent.children)
+                parent.children.append(node)
+            else:
+                inserts.setdefault(parent, []).append(node)
+        for group in new_groups.values():
+            inserts.setdefault(self.root, []).append(group)
+        for parent, block in inserts.items():
+            first = len(parent.children)
+            listener.begin_insert_rows(parent, first, first + len(block) - 1)
+            for offset, node in enumerate(block):
+                node.parent = parent
+                node.row = first + offset
+            parent.children.extend(block)
+            listener.end_insert_rows()
+        nodes.update(new_nodes)
+        self.groups.update(new_groups)
+
+        # Reparented processes (or ones that changed user or cgroup) move with their
+        # subtree. The move is signalled as a removal plus an insertion, which
+        # QSortFilterProxyModel handles row by row; a row move makes it remap
+        # every row
+        moves = [node for pid, node in nodes.items() if pid in targets and node.parent is not targets[pid]]
+        while moves:
+            deferred = []
+            for node in moves:
+                target = targets[node.pid]
+                if self._is_descendant(target, node):
+                    deferred.append(node)  # Its new parent has to move out from under it first
+                else:
+                    self._move(node, target, listener)
+            if len(deferred) == len(moves):
+                for node in deferred:
+                    self._move(node, self.root, listener)
+                break
+            moves = deferred
+
+        # Exited processes; their live children have already moved away, so
+        # removing the topmost dead node removes its whole (dead) subtree
+        dead = [node for pid, node in nodes.items() if pid not in index]
+        removals = {}
+        for node in dead:
+            if node.parent.pid is None or node.parent.pid in index:
+                removals.setdefault(node.parent, []).append(node.row)
+        for node in dead:
+            del nodes[node.pid]
+        self._remove_rows(removals, listener)
+
+        # Groups left without members
+        empty = [group for group in self.groups.values() if not group.children]
+        if empty:
+            for group in empty:
+                del self.groups[group.label]
+            self._remove_rows({self.root: [group.row for group in empty]}, listener)
+
+        changed = self._refresh_values(snapshot)
+        self._sort(listener)
+        self._signal_changed(changed, listener)
+
+    def _is_descendant(self, node, ancestor):
+        while node is not None:
+            if node is ancestor:
+                return True
+            node = node.parent
+        return False
+
+    def _move(self, node, parent, listener):
+        source = node.parent
+        row = node.row
+        listener.begin_remove_rows(source, row, row)
+        source.remove_children(row, row)
+        listener.end_remove_rows()
+        row = len(parent.children)
+        listener.begin_insert_rows(parent, row, row)
+        node.parent = parent
+        node.row = row
+        parent.children.append(node)
+        listener.end_insert_rows()
+
+    def _remove_rows(self, removals, listener):
+        for parent, rows in removals.items():
+            rows.sort()
+            # Highest rows first so earlier row numbers stay valid
+            for first, last in reversed(contiguous_ranges(rows)):
+                listener.begin_remove_rows(parent, first, last)
+                parent.remove_children(first, last)
+                listener.end_remove_rows()
+
+    def _refresh_values(self, snapshot):
+        """Update every node's values and subtree totals; returns the nodes that changed."""
+        index = snapshot.index
+        numbers = snapshot.numbers
+        cpu = numbers['cpu_percent']
+        memory_percent = numbers['memory_percent']
+        memory_bytes = numbers['memory_bytes']
+        texts = snapshot.texts
+        names = texts['name']
+        statuses = texts['status']
+        usernames = texts['username']
+        strings = snapshot.strings.strings
+
+        # Pre-order walk; visiting it backwards sees every child before its parent
+        order = []
+        stack = list(self.root.children)
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            stack.extend(node.children)
+
+        changed = []
+        for node in reversed(order):
+            if node.pid is None:
+                values = None
+                total_cpu = total_percent = total_bytes = 0.0
+                count = 0
+            else:
+                i = index[node.pid]
+                values = (strings[names[i]], strings[statuses[i]], strings[usernames[i]],
+                          _number(cpu[i]), _number(memory_percent[i]), _number(memory_bytes[i]))
+                total_cpu, total_percent, total_bytes = values[3], values[4], values[5]
+                count = 1
+            for child in node.children:
+                child_cpu, child_percent, child_bytes, child_count = child.totals
+                total_cpu += child_cpu
+                total_percent += child_percent
+                total_bytes += child_bytes
+                count += child_count
+            totals = (total_cpu, total_percent, total_bytes, count)
+            if values != node.values or totals != node.totals:
+                node.values = values
+                node.totals = totals
+                changed.append(node)
+        return changed
+
+    def _sort(self, listener):
+        """Re-sort every node's children, reporting one layout change if any order moved.
+
+        The sort is stable, so ties (the many idle processes at 0% CPU) keep
+        their current order instead of shuffling every tick.
+        """
+        if self.sort_field is None:
+            return
+        key = sort_key(self.sort_field)
+        reordered = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            children = node.children
+            if len(children) > 1:
+                ordered = sorted(children, key=key, reverse=self.descending)
+                if ordered != children:
+                    reordered.append((node, ordered))
+            stack.extend(children)
+        if not reordered:
+            return
+        listener.begin_layout_change()
+        for node, ordered in reordered:
+            node.children = ordered
+            node.stale_from = 0
+            node.renumber()
+        listener.end_layout_change()
+
+    def _signal_changed(self, changed, listener):
+        """Report changed rows with one signal per parent spanning all of them.
+
+        CPU readings move on most ticks, and one wide range is far cheaper for
+        Qt than hundreds of single-row ones.
+        """
+        spans = {}  # parent -> [first, last]
+        for node in changed:
+            row = node.row
+            span = spans.get(node.parent)
+            if span is None:
+                spans[node.parent] = [row, row]
+            elif row < span[0]:
+                span[0] = row
+            elif row > span[1]:
+                span[1] = row
+        for parent, (first, last) in spans.items():
+            listener.rows_changed(parent, first, last)
@@ -0,0 +1,394 @@
+"""Process search and filter queries over columnar snapshots.
+
+A query is a list of space-separated terms that must all match:
+
+    firefox                 name, command line or user name contains "firefox"
+    name:fire  cmd:--headless  user:root  status:sleeping
+    name:"web content"      quotes keep spaces in a substring
+    /^kworker/  user:/^(root|daemon)$/
+                            regular expressions
+    cpu>50  mem>2G  mem>=10%  disk>10M  sockq>0  pid=1234  ppid!=1
+                            sockq is bytes queued in socket buffers
+    -user:root  -cpu=0      a leading "-" negates a term
+
+Text matching is case-insensitive unless asked otherwise. ProcessIndex holds
+a lowercase copy and the trigrams of every distinct string in the searched
+columns, plus the pids holding each string, and only revisits processes that
+started, exited or changed strings since the previous snapshot. A
+ProcessQuery keeps its matching pids across ticks the same way: text terms
+are re-checked for those processes only, and numeric terms are one NumPy
+comparison per column.
+"""
+import operator
+import re
+
+import numpy as np
+
+# Searchable text columns, and the "key:" prefixes that pick among them
+INDEXED_FIELDS = ('name', 'cmdline', 'username', 'status')
+DEFAULT_FIELDS = ('name', 'cmdline', 'username')
+TEXT_KEYS = {
+    'name': ('name',),
+    'cmd': ('cmdline',),
+    'user': ('username',),
+    'status': ('status',),
+}
+# "key<op>value" prefixes and the snapshot column each compares
+NUMBER_KEYS = {
+    'cpu': 'cpu_percent',
+    'mem': 'memory_bytes',
+    'disk': 'disk_usage',
+    'sockq': 'network_usage',  # Bytes queued in socket buffers, not traffic
+    'pid': 'pid',
+    'ppid': 'ppid',
+}
+OPERATORS = {
+    '>=': operator.ge, '<=': operator.le, '!=': operator.ne,
+    '>': operator.gt, '<': operator.lt, '=': operator.eq,
+}
+UNITS = {'': 1, 'k': 1 << 10, 'm': 1 << 20, 'g': 1 << 30, 't': 1 << 40}
+
+# Only the start of very long strings (command lines) goes into the trigram
+# index; longer ones are always checked directly
+TRIGRAM_PREFIX = 256
+
+_TOKEN = re.compile(r'-?(?:\w+:)?(?:"[^"]*"|/(?:[^/\\]|\\.)+/(?=\s|$)|\S+)')
+_NUMBER_TERM = re.compile(r'(\w+)(>=|<=|!=|>|<|=)(.*)')
+_NUMBER_VALUE = re.compile(r'(\d+(?:\.\d*)?|\.\d+)\s*([kmgt]?)(?:i?b)?', re.IGNORECASE)
+
+
+class QueryError(ValueError):
+    """Raised for a query that cannot be parsed (bad number, regex or operator)."""
+
+
+def _text_columns(snapshot):
+    """Zero-copy NumPy views of the string id columns in INDEXED_FIELDS order."""
+    return [np.frombuffer(snapshot.texts[field], dtype=snapshot.texts[field].typecode)
+            for field in INDEXED_FIELDS]
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ProcessIndex:
+    """Lowercase and trigram indexes over the text columns of the latest snapshot.
+
+    Strings are identified by their StringTable index, which the snapshots
+    already store, so a process whose strings did not change costs nothing to
+    keep. The index is rebuilt whenever the collector starts a new table.
+    """
+
+    def __init__(self):
+        self.strings = None
+        self.generation = 0  # Bumped on every rebuild; ProcessQuery re-evaluates then
+        self.tick = 0
+        self.ids = {}  # pid -> string id per INDEXED_FIELDS
+        self.postings = {field: {} for field in INDEXED_FIELDS}  # string id -> pids
+        self.lowered = {}  # string id -> lowercase string, for every indexed string
+        self.trigrams = {}  # trigram -> list of string ids
+        self.long = set()  # ids of strings longer than TRIGRAM_PREFIX
+        self.changed = set()  # pids started or with changed strings in the last apply()
+        self.removed = set()  # pids that exited in the last apply()
+        self.snapshot = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def apply(self, snapshot):
+        """Bring the index in line with snapshot and record which pids changed.
+
+        Applying the snapshot the index already holds does nothing, so
+        callers need not track whether it is current.
+        """
+        if snapshot is self.snapshot:
+            return
+        self.tick += 1
+        pids = np.frombuffer(snapshot.pids, dtype=np.int64)
+        columns = _text_columns(snapshot)
+        if snapshot.strings is not self.strings:
+            self._rebuild(snapshot.strings)
+            rows = range(len(pids))
+            gone = ()
+        else:
+            # Same table, so equal ids mean equal strings: compare whole columns at once
+            prev_pids = np.frombuffer(self.snapshot.pids, dtype=np.int64)
+            _, kept, prev_kept = np.intersect1d(pids, prev_pids, assume_unique=True, return_indices=True)
+            dirty = np.ones(len(pids), dtype=bool)
+            dirty[kept] = False
+            for column, previous in zip(columns, _text_columns(self.snapshot)):
+                dirty[kept] |= column[kept] != previous[prev_kept]
+            rows = np.flatnonzero(dirty).tolist()
+            alive = np.zeros(len(prev_pids), dtype=bool)
+            alive[prev_kept] = True
+            gone = prev_pids[~alive].tolist()
+
+        self.removed = set(gone)
+        for pid in gone:
+            self._unlink(pid)
+        pid_list = pids.tolist()
+        changed = set()
+        for row in rows:
+            pid = pid_list[row]
+            ids = tuple(int(column[row]) for column in columns)
+            if self.ids.get(pid) != ids:
+                self._unlink(pid)
+                self._link(pid, ids)
+            changed.add(pid)
+        self.changed = changed
+        self.snapshot = snapshot
+
+    def _rebuild(self, strings):
+        self.strings = strings
+        self.generation += 1
+        self.ids = {}
+        self.postings = {field: {} for field in INDEXED_FIELDS}
+        self.lowered = {}
+        self.trigrams = {}
+        self.long = set()
+
+    def _link(self, pid, ids):
+        self.ids[pid] = ids
+        for field, string_id in zip(INDEXED_FIELDS, ids):
+            if not string_id:
+                continue
+            holders = self.postings[field].get(string_id)
+            if holders is None:
+                holders = self.postings[field][string_id] = set()
+                if string_id not in self.lowered:
+                    self._add_string(string_id)
+            holders.add(pid)
+
+    def _unlink(self, pid):
+        ids = self.ids.pop(pid, None)
+        if ids is None:
+            return
+        for field, string_id in zip(INDEXED_FIELDS, ids):
+            holders = self.postings[field].get(string_id)
+            if holders is not None:
+                holders.discard(pid)
+                if not holders:
+                    del self.postings[field][string_id]
+
+    def _add_string(self, string_id):
+        # Strings stay in the trigram index until the table is recycled; the
+        # table itself is bounded by snapshot.recycle_strings()
+        text = self.strings.strings[string_id].lower()
+        self.lowered[string_id] = text
+        if len(text) > TRIGRAM_PREFIX:
+            self.long.add(string_id)
+        index = self.trigrams
+        for trigram in trigrams(text[:TRIGRAM_PREFIX]):
+            ids = index.get(trigram)
+            if ids is None:
+                index[trigram] = [string_id]
+            else:
+                ids.append(string_id)
+
+    def candidates(self, needle):
+        """String ids whose lowercase form may contain needle (already lowercase)."""
+        if len(needle) < 3:
+            return self.lowered.keys()
+        found = None
+        for trigram in sorted(trigrams(needle), key=lambda t: len(self.trigrams.get(t, ()))):
+            ids = self.trigrams.get(trigram)
+            if not ids:
+                found = set()
+                break
+            if found is None:
+                found = set(ids)
+            else:
+                found.intersection_update(ids)
+            if not found:
+                break
+        return found | self.long
+
+    def pids_of(self, fields, string_ids):
+        """Union of the pids holding any of string_ids in any of fields."""
+        pids = set()
+        for field in fields:
+            postings = self.postings[field]
+            for string_id in string_ids:
+                holders = postings.get(string_id)
+                if holders:
+                    pids |= holders
+        return pids
+
+
+class TextTerm:
+    """Substring or regular expression match on one or more text columns."""
+
+    def __init__(self, fields, text, case_sensitive=False, negate=False):
+        self.fields = fields
+        self.positions = [INDEXED_FIELDS.index(field) for field in fields]
+        self.negate = negate
+        self.case_sensitive = case_sensitive
+        self.pattern = None
+        self.needle = None
+        if len(text) > 2 and text.startswith('/') and text.endswith('/'):
+            try:
+                self.pattern = re.compile(text[1:-1], 0 if case_sensitive else re.IGNORECASE)
+            except re.error as e:
+                raise QueryError(f"Invalid regular expression {text}: {str(e)}")
+        else:
+            self.needle = text
+        self._memo = {}
+        self._generation = None
+
+    def _string_matches(self, index, string_id):
+        if self.pattern is not None:
+            return self.pattern.search(index.strings.strings[string_id]) is not None
+        if self.case_sensitive:
+            return self.needle in index.strings.strings[string_id]
+        return self.needle.lower() in index.lowered[string_id]
+
+    def matches_string(self, index, string_id):
+        """Whether one indexed string matches, memoized per string table."""
+        if self._generation != index.generation:
+            self._memo = {}
+            self._generation = index.generation
+        result = self._memo.get(string_id)
+        if result is None:
+            result = self._memo[string_id] = bool(string_id) and self._string_matches(index, string_id)
+        return result
+
+    def evaluate(self, index):
+        """Set of pids matching the term, ignoring negation."""
+        if self.pattern is not None:
+            string_ids = set()
+            for field in self.fields:
+                string_ids.update(index.postings[field])
+        else:
+            string_ids = index.candidates(self.needle.lower())
+        matched = [string_id for string_id in string_ids if self.matches_string(index, string_id)]
+        return index.pids_of(self.fields, matched)
+
+    def accepts(self, index, pid):
+        ids = index.ids.get(pid)
+        if ids is None:
+            return False
+        found = any(self.matches_string(index, ids[position]) for position in self.positions)
+        return found != self.negate
+
+
+class NumberTerm:
+    """Comparison of one numeric snapshot column against a constant."""
+
+    def __init__(self, field, op, value, negate=False):
+        self.field = field
+        self.compare = OPERATORS[op]
+        self.value = value
+        self.negate = negate
+
+    def mask(self, snapshot):
+        if self.field == 'pid':
+            column = np.frombuffer(snapshot.pids, dtype=np.int64)
+        else:
+            column = np.frombuffer(snapshot.numbers[self.field], dtype=np.float64)
+        with np.errstate(invalid='ignore'):
+            mask = self.compare(column, self.value)
+        if self.field != 'pid':
+            mask &= ~np.isnan(column)  # Not collected: never matches
+        return ~mask if self.negate else mask
+
+
+def parse_number(key, text):
+    """Return (column, value) for the right-hand side of a numeric term."""
+    field = NUMBER_KEYS[key]
+    if key == 'mem' and text.endswith('%'):
+        field, text = 'memory_percent', text[:-1]
+    elif text.endswith('%'):
+        text = text[:-1]
+    match = _NUMBER_VALUE.fullmatch(text.strip())
+    if match is None:
+        raise QueryError(f"Invalid number '{text}' for {key}")
+    return field, float(match.group(1)) * UNITS[match.group(2).lower()]
+
+
+def parse_query(text, case_sensitive=False):
+    """Split query text into TextTerm and NumberTerm objects."""
+    terms = []
+    for token in _TOKEN.findall(text):
+        if token == '-':
+            continue  # A negation still being typed
+        negate = token.startswith('-')
+        if negate:
+            token = token[1:]
+        match = _NUMBER_TERM.fullmatch(token)
+        if match and match.group(1).lower() in NUMBER_KEYS:
+            key, op, value = match.groups()
+            field, number = parse_number(key.lower(), value)
+            terms.append(NumberTerm(field, op, number, negate))
+            continue
+        fields = DEFAULT_FIELDS
+        key, colon, value = token.partition(':')
+        if colon and key.lower() in TEXT_KEYS:
+            fields = TEXT_KEYS[key.lower()]
+            token = value
+        if token.startswith('"'):
+            # A quote still being typed counts as open up to the end of the word
+            token = token[1:-1] if len(token) >= 2 and token.endswith('"') else token[1:]
+        if token:  # Empty and quote-only terms are ignored, like an empty query
+            terms.append(TextTerm(fields, token, case_sensitive, negate))
+    return terms
+
+
+class ProcessQuery:
+    """A parsed query and the set of pids it matches in the latest snapshot."""
+
+    def __init__(self, text, case_sensitive=False):
+        self.text = text
+        terms = parse_query(text, case_sensitive)
+        self.text_terms = [term for term in terms if isinstance(term, TextTerm)]
+        self.number_terms = [term for term in terms if isinstance(term, NumberTerm)]
+        self.matches = set()
+        self._text_matches = set()
+        self._generation = None
+        self._tick = None
+
+    def __bool__(self):
+        return bool(self.text_terms or self.number_terms)
+
+    def update(self, index, snapshot):
+        """Re-evaluate against index, already applied to snapshot.
+
+        Returns the pids whose match changed since the previous update.
+        """
+        text_matches = self._text_matches
+        if self._generation != index.generation or self._tick not in (index.tick, index.tick - 1):
+            text_matches = self._evaluate_text(index)
+        elif self._tick != index.tick:
+            # One tick behind: only processes that started or changed strings can flip
+            text_matches -= index.removed
+            for pid in index.changed:
+                if all(term.accepts(index, pid) for term in self.text_terms):
+                    text_matches.add(pid)
+                else:
+                    text_matches.discard(pid)
+        self._text_matches = text_matches
+        self._generation = index.generation
+        self._tick = index.tick
+
+        if self.number_terms:
+            mask = np.ones(len(snapshot), dtype=bool)
+            for term in self.number_terms:
+                mask &= term.mask(snapshot)
+            pids = np.frombuffer(snapshot.pids, dtype=np.int64)
+            matches = text_matches.intersection(pids[mask].tolist())
+        else:
+            matches = set(text_matches)
+        flipped = matches ^ self.matches
+        self.matches = matches
+        return flipped
+
+    def _evaluate_text(self, index):
+        matches = set(index.ids)
+        for term in self.text_terms:
+            pids = term.evaluate(index)
+            if term.negate:
+                matches -= pids
+            else:
+                matches &= pids
+            if not matches:
+                break
+        return matches
@@ -0,0 +1,263 @@
+"""JSON-lines wire format for snapshots and a client for the cpumon daemon.
+
+Every message is one JSON object on one line. Clients send requests
+({"op": "latest"}, {"op": "history", "since": t}, {"op": "subscribe"},
+{"op": "ping"}) and read {"ok": true, ...} or {"ok": false, "error": ...}
+replies; a subscription then streams one {"snapshot": ...} line per tick.
+
+Process tables travel in the same columnar shape as ProcessSnapshot, with
+missing numbers sent as null, so a snapshot is encoded once per tick no matter
+how many clients read it.
+"""
+import json
+import os
+import socket
+import threading
+from array import array
+from types import SimpleNamespace
+
+from collector import Snapshot, SystemSnapshot
+from snapshot import MISSING, NUMBER_FIELDS, TEXT_FIELDS, ProcessSnapshot, StringTable, recycle_strings
+
+
+def default_socket_path():
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'cpumon.sock')
+    return os.path.join(os.path.expanduser('~'), '.cpumon', 'cpumon.sock')
+
+
+#region Encoding
+
+def _plain(value):
+    """Convert psutil namedtuples (cpu_freq, sensor readings) to JSON-friendly values."""
+    if hasattr(value, '_asdict'):
+        return value._asdict()
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return value
+
+
+def encode_system(system):
+    data = {}
+    for name in SystemSnapshot.__slots__:
+        value = getattr(system, name)
+        if value is not None:
+            data[name] = _plain(value)
+    return data
+
+
+def encode_processes(processes):
+    strings = processes.strings.strings
+    return {
+        'timestamp': processes.timestamp,
+        'pids': processes.pids.tolist(),
+        'numbers': {
+            field: [None if value != value else value for value in column]
+            for field, column in processes.numbers.items()
+        },
+        'texts': {
+            field: [strings[index] for index in column]
+            for field, column in processes.texts.items()
+        },
+    }
+
+
+def encode_snapshot(snapshot):
+    return {
+        'timestamp': snapshot.timestamp,
+        'system': encode_system(snapshot.system),
+        'processes': encode_processes(snapshot.processes),
+        'stats': snapshot.stats,
+        'aggregates': snapshot.aggregates,
+    }
+
+
+def encode_line(message):
+    return json.dumps(message, separators=(',', ':')).encode() + b'\n'
+
+#endregion
+
+#region Decoding
+
+def decode_system(data):
+    system = SystemSnapshot(data['timestamp'])
+    for name, value in data.items():
+        if name == 'cpu_freq':
+            value = SimpleNamespace(**value)
+        elif name == 'temperatures':
+            value = {sensor: [SimpleNamespace(**entry) for entry in entries]
+                     for sensor, entries in value.items()}
+        elif name == 'load_avg':
+            value = tuple(value)
+        setattr(system, name, value)
+    return system
+
+
+def decode_processes(data, strings=None):
+    strings = strings if strings is not None else StringTable()
+    count = len(data['pids'])
+    numbers = {}
+    for field in NUMBER_FIELDS:
+        values = data['numbers'].get(field)
+        if values is None:
+            numbers[field] = array('d', [MISSING]) * count
+        else:
+            numbers[field] = array('d', [MISSING if value is None else value for value in values])
+    texts = {}
+    for field in TEXT_FIELDS:
+        values = data['texts'].get(field)
+        if values is None:
+            texts[field] = array('l', [0]) * count
+        else:
+            texts[field] = array('l', map(strings.intern, values))
+    return ProcessSnapshot(data['timestamp'], array('q', data['pids']), numbers, texts, strings)
+
+
+def decode_snapshot(data, strings=None):
+    return Snapshot(data['timestamp'], decode_system(data['system']),
+                    decode_processes(data['processes'], strings), data.get('stats'),
+                    data.get('aggregates'))
+
+#endregion
+
+
+class RemoteCollector:
+    """Collector look-alike that reads snapshots from a running daemon.
+
+    Front ends can use it wherever they use a Collector: start() subscribes
+    to the daemon's stream and sample() asks for the latest tick instead of
+    sampling the host itself.
+    """
+
+    def __init__(self, path=None, timeout=5.0):
+        self.path = path or default_socket_path()
+        self.timeout = timeout
+        self.strings = StringTable()
+        self._subscribers = []
+        self._error_handlers = []
+        self._lock = threading.Lock()
+        self._latest = None
+        self._thread = None
+        self._socket = None
+        self._stop_event = threading.Event()
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.path)
+        return sock
+
+    def request(self, op, **arguments):
+        """Send one request on a fresh connection and return the decoded reply."""
+        arguments['op'] = op
+        with self._connect() as sock:
+            sock.sendall(encode_line(arguments))
+            with sock.makefile('rb') as stream:
+                line = stream.readline()
+        if not line:
+            raise ConnectionError(f"daemon at {self.path} closed the connection")
+        reply = json.loads(line)
+        if not reply.get('ok'):
+            raise RuntimeError(reply.get('error', "daemon request failed"))
+        return reply
+
+    def _decode(self, data):
+        snapshot = decode_snapshot(data, self.strings)
+        self.strings = recycle_strings(self.strings, len(snapshot.processes))
+        return snapshot
+
+    def subscribe(self, callback, on_error=None):
+        """Register callback(snapshot); returns a function that unsubscribes."""
+        with self._lock:
+            self._subscribers.append(callback)
+            if on_error is not None:
+                self._error_handlers.append(on_error)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+                if on_error in self._error_handlers:
+                    self._error_handlers.remove(on_error)
+        return unsubscribe
+
+    def latest(self):
+        return self._latest
+
+    def history(self, since=0.0):
+        """Return the snapshots the daemon still holds that are newer than since."""
+        reply = self.request('history', since=since)
+        return [self._decode(data) for data in reply['snapshots']]
+
+    def sample(self):
+        """Fetch the daemon's latest snapshot and publish it to every subscriber."""
+        try:
+            reply = self.request('latest')
+        except (OSError, ValueError, RuntimeError) as e:
+            self._report_error(f"Daemon error: {str(e)}")
+            return None
+        if reply.get('snapshot') is None:
+            return None
+        snapshot = self._decode(reply['snapshot'])
+        self._publish(snapshot)
+        return snapshot
+
+    def _publish(self, snapshot):
+        self._latest = snapshot
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                self._report_error(f"Subscriber error: {str(e)}")
+
+    def _report_error(self, message):
+        with self._lock:
+            handlers = list(self._error_handlers)
+        for handler in handlers:
+            handler(message)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="remote-collector", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        sock = self._socket
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        # Stay subscribed, reconnecting if the daemon restarts
+        while not self._stop_event.is_set():
+            try:
+                with self._connect() as sock:
+                    sock.settimeout(None)
+                    self._socket = sock
+                    sock.sendall(encode_line({'op': 'subscribe'}))
+                    with sock.makefile('rb') as stream:
+                        for line in stream:
+                            message = json.loads(line)
+                            if 'snapshot' in message:
+                                self._publish(self._decode(message['snapshot']))
+                            elif not message.get('ok'):
+                                raise RuntimeError(message.get('error', "subscription refused"))
+            except (OSError, ValueError, RuntimeError) as e:
+                if not self._stop_event.is_set():
+                    self._report_error(f"Daemon connection error: {str(e)}")
+            finally:
+                self._socket = None
+            self._stop_event.wait(self.timeout)
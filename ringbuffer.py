@@ -0,0 +1,36 @@
+"""Preallocated NumPy ring buffers for the live performance charts.
+
+RingBuffer stores every value twice, at slot i and i + capacity, so the
+newest capacity values are always one contiguous slice of the backing array.
+Charts hand that slice straight to pyqtgraph: appending is two stores and
+reading allocates nothing but the view object. With width set, each entry is a
+row of width values (one per CPU core, say) and views are (capacity, width).
+"""
+import numpy as np
+
+
+class RingBuffer:
+    def __init__(self, capacity, fill=0.0, dtype=np.float64, width=None):
+        self.capacity = capacity
+        self.width = width
+        shape = 2 * capacity if width is None else (2 * capacity, width)
+        self._data = np.full(shape, fill, dtype=dtype)
+        self._head = 0  # Slot the next value is written to
+
+    def __len__(self):
+        return self.capacity
+
+    def append(self, value):
+        head = self._head
+        self._data[head] = value
+        self._data[head + self.capacity] = value
+        self._head = (head + 1) % self.capacity
+
+    def view(self):
+        """Contents oldest to newest, as a read-only view of the backing array."""
+        view = self._data[self._head:self._head + self.capacity]
+        view.flags.writeable = False
+        return view
+
+    def last(self):
+        return self._data[self._head + self.capacity - 1]
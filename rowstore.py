@@ -0,0 +1,125 @@
+"""Qt-free column store behind the process table models.
+
+RowStore keeps one array per field, keyed by pid, and applies each new
+columnar process snapshot as a minimal set of row removals, in-place updates and
+appends. Changes are reported to a listener whose methods mirror the
+QAbstractItemModel begin/end protocol, so cpuchart.py can forward them to Qt
+and the benchmark can count them without a display.
+"""
+from array import array
+
+from snapshot import NUMBER_FIELDS
+
+
+class NullListener:
+    """Listener that ignores every change notification."""
+
+    def begin_remove_rows(self, first, last):
+        pass
+
+    def end_remove_rows(self):
+        pass
+
+    def begin_insert_rows(self, first, last):
+        pass
+
+    def end_insert_rows(self):
+        pass
+
+    def rows_changed(self, first, last):
+        pass
+
+
+def contiguous_ranges(rows):
+    """Group sorted row numbers into (first, last) runs."""
+    ranges = []
+    for row in rows:
+        if ranges and ranges[-1][1] == row - 1:
+            ranges[-1][1] = row
+        else:
+            ranges.append([row, row])
+    return ranges
+
+
+class RowStore:
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        self.pids = []
+        self.row_of = {}
+        self.columns = {
+            field: array('d') if field in NUMBER_FIELDS else []
+            for field in self.fields
+        }
+
+    def __len__(self):
+        return len(self.pids)
+
+    def value(self, row, field):
+        return self.columns[field][row]
+
+    def _sources(self, snapshot):
+        """Pair each stored column with its column in the snapshot."""
+        sources = []
+        for field in self.fields:
+            if field in snapshot.numbers:
+                sources.append((self.columns[field], snapshot.numbers[field], None))
+            else:
+                sources.append((self.columns[field], snapshot.texts[field], snapshot.strings.strings))
+        return sources
+
+    def apply(self, snapshot, listener=None):
+        """Bring the store in line with snapshot, reporting each change to listener."""
+        listener = listener or NullListener()
+        columns = self.columns
+        fields = self.fields
+        index = snapshot.index
+        sources = self._sources(snapshot)
+
+        # Removals first, highest rows first so earlier row numbers stay valid
+        gone = sorted(row for pid, row in self.row_of.items() if pid not in index)
+        if gone:
+            for first, last in reversed(contiguous_ranges(gone)):
+                listener.begin_remove_rows(first, last)
+                del self.pids[first:last + 1]
+                for field in fields:
+                    del columns[field][first:last + 1]
+                listener.end_remove_rows()
+            self.row_of = {pid: row for row, pid in enumerate(self.pids)}
+
+        # In-place updates for surviving rows; only rows whose values moved are reported
+        changed = []
+        for row, pid in enumerate(self.pids):
+            source_row = index[pid]
+            dirty = False
+            for column, source, strings in sources:
+                new = source[source_row]
+                if strings is not None:
+                    new = strings[new]
+                elif new != new:  # NaN: not collected
+                    new = 0.0
+                if column[row] != new:
+                    column[row] = new
+                    dirty = True
+            if dirty:
+                changed.append(row)
+        for first, last in contiguous_ranges(changed):
+            listener.rows_changed(first, last)
+
+        # New processes are appended as one block
+        row_of = self.row_of
+        new_pids = [pid for pid in snapshot.pids if pid not in row_of]
+        if new_pids:
+            first = len(self.pids)
+            listener.begin_insert_rows(first, first + len(new_pids) - 1)
+            for offset, pid in enumerate(new_pids):
+                source_row = index[pid]
+                row_of[pid] = first + offset
+                self.pids.append(pid)
+                for column, source, strings in sources:
+                    new = source[source_row]
+                    if strings is not None:
+                        new = strings[new]
+                    elif new != new:
+                        new = 0.0
+                    column.append(new)
+            listener.end_insert_rows()
@@ -0,0 +1,203 @@
+"""Columnar per-process snapshot shared between the collector and its viewers.
+
+A ProcessSnapshot keeps every numeric field in its own array('d') column and
+every string field as indexes into an interned StringTable, so a tick costs a
+handful of flat arrays instead of a dict per process. Snapshots are never
+modified after ProcessSnapshotBuilder.build(), which makes handing one to
+another thread a plain reference copy.
+"""
+import heapq
+from array import array
+from collections.abc import Mapping
+
+MISSING = float('nan')
+
+# Per-process numeric fields; NaN means "not collected for this process".
+# Rates (cpu_percent and *_rate) are derived from the counters by rates.fill_rates
+NUMBER_FIELDS = (
+    'cpu_percent', 'cpu_time', 'memory_percent', 'memory_bytes', 'disk_read', 'disk_write',
+    'disk_usage', 'disk_read_rate', 'disk_write_rate', 'read_ops', 'write_ops',
+    'read_ops_rate', 'write_ops_rate', 'ctx_switches', 'ctx_switch_rate', 'page_faults',
+    'page_fault_rate', 'network_usage', 'network_connections', 'create_time', 'running_time',
+    'ppid'
+)
+# Numeric fields that are whole numbers and read back as int
+INTEGER_FIELDS = frozenset((
+    'memory_bytes', 'disk_read', 'disk_write', 'disk_usage', 'read_ops', 'write_ops',
+    'ctx_switches', 'page_faults', 'network_usage', 'network_connections', 'ppid'
+))
+# Per-process string fields, stored as StringTable indexes (0 means missing)
+TEXT_FIELDS = ('name', 'status', 'username', 'cmdline', 'cwd', 'cgroup')
+
+
+class StringTable:
+    """Append-only table of distinct strings; index 0 is reserved for None.
+
+    Appending never invalidates an index, so a snapshot can keep reading the
+    table while the collector interns strings for the next tick.
+    """
+
+    def __init__(self):
+        self.strings = [None]
+        self._index = {None: 0}
+
+    def __len__(self):
+        return len(self.strings)
+
+    def intern(self, value):
+        index = self._index.get(value)
+        if index is None:
+            index = len(self.strings)
+            self.strings.append(value)
+            self._index[value] = index
+        return index
+
+
+class ProcessRow:
+    """Read-only dict-like view of one process in a ProcessSnapshot."""
+    __slots__ = ('snapshot', 'row')
+
+    def __init__(self, snapshot, row):
+        self.snapshot = snapshot
+        self.row = row
+
+    def get(self, field, default=None):
+        return self.snapshot.value(self.row, field, default)
+
+    def __getitem__(self, field):
+        value = self.snapshot.value(self.row, field, MISSING)
+        if value is MISSING:
+            raise KeyError(field)
+        return value
+
+    def __contains__(self, field):
+        return self.snapshot.value(self.row, field, MISSING) is not MISSING
+
+    def keys(self):
+        return [field for field in ('pid', 'timestamp') + NUMBER_FIELDS + TEXT_FIELDS if field in self]
+
+    def items(self):
+        return [(field, self[field]) for field in self.keys()]
+
+
+class ProcessSnapshot(Mapping):
+    """Read-only mapping of pid -> ProcessRow backed by parallel columns."""
+
+    def __init__(self, timestamp, pids, numbers, texts, strings):
+        self.timestamp = timestamp
+        self.pids = pids
+        self.numbers = numbers
+        self.texts = texts
+        self.strings = strings
+        self.index = {pid: row for row, pid in enumerate(pids)}
+
+    @classmethod
+    def from_dicts(cls, timestamp, processes, strings=None):
+        """Build a snapshot from {pid: process_info} dicts (benchmarks and tools)."""
+        builder = ProcessSnapshotBuilder(strings)
+        for pid, info in processes.items():
+            builder.update(builder.add(pid), info)
+        return builder.build(timestamp)
+
+    def __getitem__(self, pid):
+        return ProcessRow(self, self.index[pid])
+
+    def __contains__(self, pid):
+        return pid in self.index
+
+    def __iter__(self):
+        return iter(self.pids)
+
+    def __len__(self):
+        return len(self.pids)
+
+    def value(self, row, field, default=None):
+        """Return field for row, or default when it was not collected."""
+        column = self.numbers.get(field)
+        if column is not None:
+            value = column[row]
+            if value != value:  # NaN
+                return default
+            return int(value) if field in INTEGER_FIELDS else value
+        column = self.texts.get(field)
+        if column is not None:
+            value = self.strings.strings[column[row]]
+            return default if value is None else value
+        if field == 'pid':
+            return self.pids[row]
+        if field == 'timestamp':
+            return self.timestamp
+        return default
+
+    def top(self, field, count):
+        """Row numbers of the count largest values of a numeric column, largest first.
+
+        Uses a bounded heap, so picking the top 5 of thousands of processes
+        never sorts the whole column; rows where field is missing are skipped.
+        """
+        column = self.numbers[field]
+        return heapq.nlargest(count, (row for row in range(len(column)) if column[row] == column[row]),
+                              key=column.__getitem__)
+
+
+class ProcessSnapshotBuilder:
+    """Accumulate one tick of process rows, then freeze them into a snapshot."""
+
+    def __init__(self, strings=None):
+        self.strings = strings if strings is not None else StringTable()
+        self.pids = array('q')
+        self.numbers = {field: array('d') for field in NUMBER_FIELDS}
+        self.texts = {field: array('l') for field in TEXT_FIELDS}
+
+    def __len__(self):
+        return len(self.pids)
+
+    def add(self, pid):
+        """Append a row for pid with every field missing and return its row number."""
+        self.pids.append(pid)
+        for column in self.numbers.values():
+            column.append(MISSING)
+        for column in self.texts.values():
+            column.append(0)
+        return len(self.pids) - 1
+
+    def discard(self, row):
+        """Drop the most recently added row (the process vanished mid-read)."""
+        if row == len(self.pids) - 1:
+            self.pids.pop()
+            for column in self.numbers.values():
+                column.pop()
+            for column in self.texts.values():
+                column.pop()
+
+    def set_number(self, row, field, value):
+        self.numbers[field][row] = value
+
+    def set_text(self, row, field, value):
+        self.texts[field][row] = self.strings.intern(value)
+
+    def update(self, row, values):
+        """Copy a dict of field values into row, ignoring unknown fields."""
+        numbers = self.numbers
+        texts = self.texts
+        intern = self.strings.intern
+        for field, value in values.items():
+            if field in numbers:
+                if value is not None:
+                    numbers[field][row] = value
+            elif field in texts:
+                texts[field][row] = intern(value)
+
+    def build(self, timestamp):
+        return ProcessSnapshot(timestamp, self.pids, self.numbers, self.texts, self.strings)
+
+
+def recycle_strings(strings, rows):
+    """Return strings, or a fresh table once strings of dead processes dominate it.
+
+    Old snapshots keep their reference to the previous table, so this is safe
+    while viewers still hold them.
+    """
+    if len(strings) > 8 * rows + 1024:
+        return StringTable()
+    return strings
@@ -0,0 +1,123 @@
+import errno
+
+import pytest
+
+from cgroups import CgroupFiles, CgroupReader, ServiceSampler, list_units, parse_io_stat
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+@pytest.fixture
+def cgroupfs(tmp_path):
+    """A cgroup v2 root with a few units under system.slice."""
+    write(tmp_path / 'cgroup.controllers', "cpu io memory pids\n")
+    write(tmp_path / 'cgroup.procs', "1\n")
+    services = tmp_path / 'system.slice'
+    # Every controller, and two block devices in io.stat
+    write(services / 'sshd.service' / 'cgroup.procs', "100\n101\n")
+    write(services / 'sshd.service' / 'cpu.stat', "usage_usec 1000000\nuser_usec 600000\nsystem_usec 400000\n")
+    write(services / 'sshd.service' / 'memory.current', "4194304\n")
+    write(services / 'sshd.service' / 'io.stat',
+          "8:0 rbytes=1000 wbytes=2000 rios=1 wios=2 dbytes=0 dios=0\n"
+          "8:16 rbytes=500 wbytes=0 rios=1 wios=0 dbytes=0 dios=0\n")
+    # Nested slice, pids only in a child cgroup, no controller files
+    write(services / 'system-getty.slice' / 'getty@tty1.service' / 'cgroup.procs', "")
+    write(services / 'system-getty.slice' / 'getty@tty1.service' / 'payload' / 'cgroup.procs', "200\n")
+    # Loaded but inactive: empty cgroup
+    write(services / 'idle.service' / 'cgroup.procs', "")
+    # Not a unit
+    write(services / 'init.scope' / 'cgroup.procs', "300\n")
+    return tmp_path
+
+
+def test_list_units_descends_into_slices(cgroupfs):
+    names = [unit for unit, _ in list_units(str(cgroupfs / 'system.slice'))]
+    assert names == ['getty@tty1.service', 'idle.service', 'sshd.service']
+
+
+def test_parse_io_stat_sums_devices():
+    data = b"8:0 rbytes=1000 wbytes=2000 rios=1\n8:16 rbytes=500 wbytes=10 rios=1\n"
+    assert parse_io_stat(data) == (1500, 2010)
+
+
+def test_first_sample(cgroupfs):
+    sampler = ServiceSampler(str(cgroupfs))
+    assert sampler.is_available()
+    services = {service['name']: service for service in sampler.sample(100.0)}
+    assert sorted(services) == ['getty@tty1.service', 'sshd.service']  # idle.service has no pids
+
+    sshd = services['sshd.service']
+    assert sshd['pids'] == [100, 101]
+    assert sshd['memory_bytes'] == 4194304
+    # Rates need a second sample
+    assert sshd['cpu_percent'] is None
+    assert sshd['io_read_rate'] is None
+    assert sshd['io_write_rate'] is None
+
+    getty = services['getty@tty1.service']
+    assert getty['pids'] == [200]
+    assert getty['memory_bytes'] is None  # Controllers not enabled
+    assert getty['cpu_percent'] is None
+
+
+def test_rates_across_samples(cgroupfs):
+    sampler = ServiceSampler(str(cgroupfs))
+    sampler.sample(100.0)
+    sshd = cgroupfs / 'system.slice' / 'sshd.service'
+    write(sshd / 'cpu.stat', "usage_usec 2000000\nuser_usec 1200000\nsystem_usec 800000\n")
+    write(sshd / 'io.stat',
+          "8:0 rbytes=5000 wbytes=6000 rios=2 wios=3 dbytes=0 dios=0\n"
+          "8:16 rbytes=500 wbytes=2000 rios=1 wios=1 dbytes=0 dios=0\n")
+
+    services = {service['name']: service for service in sampler.sample(102.0)}
+    sshd = services['sshd.service']
+    assert sshd['cpu_percent'] == pytest.approx(50.0)  # 1 s of CPU over 2 s
+    assert sshd['io_read_rate'] == pytest.approx(2000.0)
+    assert sshd['io_write_rate'] == pytest.approx(3000.0)
+    assert services['getty@tty1.service']['cpu_percent'] is None
+
+
+def test_unit_that_stops_and_restarts_starts_over(cgroupfs):
+    sampler = ServiceSampler(str(cgroupfs))
+    sampler.sample(100.0)
+    procs = cgroupfs / 'system.slice' / 'sshd.service' / 'cgroup.procs'
+    write(procs, "")
+    assert 'sshd.service' not in [service['name'] for service in sampler.sample(101.0)]
+    write(procs, "400\n")
+    sshd = {service['name']: service for service in sampler.sample(102.0)}['sshd.service']
+    assert sshd['pids'] == [400]
+    assert sshd['cpu_percent'] is None
+
+
+def test_hybrid_hierarchy(tmp_path):
+    write(tmp_path / 'unified' / 'cgroup.controllers', "")
+    write(tmp_path / 'unified' / 'cgroup.procs', "1\n")
+    write(tmp_path / 'unified' / 'system.slice' / 'cron.service' / 'cgroup.procs', "50\n")
+    sampler = ServiceSampler(str(tmp_path))
+    assert [service['name'] for service in sampler.sample(1.0)] == ['cron.service']
+
+
+def test_unavailable_without_cgroup_v2(tmp_path):
+    sampler = ServiceSampler(str(tmp_path))
+    assert not sampler.is_available()
+    assert sampler.sample(1.0) == []
+
+
+def test_cgroup_files_recover_from_a_read_error(cgroupfs, monkeypatch):
+    files = CgroupFiles(str(cgroupfs / 'system.slice' / 'sshd.service'), CgroupReader(4096))
+    assert files.sample(100.0, 4, 1 << 30)['memory_current'] == 4194304
+    assert 'cpu.max' in files.missing  # Never created, so not retried
+
+    read_at = files.reader.read_at
+
+    def fail_once(fd):
+        monkeypatch.setattr(files.reader, 'read_at', read_at)
+        raise OSError(errno.EIO, "I/O error")
+
+    monkeypatch.setattr(files.reader, 'read_at', fail_once)
+    assert files.sample(101.0, 4, 1 << 30) is None
+    assert 'cpu.stat' not in files.missing
+    assert files.sample(102.0, 4, 1 << 30)['memory_current'] == 4194304
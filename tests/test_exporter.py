@@ -0,0 +1,84 @@
+import http.client
+
+import pytest
+
+from collector import Snapshot, SystemSnapshot
+from exporter import CONTENT_TYPE, serve_metrics
+from snapshot import ProcessSnapshot
+
+
+class StubCollector:
+    """Collector stand-in whose ticks the test publishes by hand."""
+
+    def __init__(self):
+        self.subscribers = []
+
+    def latest(self):
+        return None
+
+    def subscribe(self, callback, on_error=None):
+        self.subscribers.append(callback)
+        return lambda: self.subscribers.remove(callback)
+
+    def publish(self, snapshot):
+        for callback in list(self.subscribers):
+            callback(snapshot)
+
+
+def make_snapshot():
+    system = SystemSnapshot(1000.0)
+    system.cpu_percent = 12.5
+    system.cpu_count = 4
+    processes = ProcessSnapshot.from_dicts(1000.0, {
+        1: {'name': 'init', 'cpu_percent': 0.5, 'memory_bytes': 1 << 20},
+        42: {'name': 'worker', 'cpu_percent': 30.0, 'memory_bytes': 1 << 30},
+    })
+    return Snapshot(1000.0, system, processes)
+
+
+def get(server, path):
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+    try:
+        connection.request('GET', path)
+        response = connection.getresponse()
+        return response.status, response.getheader('Content-Type'), response.read()
+    finally:
+        connection.close()
+
+
+@pytest.fixture
+def served():
+    collector = StubCollector()
+    server = serve_metrics(collector, port=0)
+    yield collector, server
+    server.shutdown()
+
+
+def test_unavailable_before_first_snapshot(served):
+    _, server = served
+    status, _, _ = get(server, '/metrics')
+    assert status == 503
+
+
+def test_serves_exposition_after_snapshot(served):
+    collector, server = served
+    collector.publish(make_snapshot())
+    status, content_type, body = get(server, '/metrics')
+    assert status == 200
+    assert content_type == CONTENT_TYPE
+    text = body.decode()
+    assert 'cpumon_cpu_usage_percent 12.5' in text
+    assert 'cpumon_process_cpu_usage_percent{pid="42",name="worker"} 30.0' in text
+
+
+def test_other_paths_not_found(served):
+    collector, server = served
+    collector.publish(make_snapshot())
+    assert get(server, '/')[0] == 404
+    assert get(server, '/metrics/extra')[0] == 404
+
+
+def test_shutdown_unsubscribes(served):
+    collector, server = served
+    server.shutdown()
+    assert collector.subscribers == []